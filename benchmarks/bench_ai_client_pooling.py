@@ -0,0 +1,56 @@
+# benchmarks/bench_ai_client_pooling.py
+# 로컬 모의 서버(modules/mock_potens_server.py)를 대상으로 커넥션 풀(keep-alive) 사용 여부에 따른 호출당 지연 시간을 비교합니다.
+# 실행 (저장소 루트에서):
+#   python -m benchmarks.bench_ai_client_pooling --calls 200
+
+import argparse
+import json
+import statistics
+import time
+
+import requests
+
+from modules import ai_service
+from modules.mock_potens_server import MockPotensConfig, start_mock_server
+
+
+def _measure(call, n: int) -> list[float]:
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _report(label: str, latencies: list[float]):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<24} mean={statistics.mean(latencies):7.3f}ms  p50={statistics.median(latencies):7.3f}ms  p95={p95:7.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AIClient 커넥션 풀링 벤치마크")
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    server = start_mock_server(config=MockPotensConfig(latency_ms=0))
+    endpoint = server.endpoint
+    payload = json.dumps({"prompt": "벤치마크"}, ensure_ascii=False).encode("utf-8")
+    headers = {"Authorization": "Bearer bench", "Content-Type": "application/json; charset=utf-8"}
+
+    # 풀링 없음: 기존 방식처럼 매 호출마다 모듈 레벨 requests.post 사용
+    no_pool = _measure(lambda: requests.post(endpoint, headers=headers, data=payload, timeout=300).json(), args.calls)
+
+    client = ai_service.AIClient(endpoint=endpoint)
+    pooled = _measure(lambda: client.call_raw("벤치마크", api_key="bench"), args.calls)
+    client.close()
+    server.shutdown()
+
+    print(f"calls={args.calls} endpoint={endpoint}")
+    _report("requests.post (no pool)", no_pool)
+    _report("AIClient (pooled)", pooled)
+
+
+if __name__ == "__main__":
+    main()
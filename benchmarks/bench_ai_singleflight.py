@@ -0,0 +1,47 @@
+# benchmarks/bench_ai_singleflight.py
+# 동일 프롬프트 50건을 동시에 호출했을 때 업스트림 요청이 정확히 1건만 발생하는지 확인합니다.
+# 실행 (저장소 루트에서):
+#   python -m benchmarks.bench_ai_singleflight --concurrency 50
+
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from modules import ai_service
+from modules.mock_potens_server import MockPotensConfig, start_mock_server, canned_text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="동일 프롬프트 in-flight 병합 검증")
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    # 동시 호출이 겹치도록 응답을 300ms 지연
+    server = start_mock_server(config=MockPotensConfig(latency_ms=300))
+    ai_service.configure_default_client(endpoint=server.endpoint)
+    expected = canned_text(ai_service.build_article_summary_prompt("제목", "https://example.com", "2025-01-01", "미리보기"))
+
+    barrier = threading.Barrier(args.concurrency)
+
+    def call(_):
+        barrier.wait() # 모든 스레드가 동시에 출발하도록
+        return ai_service.get_article_summary("제목", "https://example.com", "2025-01-01", "미리보기", api_key="bench")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(call, range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    upstream = server.stats()["request_count"]
+    print(f"callers={args.concurrency} upstream_requests={upstream} distinct_results={len(set(results))} elapsed={elapsed:.3f}s")
+    if upstream != 1 or results.count(expected) != args.concurrency:
+        print("FAIL: 동일 프롬프트 호출이 하나의 업스트림 요청으로 병합되지 않았습니다.")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
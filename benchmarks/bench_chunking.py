@@ -0,0 +1,141 @@
+# benchmarks/bench_chunking.py
+# 문서 청크 분할 시간 비교: 호출마다 tiktoken 인코더를 가져오던 기존 길이 함수 vs 공유 인코더 + 캐시(document_processor.tiktoken_len)
+# vs 페이지를 한 번만 토큰화하는 토큰 위치 분할(document_processor.split_text_by_tokens).
+# 캐시 적용 전후 분할 결과가 동일한지, 토큰 분할 청크가 같은 크기 규칙(900토큰 이하, 100토큰 이하 겹침)을 지키고
+# 페이지 내용을 빠짐없이 포함하는지 확인합니다.
+# 실행 (저장소 루트에서):
+#   python -m benchmarks.bench_chunking --pdf 약관.pdf
+#   python -m benchmarks.bench_chunking --pages 200   (PDF가 없으면 약관 형태의 합성 문서 사용)
+
+import argparse
+import random
+import sys
+import time
+
+import tiktoken
+from langchain.docstore.document import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from modules import document_processor
+
+_SENTENCES = [
+    "회사는 피보험자가 피보험자동차를 소유, 사용, 관리하는 동안에 생긴 사고로 인하여 손해를 보상합니다.",
+    "보험계약자는 보험기간 중 피보험자동차의 용도를 변경한 경우 지체 없이 회사에 알려야 합니다.",
+    "다음 중 어느 하나에 해당하는 손해는 보상하지 않습니다.",
+    "자율주행 기능을 사용하는 중 발생한 사고에 대하여는 별도의 특별약관에서 정한 바에 따릅니다.",
+    "이 특별약관에서 정하지 않은 사항은 보통약관을 따릅니다.",
+]
+
+
+def _baseline_tiktoken_len(text):
+    """변경 전 구현: 호출마다 인코더를 가져옴."""
+    tokenizer = tiktoken.get_encoding("cl100k_base")
+    return len(tokenizer.encode(text))
+
+
+def synthetic_pages(n_pages: int) -> list[Document]:
+    rng = random.Random(0)
+    pages = []
+    for page in range(n_pages):
+        paragraphs = []
+        for article in range(4):
+            body = " ".join(rng.choice(_SENTENCES) for _ in range(rng.randint(4, 9)))
+            paragraphs.append(f"제{page * 4 + article + 1}조(보상하는 손해)\n① {body}\n② {rng.choice(_SENTENCES)}")
+        pages.append(Document(page_content="\n\n".join(paragraphs), metadata={"source": "synthetic.pdf", "page": page}))
+    return pages
+
+
+def load_pages(args) -> list[Document]:
+    if args.pdf:
+        from langchain.document_loaders import PyPDFLoader
+        return PyPDFLoader(args.pdf).load()
+    return synthetic_pages(args.pages)
+
+
+def _split(pages: list[Document], length_function):
+    splitter = RecursiveCharacterTextSplitter(chunk_size=900, chunk_overlap=100, length_function=length_function)
+    start = time.perf_counter()
+    chunks = splitter.split_documents(pages)
+    return chunks, time.perf_counter() - start
+
+
+def _token_split(pages: list[Document]):
+    start = time.perf_counter()
+    chunks = [(page_index, piece) for page_index, page in enumerate(pages)
+              for piece in document_processor.split_text_by_tokens(page.page_content)]
+    return chunks, time.perf_counter() - start
+
+
+def _check_token_chunks(pages: list[Document], chunks: list[tuple]) -> list[str]:
+    """크기/겹침 규칙과 페이지 내용 포함 여부를 확인하고 위반 내용을 반환합니다."""
+    problems = []
+    covered, previous = {}, {}
+    for page_index, piece in chunks:
+        text = pages[page_index].page_content
+        tokens = document_processor.tiktoken_len(piece)
+        if tokens > document_processor.CHUNK_SIZE:
+            problems.append(f"page {page_index}: 청크 {tokens}토큰 > {document_processor.CHUNK_SIZE}")
+        position = text.find(piece, max(0, previous.get(page_index, (0, 0))[0]))
+        if position < 0:
+            problems.append(f"page {page_index}: 청크가 원문에서 발견되지 않음")
+            continue
+        prev_start, prev_end = previous.get(page_index, (0, 0))
+        if page_index in previous and position < prev_end:
+            overlap = document_processor.tiktoken_len(text[position:prev_end])
+            if overlap > document_processor.CHUNK_OVERLAP + 2: # 경계 토큰 차이 허용
+                problems.append(f"page {page_index}: 겹침 {overlap}토큰 > {document_processor.CHUNK_OVERLAP}")
+        if text[covered.get(page_index, 0):position].strip():
+            problems.append(f"page {page_index}: 청크 사이에 누락된 내용")
+        covered[page_index] = max(covered.get(page_index, 0), position + len(piece))
+        previous[page_index] = (position, position + len(piece))
+    return problems
+
+
+def _size_stats(sizes: list[int]) -> str:
+    return f"chunks={len(sizes)} mean={sum(sizes) / len(sizes):.0f} min={min(sizes)} max={max(sizes)} tokens"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="청크 분할 길이 함수 벤치마크")
+    parser.add_argument("--pdf", help="측정할 PDF 경로 (없으면 합성 문서)")
+    parser.add_argument("--pages", type=int, default=200)
+    args = parser.parse_args()
+
+    pages = load_pages(args)
+    baseline_chunks, baseline_seconds = _split(pages, _baseline_tiktoken_len)
+    document_processor.tiktoken_len.cache_clear()
+    cached_chunks, cached_seconds = _split(pages, document_processor.tiktoken_len)
+
+    start = time.perf_counter()
+    document_processor.tiktoken_len_batch([chunk.page_content for chunk in cached_chunks])
+    batch_seconds = time.perf_counter() - start
+
+    token_chunks, token_seconds = _token_split(pages)
+
+    print(f"pages={len(pages)} chunks={len(cached_chunks)}")
+    print(f"{'baseline (get_encoding per call)':<36} {baseline_seconds:8.3f}s")
+    print(f"{'shared encoder + lru cache':<36} {cached_seconds:8.3f}s  ({baseline_seconds / cached_seconds:.1f}x)")
+    print(f"{'token-offset chunker':<36} {token_seconds:8.3f}s  ({baseline_seconds / token_seconds:.1f}x)")
+    print(f"{'token_count metadata (batch)':<36} {batch_seconds:8.3f}s")
+    print(f"tiktoken_len cache: {document_processor.tiktoken_len.cache_info()}")
+    print(f"recursive: {_size_stats(document_processor.tiktoken_len_batch([c.page_content for c in cached_chunks]))}")
+    print(f"token:     {_size_stats(document_processor.tiktoken_len_batch([piece for _, piece in token_chunks]))}")
+
+    failed = False
+    if [c.page_content for c in baseline_chunks] != [c.page_content for c in cached_chunks]:
+        print("FAIL: 분할 결과가 기존 구현과 다릅니다.")
+        failed = True
+    else:
+        print("OK: 분할 결과 동일")
+    problems = _check_token_chunks(pages, token_chunks)
+    if problems:
+        print(f"FAIL: 토큰 분할 규칙 위반 {len(problems)}건, 예: {problems[:3]}")
+        failed = True
+    else:
+        print(f"OK: 토큰 분할 청크 {document_processor.CHUNK_SIZE}토큰 이하, 겹침 {document_processor.CHUNK_OVERLAP}토큰 이하, 누락 없음")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# benchmarks/bench_embedding_batches.py
+# 표준 문서(약관 PDF 또는 합성 문서)의 청크 임베딩 처리량(chunks/s)을 배치 크기와 torch 스레드 수별로 비교합니다.
+# 기준선은 변경 전 방식(FAISS.from_documents → embed_documents 한 번, 기본 encode 설정)입니다.
+# 청크 임베딩 캐시를 거치지 않도록 document_processor.embed_texts를 직접 호출합니다.
+# 실행 (저장소 루트에서):
+#   python -m benchmarks.bench_embedding_batches --pdf 약관.pdf --batch-sizes 8,16,32,64,128 --threads 4
+#   python -m benchmarks.bench_embedding_batches --pages 50
+
+import argparse
+import time
+
+from benchmarks.bench_chunking import load_pages
+from modules import document_processor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 배치 크기별 처리량 벤치마크")
+    parser.add_argument("--pdf", help="측정할 PDF 경로 (없으면 합성 문서)")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--batch-sizes", default="8,16,32,64,128")
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op 스레드 수 (0이면 기본값)")
+    args = parser.parse_args()
+
+    document_processor.configure_torch_threads(args.threads)
+    chunks = document_processor.get_text_chunks(load_pages(args))
+    texts = [chunk.page_content for chunk in chunks]
+    embeddings = document_processor.get_embeddings()
+    embeddings.embed_documents(texts[:4]) # 워밍업
+
+    import torch
+    print(f"chunks={len(texts)} torch_threads={torch.get_num_threads()}")
+
+    start = time.perf_counter()
+    baseline = embeddings.client.encode([t.replace("\n", " ") for t in texts], normalize_embeddings=True)
+    baseline_seconds = time.perf_counter() - start
+    print(f"{'baseline (single encode call)':<32} {baseline_seconds:8.2f}s  {len(texts) / baseline_seconds:7.1f} chunks/s")
+
+    for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+        start = time.perf_counter()
+        vectors = document_processor.embed_texts(texts, batch_size=batch_size)
+        seconds = time.perf_counter() - start
+        max_diff = max(abs(a - b) for vector, ref in zip(vectors, baseline) for a, b in zip(vector, ref))
+        print(f"{f'batch_size={batch_size} (length sorted)':<32} {seconds:8.2f}s  {len(texts) / seconds:7.1f} chunks/s  "
+              f"max|Δ|={max_diff:.1e}")
+
+
+if __name__ == "__main__":
+    main()
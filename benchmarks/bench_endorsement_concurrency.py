@@ -0,0 +1,70 @@
+# benchmarks/bench_endorsement_concurrency.py
+# 모의 서버를 대상으로 특약 11개 섹션 생성 시간을 순차 호출(기존)과 동시 호출(ai_service.iter_concurrent_ai_calls)로 비교합니다.
+# 동시 호출 결과가 표준 섹션 순서로 합쳐지는지, 작업 스레드의 호출이 현재 실행(ai_metrics run)에 기록되는지도 확인합니다.
+# 실행 (저장소 루트에서):
+#   python -m benchmarks.bench_endorsement_concurrency --latency lognormal --latency-ms 800 --latency-spread 0.4 --concurrency 4
+
+import argparse
+import sys
+import time
+
+from modules import ai_metrics, ai_service
+from modules.mock_potens_server import LATENCY_DISTRIBUTIONS, MockPotensConfig, start_mock_server
+
+BENCH_API_KEY = "bench"
+
+
+def _prompts(tag: str) -> dict:
+    # 두 방식이 같은 프롬프트를 공유하지 않도록 (요청 병합 방지) 태그를 붙임
+    return {title: ai_service.build_endorsement_section_prompt(title, question, f"표준약관 관련 조항 ({tag})")
+            for title, question in ai_service.ENDORSEMENT_SECTIONS.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="특약 섹션 동시 생성 벤치마크")
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--latency-spread", type=float, default=0.4)
+    parser.add_argument("--concurrency", type=int, default=ai_service.ENDORSEMENT_CONCURRENCY)
+    parser.add_argument("--min-start-interval", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = start_mock_server(config=MockPotensConfig(latency=args.latency, latency_ms=args.latency_ms,
+                                                       latency_spread=args.latency_spread, seed=0))
+    ai_service.configure_default_client(endpoint=server.endpoint)
+    titles = list(ai_service.ENDORSEMENT_SECTIONS)
+
+    start = time.perf_counter()
+    sequential = {title: ai_service.retry_ai_call(prompt, BENCH_API_KEY, call_site="endorsement_section")
+                  for title, prompt in _prompts("sequential").items()}
+    sequential_seconds = time.perf_counter() - start
+
+    ai_run = ai_metrics.start_run("bench_endorsement")
+    start = time.perf_counter()
+    completion_order, answers = [], {}
+    for title, response_dict in ai_service.iter_concurrent_ai_calls(
+        _prompts("concurrent"), BENCH_API_KEY, max_concurrency=args.concurrency,
+        min_start_interval=args.min_start_interval, call_site="endorsement_section"
+    ):
+        completion_order.append(title)
+        answers[title] = ai_service.clean_ai_response_text(response_dict.get("text", response_dict.get("error", "")))
+    concurrent_seconds = time.perf_counter() - start
+    metrics_summary = ai_metrics.finish_run(ai_run, persist=False)
+    server.shutdown()
+
+    full_text = ai_service.format_endorsement_text(answers, titles)
+    print(f"sections={len(titles)} latency={args.latency}/{args.latency_ms}ms concurrency={args.concurrency}")
+    print(f"{'sequential':<12} {sequential_seconds:7.2f}s  failures={sum('error' in r for r in sequential.values())}")
+    print(f"{'concurrent':<12} {concurrent_seconds:7.2f}s  ({sequential_seconds / concurrent_seconds:.1f}x)")
+    print(f"completion order: {[t.split('.')[0] for t in completion_order]}")
+    print(f"run records: {metrics_summary[0]['호출 수'] if metrics_summary else 0}")
+
+    headers = [line[5:] for line in full_text.splitlines() if line.startswith("#### ")]
+    if headers != titles or not metrics_summary or metrics_summary[0]["호출 수"] != len(titles):
+        print("FAIL: 섹션 순서 또는 실행 기록이 올바르지 않습니다.")
+        sys.exit(1)
+    print("OK: 표준 섹션 순서 유지, 모든 호출이 실행에 기록됨")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_faiss_index_types.py
+# FAISS 인덱스 종류(flat / ivf_flat / ivf_pq / sq8)별 학습·추가 시간, 인덱스 크기, 질의 지연, recall@k를 비교합니다.
+# 정답은 flat(정확 검색) 결과이며, IVF 계열은 nprobe를 바꿔 가며 recall과 지연의 절충을 측정합니다.
+# 벡터는 ko-sroberta 임베딩과 같은 768차원 정규화 벡터를 군집 구조로 합성하거나 (--chunks),
+# 임베딩 캐시 파일(embedding_cache/<모델>/vectors.f16)에서 실제 청크 임베딩을 읽습니다 (--from-cache).
+# 실행 (저장소 루트에서):
+#   python -m benchmarks.bench_faiss_index_types --chunks 200000 --queries 500 --nprobe 1,4,16,64
+#   python -m benchmarks.bench_faiss_index_types --from-cache --types ivf_flat,ivf_pq --nlist 512
+
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from modules import document_processor, embedding_cache
+
+
+def _synthetic_vectors(n: int, dim: int, clusters: int, rng) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _cached_vectors() -> np.ndarray:
+    cache = embedding_cache.get_embedding_cache(document_processor.EMBEDDING_MODEL_NAME)
+    stats = cache.stats()
+    if not stats["rows"]:
+        raise SystemExit("임베딩 캐시가 비어 있습니다. 먼저 문서를 처리하세요.")
+    return np.memmap(cache.vectors_path, dtype=np.float16, mode="r", shape=(stats["rows"], stats["dim"])).astype(np.float32)
+
+
+def _index_bytes(index) -> int:
+    return len(faiss.serialize_index(index))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FAISS 인덱스 종류별 recall/지연 벤치마크")
+    parser.add_argument("--chunks", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--clusters", type=int, default=2000)
+    parser.add_argument("--from-cache", action="store_true", help="합성 벡터 대신 청크 임베딩 캐시 사용")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--types", default="ivf_flat,ivf_pq,sq8")
+    parser.add_argument("--nlist", type=int, default=document_processor.FAISS_INDEX_PARAMS["nlist"])
+    parser.add_argument("--pq-m", type=int, default=document_processor.FAISS_INDEX_PARAMS["pq_m"])
+    parser.add_argument("--nprobe", default="1,4,16,64")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = _cached_vectors() if args.from_cache else _synthetic_vectors(args.chunks, args.dim, args.clusters, rng)
+    # 질의: 색인된 벡터에 잡음을 더한 것 (실제 질문은 특정 청크 근처에 위치)
+    queries = vectors[rng.choice(len(vectors), args.queries, replace=False)] + 0.05 * rng.standard_normal((args.queries, vectors.shape[1])).astype(np.float32)
+    queries = np.ascontiguousarray(queries / np.linalg.norm(queries, axis=1, keepdims=True), dtype=np.float32)
+
+    flat = document_processor.build_faiss_index(vectors, document_processor.faiss_index_config("flat"))
+    flat.add(vectors)
+    start = time.perf_counter()
+    _, truth = flat.search(queries, args.k)
+    flat_ms = (time.perf_counter() - start) * 1000 / args.queries
+    print(f"vectors={len(vectors)} dim={vectors.shape[1]} queries={args.queries} k={args.k}")
+    print(f"{'type':<10} {'nprobe':>6} {'build(s)':>9} {'size(MB)':>9} {'ms/query':>9} {'recall@k':>9}")
+    print(f"{'flat':<10} {'-':>6} {'-':>9} {_index_bytes(flat) / 2**20:9.1f} {flat_ms:9.3f} {1.0:9.3f}")
+
+    for index_type in args.types.split(","):
+        config = document_processor.faiss_index_config(index_type, {"nlist": args.nlist, "pq_m": args.pq_m})
+        start = time.perf_counter()
+        index = document_processor.build_faiss_index(vectors, config)
+        index.add(vectors)
+        build_seconds = time.perf_counter() - start
+        size_mb = _index_bytes(index) / 2**20
+        nprobes = [int(n) for n in args.nprobe.split(",")] if isinstance(index, faiss.IndexIVF) else [None]
+        for nprobe in nprobes:
+            if nprobe is not None:
+                document_processor.apply_search_params(index, {"nprobe": nprobe})
+            start = time.perf_counter()
+            _, found = index.search(queries, args.k)
+            ms = (time.perf_counter() - start) * 1000 / args.queries
+            recall = np.mean([len(set(f) & set(t)) / args.k for f, t in zip(found, truth)])
+            print(f"{index_type:<10} {nprobe if nprobe is not None else '-':>6} {build_seconds:9.1f} {size_mb:9.1f} {ms:9.3f} {recall:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
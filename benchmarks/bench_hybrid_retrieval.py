@@ -0,0 +1,67 @@
+# benchmarks/bench_hybrid_retrieval.py
+# QA 검색 recall@k와 질의당 지연 시간을 밀집 검색(기존 FAISS similarity)과 하이브리드(BM25 + FAISS, RRF, 선택적 MMR)로 비교합니다.
+# --pdf를 주면 표준약관용 레이블 세트(benchmarks/data/retrieval_recall_set.json)로 측정하고,
+# 없으면 합성 약관 문서와 조문 번호 질의("제N조 ...")를 자동 생성해 측정합니다.
+# 정답 판정: 상위 k개 청크 중 하나라도 expected 문자열 중 하나를 포함하면 적중.
+# 실행 (저장소 루트에서):
+#   python -m benchmarks.bench_hybrid_retrieval --pdf 자동차보험_표준약관.pdf --k 3
+#   python -m benchmarks.bench_hybrid_retrieval --pages 100
+
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+
+from benchmarks.bench_chunking import load_pages
+from modules import document_processor
+
+RECALL_SET_PATH = os.path.join(os.path.dirname(__file__), "data", "retrieval_recall_set.json")
+
+
+def _synthetic_recall_set(chunks, n: int = 30) -> list[dict]:
+    articles = sorted({match for chunk in chunks for match in document_processor.ARTICLE_PATTERN.findall(chunk.page_content)})
+    rng = random.Random(0)
+    return [{"question": f"{article}에서 정한 보상 내용을 알려줘", "expected": [f"{article}("]}
+            for article in rng.sample(articles, min(n, len(articles)))]
+
+
+def _measure(name: str, search, recall_set: list[dict], k: int):
+    hits, latencies = 0, []
+    for item in recall_set:
+        start = time.perf_counter()
+        docs = search(item["question"])[:k]
+        latencies.append((time.perf_counter() - start) * 1000)
+        if any(expected in doc.page_content for doc in docs for expected in item["expected"]):
+            hits += 1
+    latencies.sort()
+    print(f"{name:<28} recall@{k}={hits / len(recall_set):.2f}  "
+          f"mean={statistics.mean(latencies):6.1f}ms  p95={latencies[max(0, int(len(latencies) * 0.95) - 1)]:6.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="하이브리드 검색 recall/지연 벤치마크")
+    parser.add_argument("--pdf", help="표준약관 PDF 경로 (없으면 합성 문서)")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    chunks = document_processor.get_text_chunks(load_pages(args))
+    vectordb = document_processor.get_vectorstore(chunks)
+    retriever = document_processor.HybridRetriever(vectordb)
+    if args.pdf:
+        with open(RECALL_SET_PATH, encoding="utf-8") as f:
+            recall_set = json.load(f)
+    else:
+        recall_set = _synthetic_recall_set(chunks)
+    document_processor.get_embeddings().embed_query("워밍업")
+
+    print(f"chunks={len(chunks)} questions={len(recall_set)}")
+    _measure("dense (similarity_search)", lambda q: vectordb.similarity_search(q, k=args.k), recall_set, args.k)
+    _measure("hybrid (BM25 + FAISS, RRF)", lambda q: retriever.retrieve(q, k=args.k), recall_set, args.k)
+    _measure("hybrid + MMR", lambda q: retriever.retrieve(q, k=args.k, mmr=True), recall_set, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# benchmarks/bench_qa_streaming.py
+# 모의 서버(SSE 스트리밍 모드)를 대상으로 QA 답변의 첫 조각까지 시간(TTFT)과 전체 응답 시간을
+# 기존 비스트리밍 호출(retry_ai_call)과 비교합니다.
+# 실행 (저장소 루트에서):
+#   python -m benchmarks.bench_qa_streaming --questions 10 --latency-ms 400 --stream-chunk-ms 30
+
+import argparse
+import statistics
+import time
+
+from modules import ai_service
+from modules.mock_potens_server import MockPotensConfig, start_mock_server
+
+BENCH_API_KEY = "bench"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="QA 스트리밍 TTFT 벤치마크")
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=400.0)
+    parser.add_argument("--stream-chunk-ms", type=float, default=30.0)
+    args = parser.parse_args()
+
+    server = start_mock_server(config=MockPotensConfig(latency_ms=args.latency_ms, stream=True, stream_chunk_ms=args.stream_chunk_ms))
+    ai_service.configure_default_client(endpoint=server.endpoint)
+
+    blocking, ttft, streamed_total = [], [], []
+    for i in range(args.questions):
+        prompt = f"다음 문서를 참고하여 질문에 답하세요. 질문 {i}"
+
+        start = time.perf_counter()
+        ai_service.retry_ai_call(prompt, BENCH_API_KEY, coalesce=False, call_site="qa")
+        blocking.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        first_chunk_at = None
+        for _ in ai_service.stream_ai_call(prompt, BENCH_API_KEY, call_site="qa"):
+            if first_chunk_at is None:
+                first_chunk_at = time.perf_counter()
+        ttft.append(first_chunk_at - start)
+        streamed_total.append(time.perf_counter() - start)
+    server.shutdown()
+
+    print(f"questions={args.questions} first_token_latency={args.latency_ms}ms chunk_interval={args.stream_chunk_ms}ms")
+    print(f"{'blocking (retry_ai_call)':<28} mean={statistics.mean(blocking):.3f}s  (답변 표시까지)")
+    print(f"{'streaming TTFT':<28} mean={statistics.mean(ttft):.3f}s  (첫 조각 표시까지)")
+    print(f"{'streaming total':<28} mean={statistics.mean(streamed_total):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
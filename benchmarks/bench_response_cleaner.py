@@ -0,0 +1,221 @@
+# benchmarks/bench_response_cleaner.py
+# 사전 컴파일/사전 필터 적용 클리너와 기존 구현의 처리 시간을 긴 보고서와 골든 코퍼스 기준으로 비교합니다.
+# 두 구현이 바이트 단위로 동일한지는 tests/test_response_cleaner.py에서 같은 기존 구현과 코퍼스로 확인합니다.
+# 실행 (저장소 루트에서):
+#   python -m benchmarks.bench_response_cleaner --cases 3000
+
+import argparse
+import random
+import re
+import time
+
+from modules import ai_service
+
+
+# --- 기준 구현 (최적화 이전 ai_service 코드 그대로) ---
+def reference_clean_prettified_report_text(text: str) -> str:
+    """
+    AI가 포맷한 보고서 텍스트에서 불필요한 AI 서두/맺음말 문구만 제거하고,
+    마크다운 포맷팅(헤더, 목록, 줄바꿈)은 최대한 유지합니다.
+    """
+    cleaned_text = text
+
+    # AI가 자주 사용하는 서두/맺음말 문구 제거 (정규표현식으로 유연하게 매칭)
+    patterns_to_remove = [
+        r'다음은 뉴스 트렌드 분석 및 보험 상품 개발 인사이트에 대한 보고서 초안을 바탕으로 재구성된 전문적인 보고서입니다[.:\s]*',
+        r'다음은 요청하신 지침에 따라 재구성된 보고서입니다[.:\s]*',
+        r'다음은 재구성된 보고서입니다[.:\s]*',
+        r'보고서:\s*',
+        r'보고서 내용:\s*',
+        r'\[보고서\]:\s*',
+        r'\[결과\]:\s*',
+        r'이상입니다[.:\s]*',
+        r'위 보고서는 제공된 정보를 바탕으로 재구성되었습니다[.:\s]*',
+        r'이 보고서가 트렌드 분석 및 보험 상품 개발에 도움이 되기를 바랍니다[.:\s]*',
+        r'이 보고서가 귀사의 비즈니스에 도움이 되기를 바랍니다[.:\s]*',
+        r'이 보고서는 제공된 초안을 바탕으로 작성되었습니다[.:\s]*',
+        r'다음은 제공된 텍스트를 바탕으로 재구성된 뉴스 트렌드 요약입니다[.:\s]*', # 추가된 패턴
+        r'다음은 제공된 텍스트를 바탕으로 재구성된 자동차 보험 산업 관련 정보입니다[.:\s]*', # 추가된 패턴
+        r'뉴스 트렌드 요약:\s*', # 추가된 패턴
+        r'자동차 보험 산업 관련 주요 사실 및 법적 책임:\s*' # 추가된 패턴
+    ]
+    for pattern in patterns_to_remove:
+        cleaned_text = re.sub(pattern, '', cleaned_text, flags=re.IGNORECASE)
+
+    # 여러 개의 공백을 하나로 대체 (줄바꿈은 유지)
+    cleaned_text = re.sub(r'[ \t]+', ' ', cleaned_text)
+    
+    # 문단 시작 부분의 불필요한 공백 제거 (줄바꿈은 유지)
+    cleaned_text = re.sub(r'^\s+', '', cleaned_text, flags=re.MULTILINE)
+
+    return cleaned_text.strip()
+
+
+
+def reference_clean_ai_response_text(text: str) -> str:
+    """
+    AI 응답 텍스트에서 불필요한 마크다운 기호, 여러 줄바꿈,
+    그리고 AI가 자주 사용하는 서두 문구들을 제거하여 평탄화합니다.
+    이 함수는 주로 요약이나 QA 답변 등 일반 텍스트 출력을 위해 사용됩니다.
+    """
+    # 1. 마크다운 코드 블록 제거 (예: ```json ... ```)
+    cleaned_text = re.sub(r'```(?:json|text)?\s*([\s\S]*?)\s*```', r'\1', text, flags=re.IGNORECASE)
+
+    # 2. 마크다운 헤더 기호 제거 (예: #, ##, ### 등) - 줄 시작에 관계없이 모든 # 제거
+    #    이전 버전에서 #+ 였으나, 이제는 #만 제거하고 +는 리스트 기호로 따로 처리
+    cleaned_text = re.sub(r'#+', '', cleaned_text)
+
+    # 3. 마크다운 볼드체/이탤릭체 기호 제거 (예: **, __, *, _) - 텍스트는 남기고 기호만 제거
+    cleaned_text = re.sub(r'\*\*(.*?)\*\*', r'\1', cleaned_text) # **text** -> text
+    cleaned_text = re.sub(r'__(.*?)__', r'\1', cleaned_text) # __text__ -> text
+    cleaned_text = re.sub(r'\*(.*?)\*', r'\1', cleaned_text) # *text* -> text
+    cleaned_text = re.sub(r'_(.*?)_', r'\1', cleaned_text) # _text_ -> text
+
+    # 4. 마크다운 리스트 기호 제거 (예: -, +) - 줄 시작에 관계없이 제거
+    #    \s*는 공백을 의미하며, 리스트 기호 뒤에 공백이 있을 수 있으므로 포함
+    cleaned_text = re.sub(r'^\s*[-+]\s*', '', cleaned_text, flags=re.MULTILINE)
+
+    # 5. 번호가 매겨진 목록 마커 제거 (예: "1.", "2.", "3.") - 줄 시작에 관계없이 제거
+    cleaned_text = re.sub(r'^\s*\d+\.\s*', '', cleaned_text, flags=re.MULTILINE)
+
+    # 6. AI가 자주 사용하는 서두 문구 제거 (정규표현식으로 유연하게 매칭)
+    patterns_to_remove = [
+        r'제공해주신\s*URL의\s*뉴스\s*기사\s*내용을\s*요약해드리겠습니다[.:\s]*',
+        r'주요\s*내용[.:\s]*',
+        r'제공해주신\s*텍스트를\s*요약\s*하겠\s*습니다[.:\s]*\s*요약[.:\s]*',
+        r'요약해\s*드리겠습니다[.:\s]*\s*주요\s*내용\s*요약[.:\s]*',
+        r'다음\s*텍스트의\s*요약입니다[.:\s]*',
+        r'주요\s*내용을\s*요약\s*하면\s*다음과\s*같습니다[.:\s]*',
+        r'핵심\s*내용은\s*다음과\s*같습니다[.:\s]*',
+        r'요약하자면[.:\s]*',
+        r'주요\s*요약[.:\s]*',
+        r'텍스트를\s*요약하면\s*다음과\s*같습니다[.:\s]*',
+        r'제공된\s*텍스트에\s*대한\s*요약입니다[.:\s]*',
+        r'다음은\s*ai가\s*내용을\s*요약한\s*것입니다[.:\s]*',
+        r'먼저\s*최신\s*정보가\s*필요합니다[.:\s]*\s*현재\s*자율주행차\s*기술과\s*관련된\s*최신\s*트렌드를\s*확인해보겠습니다[.:\s]*',
+        r'ai\s*답변[.:\s]*',
+        r'ai\s*분석[.:\s]*',
+        r'다음은\s*요청하신\s*링크의\s*본문\s*내용입니다[.:\s]*',
+        r'다음은\s*제공된\s*뉴스\s*기사의\s*핵심\s*내용입니다[.:\s]*',
+        r'뉴스\s*기사\s*주요\s*내용\s*요약[.:\s]*',
+        r'검색을\s*진행할\s*URL을\s*찾고\s*있어요[.:\s]*\s*\(1/3\)\s*제공해주신\s*URL에서\s*뉴스\s*기사의\s*주요\s*내용을\s*추출하겠습니다[.:\s]*',
+        r'검색을\s*진행할\s*URL을\s*찾았습니다[.:\s]*\s*\(1/3\)\s*해당\s*링크에서\s*뉴스\s*기사의\s*핵심\s*내용을\s*추출하겠습니다[.:\s]*',
+        r'검색을\s*진행할\s*URL을\s*찾고\s*있어요[.:\s]*\s*\(1/3\)\s*제공해주신\s*링크에서\s*기사\s*내용을\s*추출하겠습니다[.:\s]*',
+        r'검색을\s*진행할\s*URL을\s*찾고\s*있어요[.:\s]*\s*\(1/3\)\s*해당\s*URL에서\s*뉴스\s*기사의\s*주요\s*내용을\s*추출하겠습니다[.:\s]*',
+        r'검색을\s*진행할\s*URL을\s*찾고\s*있어요[.:\s]*\s*\(1/3\)\s*URL을\s*검색하여\s*기사\s*내용을\s*확인하겠습니다[.:\s]*\s*검색\s*결과를\s*바탕으로\s*다음과\s*같이\s*기사의\s*핵심\s*내용만\s*추출했습니다[.:\s]*',
+        r'검색을\s*진행할\s*URL을\s*찾고\s*있어요[.:\s]*\s*\(1/3\)\s*해당\s*URL에서\s*기사\s*내용을\s*확인하겠습니다[.:\s]*\s*기사의\s*주요\s*내용을\s*추출했습니다[.:\s]*',
+        r'검색을\s*진행할\s*URL을\s*찾고\s*있어요[.:\s]*\s*\(1/3\)\s*웹사이트의\s*내용을\s*확인하겠습니다[.:\s]*\s*기사의\s*주요\s*내용을\s*광고나\s*불필요한\s*정보\s*없이\s*추출해\s*드리겠습니다[.:\s]*',
+        r'이상입니다[.:\s]*',
+        r'이상입니다[.:\s]*\s*광고나\s*불필요한\s*정보는\s*제외하고\s*주요\s*내용만\s*추출했습니다[.:\s]*',
+        r'이것이\s*제공해주신\s*YTN\s*뉴스\s*링크에서\s*추출한\s*핵심\s*기사\s*내용입니다[.:\s]*\s*광고나\s*불필요한\s*정보는\s*제외하고\s*기사의\s*주요\s*내용만\s*추출했습니다[.:\s]*',
+        r'위\s*내용은\s*제공해주신\s*URL에서\s*추출한\s*기사의\s*핵심\s*내용입니다[.:\s]*\s*광고나\s*불필요한\s*정보를\s*제거하고\s*주요\s*내용만\s*정리했습니다[.:\s]*',
+        r'제공해주신\s*링크\(https?://[^\s]+\)\s*는\s*연합뉴스의\s*사진\s*기사로,\s*\d{4}년\s*\d{1,2}월\s*\d{1,2}일에\s*게시된\s*내용입니다[.:\s]*\s*기사\s*제목:\s*""[^""]+""\s*핵심\s*내용:[.:\s]*',
+    ]
+    for pattern in patterns_to_remove:
+        cleaned_text = re.sub(pattern, '', cleaned_text, flags=re.IGNORECASE)
+
+    # 7. 줄바꿈 및 공백 정규화
+    #    두 개 이상의 줄바꿈은 단락 구분으로 유지
+    cleaned_text = re.sub(r'\n{2,}', '\n\n', cleaned_text)
+    #    단일 줄바꿈은 공백으로 처리 (긴 줄 방지 및 자연스러운 흐름)
+    cleaned_text = re.sub(r'\n', ' ', cleaned_text)
+    #    여러 공백을 하나로, 앞뒤 공백 제거
+    cleaned_text = re.sub(r'\s+', ' ', cleaned_text).strip()
+
+    return cleaned_text
+
+
+# --- 골든 코퍼스 생성 ---
+_PREAMBLE_SAMPLES = [
+    "제공해주신 URL의 뉴스 기사 내용을 요약해드리겠습니다.", "주요 내용:", "주요내용", "제공해주신 텍스트를 요약 하겠 습니다. 요약:",
+    "요약해 드리겠습니다. 주요 내용 요약:", "다음 텍스트의 요약입니다:", "주요 내용을 요약 하면 다음과 같습니다.",
+    "핵심 내용은 다음과 같습니다:", "요약하자면,", "주요 요약:", "텍스트를 요약하면 다음과 같습니다.", "제공된 텍스트에 대한 요약입니다.",
+    "다음은 AI가 내용을 요약한 것입니다.", "먼저 최신 정보가 필요합니다. 현재 자율주행차 기술과 관련된 최신 트렌드를 확인해보겠습니다.",
+    "AI 답변:", "Ai 분석.", "다음은 요청하신 링크의 본문 내용입니다:", "다음은 제공된 뉴스 기사의 핵심 내용입니다.",
+    "뉴스 기사 주요 내용 요약:", "검색을 진행할 URL을 찾고 있어요. (1/3) 제공해주신 URL에서 뉴스 기사의 주요 내용을 추출하겠습니다.",
+    "검색을 진행할 URL을 찾았습니다. (1/3) 해당 링크에서 뉴스 기사의 핵심 내용을 추출하겠습니다.",
+    "검색을 진행할 URL을 찾고 있어요 (1/3) URL을 검색하여 기사 내용을 확인하겠습니다. 검색 결과를 바탕으로 다음과 같이 기사의 핵심 내용만 추출했습니다:",
+    "이상입니다.", "이상입니다. 광고나 불필요한 정보는 제외하고 주요 내용만 추출했습니다.",
+    "이것이 제공해주신 YTN 뉴스 링크에서 추출한 핵심 기사 내용입니다. 광고나 불필요한 정보는 제외하고 기사의 주요 내용만 추출했습니다.",
+    "위 내용은 제공해주신 URL에서 추출한 기사의 핵심 내용입니다. 광고나 불필요한 정보를 제거하고 주요 내용만 정리했습니다.",
+    "제공해주신 링크(https://example.com/a)는 연합뉴스의 사진 기사로, 2025년 1월 2일에 게시된 내용입니다. 기사 제목: \"\"자율주행\"\" 핵심 내용:",
+    "다음은 요청하신 지침에 따라 재구성된 보고서입니다.", "다음은 재구성된 보고서입니다:", "보고서:", "보고서 내용: ", "[보고서]: ", "[결과]:",
+    "위 보고서는 제공된 정보를 바탕으로 재구성되었습니다.", "이 보고서가 귀사의 비즈니스에 도움이 되기를 바랍니다.",
+    "뉴스 트렌드 요약:", "자동차 보험 산업 관련 주요 사실 및 법적 책임:",
+    "다음은 제공된 텍스트를 바탕으로 재구성된 뉴스 트렌드 요약입니다.",
+]
+_BODY_SAMPLES = [
+    "전기차 보조금 정책이 **대폭 변경**되었습니다.", "자율주행 *레벨 3* 차량의 사고 책임 논란이 커지고 있다.",
+    "__고령 운전자__ 사고가 증가했다.", "보험료_할인_특약 검토", "# 개요", "## 주요 동향", "### 세부 사항",
+    "- 첫째 항목", "+ 둘째 항목", "  - 들여쓴 항목", "1. 번호 목록", "12. 두 자리 번호", "3.5% 증가",
+    "```json\n{\"a\": 1}\n```", "```text 코드 블록 ```", "URL: https://news.example.com/a_b_c",
+    "주요 내용은 아래와 같습니다", "AI 분석 결과에 따르면", "이상입니다만 추가로", "E-mail: a-b@c.com",
+    "제12조 (보상하지 않는 손해)", "면책 사항: 음주운전", "Ai답변 AI  분석", "ＡＩ 답변",
+]
+_SPACES = [" ", "  ", "\n", "\n\n", "\n\n\n", "\t", " \n ", "\r\n", "\u3000", "\xa0", "\x1c", "\x85", "\u2028", ""]
+
+
+def build_golden_corpus(n: int, seed: int = 20250101) -> list[str]:
+    rng = random.Random(seed)
+    pieces = _PREAMBLE_SAMPLES + _BODY_SAMPLES
+    corpus = [s for s in pieces] + [""]
+    for _ in range(n):
+        parts = []
+        for _ in range(rng.randint(1, 25)):
+            piece = rng.choice(pieces)
+            if rng.random() < 0.2:
+                piece = piece.upper() if rng.random() < 0.5 else piece.lower()
+            if rng.random() < 0.15: # 공백 변형
+                piece = re.sub(r" ", lambda m: rng.choice(_SPACES), piece)
+            parts.append(piece)
+            parts.append(rng.choice(_SPACES))
+        corpus.append("".join(parts))
+    return corpus
+
+
+def build_long_report(rng: random.Random, paragraphs: int = 400) -> str:
+    lines = ["# 뉴스 트렌드 분석 보고서", "다음은 재구성된 보고서입니다.", ""]
+    for i in range(paragraphs):
+        lines.append(f"## {i+1}. 섹션")
+        lines.append(f"- **{rng.choice(_BODY_SAMPLES)}** {rng.choice(_BODY_SAMPLES)}")
+        lines.append(f"{i+1}. {rng.choice(_BODY_SAMPLES)} " * 3)
+        lines.append("")
+    lines.append("이상입니다.")
+    return "\n".join(lines)
+
+
+def _time(fn, texts: list[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - start) / (repeat * len(texts)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="응답 클리너 벤치마크")
+    parser.add_argument("--cases", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = build_golden_corpus(args.cases)
+    pairs = [
+        ("clean_ai_response_text", reference_clean_ai_response_text, ai_service.clean_ai_response_text),
+        ("clean_prettified_report_text", reference_clean_prettified_report_text, ai_service.clean_prettified_report_text),
+    ]
+    print(f"golden corpus: {len(corpus)} cases (동일성 검증: python -m pytest tests/test_response_cleaner.py)")
+
+    rng = random.Random(7)
+    long_reports = [build_long_report(rng) for _ in range(10)]
+    print(f"long report size: ~{len(long_reports[0]):,} chars")
+    for name, reference, optimized in pairs:
+        ref_ms = _time(reference, long_reports, args.repeat)
+        opt_ms = _time(optimized, long_reports, args.repeat)
+        print(f"{name:<30} reference={ref_ms:8.3f}ms  optimized={opt_ms:8.3f}ms  speed-up={ref_ms / opt_ms:5.2f}x")
+        ref_ms = _time(reference, corpus, 1)
+        opt_ms = _time(optimized, corpus, 1)
+        print(f"{'  (golden corpus, per text)':<30} reference={ref_ms:8.3f}ms  optimized={opt_ms:8.3f}ms  speed-up={ref_ms / opt_ms:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/bench_trend_pipeline_mock.py
+# 모의 Potens.dev 서버를 띄우고 트렌드 분석 파이프라인(modules/pipeline.py)의 AI 단계 전체(키워드 선별 → 기사 요약 →
+# 트렌드 요약/보험 영향 분석 + 마크다운 포맷팅 → 보고서 구성)를 실제 API 키/네트워크 없이 끝까지 실행합니다.
+# 뉴스 수집과 실제 트렌드 분석까지 포함한 실행은 python -m modules.pipeline run --json 으로 측정합니다.
+# 지연 분포와 오류/429 주입을 바꿔 가며 재시도·서킷 브레이커 동작과 전체 소요 시간을 확인할 수 있습니다.
+# 실행 (저장소 루트에서):
+#   python -m benchmarks.bench_trend_pipeline_mock --articles 10 --latency lognormal --latency-ms 200 --latency-spread 0.5 --error-rate 0.1
+
+import argparse
+import time
+from datetime import datetime
+
+from modules import ai_metrics, ai_service, pipeline
+from modules.mock_potens_server import LATENCY_DISTRIBUTIONS, MockPotensConfig, start_mock_server
+
+BENCH_API_KEY = "bench"
+
+
+def _synthetic_articles(n: int) -> list[dict]:
+    return [
+        {"제목": f"자동차 보험 동향 기사 {i}", "링크": f"https://example.com/news/{i}",
+         "날짜": datetime(2025, 1, i % 28 + 1), "내용": f"전기차와 자율주행 관련 보험 이슈 미리보기 {i}"}
+        for i in range(n)
+    ]
+
+
+def _timed(timings: dict, stage: str, fn, *args, **kwargs):
+    start = time.perf_counter()
+    value = fn(*args, **kwargs)
+    timings[stage] = time.perf_counter() - start
+    return value
+
+
+def run_trend_pipeline(articles: list[dict], structured: bool = True) -> dict:
+    """
+    pipeline 모듈의 AI 단계(키워드 선별 → 기사 요약 → 인사이트 → 보고서 구성)를 수집/트렌드 분석 없이 실행하고 단계별 소요 시간을 기록합니다.
+    structured=False면 인사이트 단계를 기존 단계별 호출(트렌드 요약 → 보험 영향 → 각각 포맷팅)로 실행합니다.
+    """
+    timings = {}
+    retry_kwargs = {"max_attempts": 3, "delay_seconds": 2}
+    reporter = pipeline.PipelineReporter()
+
+    keywords_data = [{"keyword": f"키워드{i}", "recent_freq": 10 - i, "past_freq": 1, "surge_ratio": 10.0 - i} for i in range(8)]
+    selection = _timed(timings, "select_keywords", pipeline.select_keywords, keywords_data, BENCH_API_KEY, reporter, **retry_kwargs)
+    summaries = _timed(timings, "summarize", pipeline.summarize_articles, articles, BENCH_API_KEY, reporter, **retry_kwargs)
+    insights = _timed(timings, "insights", pipeline.derive_insights, summaries.articles, BENCH_API_KEY, reporter,
+                      structured=structured, **retry_kwargs)
+    timings[f"insights ({insights.mode})"] = timings.pop("insights")
+    report = _timed(timings, "format", pipeline.build_report, insights, selection.selected_keywords, summaries.articles)
+
+    return {
+        "timings": timings,
+        "keywords": [kw["keyword"] for kw in selection.selected_keywords],
+        "failed_summaries": sum(1 for a in summaries.articles if "최종 실패" in a["내용"]),
+        "circuit_open": summaries.circuit_open,
+        "report_chars": len(report),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모의 서버 대상 트렌드 분석 AI 파이프라인 종단 간 벤치마크")
+    parser.add_argument("--articles", type=int, default=10)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--latency-spread", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chain", action="store_true", help="인사이트 단계를 구조화 호출 대신 기존 단계별 호출로 실행")
+    args = parser.parse_args()
+
+    server = start_mock_server(config=MockPotensConfig(
+        latency=args.latency, latency_ms=args.latency_ms, latency_spread=args.latency_spread,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed
+    ))
+    ai_service.configure_default_client(endpoint=server.endpoint)
+
+    ai_run = ai_metrics.start_run("bench_trend_pipeline")
+    start = time.perf_counter()
+    result = run_trend_pipeline(_synthetic_articles(args.articles), structured=not args.chain)
+    total = time.perf_counter() - start
+    metrics_summary = ai_metrics.finish_run(ai_run, persist=False)
+    server.shutdown()
+
+    stats = server.stats()
+    print(f"endpoint={server.endpoint} articles={args.articles} latency={args.latency}/{args.latency_ms}ms")
+    for stage, seconds in result["timings"].items():
+        print(f"  {stage:<32} {seconds:8.3f}s")
+    print(f"  {'total':<32} {total:8.3f}s")
+    print(f"upstream_requests={stats['request_count']} status_counts={stats['status_counts']} "
+          f"failed_summaries={result['failed_summaries']} circuit_open={result['circuit_open']} "
+          f"keywords={result['keywords']} report_chars={result['report_chars']}")
+    print(f"circuit_breaker={ai_service.get_circuit_breaker_metrics()}")
+    print("per call site:")
+    for row in metrics_summary:
+        print("  " + "  ".join(f"{key}={value}" for key, value in row.items()))
+
+
+if __name__ == "__main__":
+    main()
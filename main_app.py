@@ -11,15 +11,25 @@ from loguru import logger # 로깅을 위해 필요
 
 # --- 페이지 함수 임포트 (modules 디렉토리에서 직접 임포트) ---
 from modules.landing_page import landing_page
-from modules.trend_analysis_page import trend_analysis_page
+from modules.trend_analysis_page import trend_analysis_page, TREND_JOB_QUERY_PARAM
 from modules.document_analysis_page import document_analysis_page
 from modules.report_automation_page import report_automation_page # 새로 추가: 보고서 자동화 페이지
+from modules import document_processor # 임베딩 모델 사전 로드용
+from modules import job_runner # 백그라운드 작업 실행기
 
 
 # --- 환경 변수 로드 (앱 시작 시 한 번만) ---
 load_dotenv()
 POTENS_API_KEY = os.getenv("POTENS_API_KEY")
 
+# 임베딩 모델 사전 로드 (선택): EMBEDDING_WARMUP=1이면 앱 시작 시 백그라운드에서 모델을 로드하여
+# 첫 "문서 처리"의 지연을 줄입니다. 스크립트가 다시 실행되어도 한 번만 로드됩니다.
+if os.getenv("EMBEDDING_WARMUP", "").lower() in ("1", "true", "yes"):
+    document_processor.start_embedding_warmup()
+
+# 이전 서버 프로세스가 종료되며 중단된 백그라운드 작업을 실패로 정리 (프로세스당 한 번)
+job_runner.recover_interrupted_jobs()
+
 
 # --- 메인 애플리케이션 라우팅 ---
 def main_app():
@@ -34,7 +44,8 @@ def main_app():
     if "username" not in st.session_state: # 사용자 이름은 환영 메시지를 위해 유지
         st.session_state.username = "사용자" # 기본 사용자 이름 설정 (로그인 제거)
     if "page" not in st.session_state:
-        st.session_state.page = "landing" # 앱 시작 시 기본 페이지를 랜딩으로 고정
+        # 앱 시작 시 기본 페이지는 랜딩. 주소에 트렌드 분석 작업 ID가 있으면(분석 중 새로고침) 트렌드 분석 페이지로 복귀
+        st.session_state.page = "trend" if TREND_JOB_QUERY_PARAM in st.query_params else "landing"
 
     # 라우팅 로직 (로그인 검사 없이 바로 페이지 호출)
     if st.session_state.page == "landing":
@@ -0,0 +1,238 @@
+# modules/ai_metrics.py
+# AI 호출 계측 모듈입니다.
+# 호출 지점(call site: 기사 요약, 키워드, 트렌드 요약, 보험 영향, 포맷팅, 특약 섹션, QA 등)별로
+# 요청/응답 바이트, 추정 토큰 수, 지연 시간, 재시도 횟수, 결과를 기록합니다.
+# - 프로세스 전역 히스토그램 레지스트리 (get_registry)
+# - 실행(run) 단위 수집 및 SQLite 저장 (start_run / finish_run → database_manager.save_ai_call_metrics)
+# - 실행 후 확인용 호출 지점별 요약 표 (summarize_records)
+
+import contextvars
+import math
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from modules import database_manager
+
+# 지연 시간 히스토그램 버킷 상한 (ms). 마지막 버킷 이후는 +Inf
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000, 300000)
+# 바이트/토큰 히스토그램 버킷 상한
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+def estimate_tokens(text) -> int:
+    """
+    토큰 수 추정값. UTF-8 3바이트당 1토큰으로 계산합니다
+    (한글 1글자 ≈ 1토큰, 영문은 약간 과대 추정). 호출 경로를 가볍게 유지하기 위해 토크나이저는 쓰지 않습니다.
+    """
+    if text is None:
+        return 0
+    if not isinstance(text, str):
+        text = str(text)
+    return math.ceil(len(text.encode("utf-8")) / 3)
+
+
+class Histogram:
+    """고정 버킷 히스토그램 (count/sum/min/max와 버킷 보간 분위수)."""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        index = len(self.buckets)
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q: float) -> float | None:
+        """q(0~1) 분위수 추정값. 해당 버킷 안에서 선형 보간하며 min/max 범위로 제한합니다."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                estimate = lower + (upper - lower) * ((rank - seen) / bucket_count)
+                return min(max(estimate, self.min), self.max)
+            seen += bucket_count
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "buckets": dict(zip([*map(str, self.buckets), "+Inf"], self.counts)),
+        }
+
+
+class MetricsRegistry:
+    """
+    프로세스 전역 지표 레지스트리 (스레드 안전).
+    히스토그램/카운터는 (지표 이름, call site) 단위로 보관하고,
+    게이지는 조회 시점에 값을 계산하는 함수로 등록합니다 (예: 서킷 브레이커 상태).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+
+    def observe(self, name: str, call_site: str, value: float, buckets: tuple = LATENCY_BUCKETS_MS):
+        with self._lock:
+            histogram = self._histograms.get((name, call_site))
+            if histogram is None:
+                histogram = self._histograms[(name, call_site)] = Histogram(buckets)
+            histogram.observe(value)
+
+    def increment(self, name: str, call_site: str, amount: int = 1):
+        with self._lock:
+            self._counters[(name, call_site)] = self._counters.get((name, call_site), 0) + amount
+
+    def register_gauge(self, name: str, fn):
+        """조회 시 fn()의 결과를 name으로 노출합니다. 같은 이름으로 다시 등록하면 교체됩니다."""
+        with self._lock:
+            self._gauges[name] = fn
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            histograms = {f"{name}{{call_site={site}}}": h.snapshot() for (name, site), h in self._histograms.items()}
+            counters = {f"{name}{{call_site={site}}}": value for (name, site), value in self._counters.items()}
+            gauges = dict(self._gauges)
+        return {
+            "histograms": histograms,
+            "counters": counters,
+            "gauges": {name: fn() for name, fn in gauges.items()},
+        }
+
+    def reset(self):
+        """히스토그램과 카운터를 비웁니다 (게이지 등록은 유지)."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+_registry = MetricsRegistry()
+
+def get_registry() -> MetricsRegistry:
+    return _registry
+
+
+class AIRun:
+    """하나의 실행(트렌드 분석, 예약 보고서 생성 등) 동안 발생한 AI 호출 기록 모음."""
+
+    def __init__(self, name: str):
+        self.run_id = f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.name = name
+        self.started_at = time.monotonic()
+        self.wall_seconds = None
+        self._lock = threading.Lock()
+        self.records = []
+
+    def add(self, record: dict):
+        with self._lock:
+            self.records.append(record)
+
+
+# 현재 실행. contextvars를 사용하므로 Streamlit 세션(스크립트 스레드)별로, asyncio 작업에도 전파됩니다.
+_current_run = contextvars.ContextVar("ai_metrics_current_run", default=None)
+
+def start_run(name: str) -> AIRun:
+    """새 실행을 시작하고 이후 이 컨텍스트에서 발생하는 AI 호출을 기록합니다."""
+    run = AIRun(name)
+    _current_run.set(run)
+    return run
+
+def current_run() -> AIRun | None:
+    return _current_run.get()
+
+def finish_run(run: AIRun, persist: bool = True) -> list[dict]:
+    """실행을 종료하고 (선택적으로) 기록을 SQLite에 저장한 뒤 호출 지점별 요약 표를 반환합니다."""
+    run.wall_seconds = time.monotonic() - run.started_at
+    if _current_run.get() is run:
+        _current_run.set(None)
+    if persist and run.records:
+        database_manager.save_ai_call_metrics(run.run_id, run.name, run.records)
+    return summarize_records(run.records, run.wall_seconds)
+
+
+def record_ai_call(call_site: str, latency_seconds: float, attempts: int, outcome: str,
+                   request_bytes: int = 0, response_bytes: int = 0,
+                   prompt_tokens: int = 0, response_tokens: int = 0):
+    """
+    AI 호출 1건(재시도 포함)을 레지스트리와 현재 실행에 기록합니다.
+    outcome: 성공 시 "success", 실패 시 error_type (timeout, rate_limit, circuit_open 등)
+    """
+    latency_ms = latency_seconds * 1000
+    _registry.observe("ai_call_latency_ms", call_site, latency_ms)
+    _registry.observe("ai_call_request_bytes", call_site, request_bytes, SIZE_BUCKETS)
+    _registry.observe("ai_call_response_bytes", call_site, response_bytes, SIZE_BUCKETS)
+    _registry.observe("ai_call_tokens", call_site, prompt_tokens + response_tokens, SIZE_BUCKETS)
+    _registry.increment("ai_calls_total", call_site)
+    _registry.increment(f"ai_calls_{outcome}", call_site)
+    if attempts > 1:
+        _registry.increment("ai_call_retries_total", call_site, attempts - 1)
+
+    run = _current_run.get()
+    if run is not None:
+        run.add({
+            "call_site": call_site,
+            "started_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "latency_ms": round(latency_ms, 1),
+            "attempts": attempts,
+            "outcome": outcome,
+            "request_bytes": request_bytes,
+            "response_bytes": response_bytes,
+            "prompt_tokens": prompt_tokens,
+            "response_tokens": response_tokens,
+        })
+
+
+def summarize_records(records: list[dict], wall_seconds: float | None = None) -> list[dict]:
+    """
+    호출 기록을 호출 지점별 요약 행으로 집계합니다 (총 지연 시간 내림차순).
+    wall_seconds를 주면 각 지점의 총 지연 시간이 실행 전체 시간에서 차지하는 비율도 계산합니다.
+    """
+    by_site = {}
+    for record in records:
+        by_site.setdefault(record["call_site"], []).append(record)
+
+    rows = []
+    for call_site, site_records in by_site.items():
+        latencies = sorted(r["latency_ms"] for r in site_records)
+        total_ms = sum(latencies)
+        row = {
+            "호출 지점": call_site,
+            "호출 수": len(site_records),
+            "실패 수": sum(1 for r in site_records if r["outcome"] != "success"),
+            "재시도 수": sum(r["attempts"] - 1 for r in site_records if r["attempts"] > 1),
+            "총 지연(초)": round(total_ms / 1000, 2),
+            "p50(ms)": round(latencies[(len(latencies) - 1) // 2], 1),
+            "p95(ms)": round(latencies[max(0, math.ceil(len(latencies) * 0.95) - 1)], 1),
+            "요청 바이트": sum(r["request_bytes"] for r in site_records),
+            "응답 바이트": sum(r["response_bytes"] for r in site_records),
+            "추정 토큰": sum(r["prompt_tokens"] + r["response_tokens"] for r in site_records),
+        }
+        if wall_seconds:
+            row["실행 시간 비중(%)"] = round(total_ms / 1000 / wall_seconds * 100, 1)
+        rows.append(row)
+    rows.sort(key=lambda row: row["총 지연(초)"], reverse=True)
+    return rows
@@ -1,22 +1,144 @@
 # modules/ai_service.py
 
 import requests
+from requests.adapters import HTTPAdapter
+import os
 import json
+import hashlib
 import re
 import time
-import streamlit as st # Streamlit의 st.error, st.warning 등을 사용하기 위해 임시로 import.
-                        # 실제 프로덕션에서는 이 로깅 부분을 다른 방식으로 처리하는 것이 좋습니다.
+import random
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from modules import ai_metrics
 
-def call_potens_api_raw(prompt_message: str, api_key: str, response_schema=None) -> dict:
+POTENS_API_ENDPOINT = "https://ai.potens.ai/api/chat"
+# 환경 변수 POTENS_API_ENDPOINT로 엔드포인트를 바꿀 수 있습니다 (예: modules/mock_potens_server.py 모의 서버).
+# main_app.py의 load_dotenv()가 모듈 import 이후에 실행되므로 기본 클라이언트 생성 시점에 읽습니다.
+POTENS_API_ENDPOINT_ENV = "POTENS_API_ENDPOINT"
+
+# 연결 수립과 응답 대기 시간을 분리 (연결은 빨리 실패, 생성은 오래 기다림)
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 300
+
+
+class AIClient:
     """
-    주어진 프롬프트 메시지로 Potens.dev API를 호출하고 원본 응답을 반환합니다.
-    response_schema: JSON 응답을 위한 스키마 (선택 사항)
+    Potens.dev API 호출용 클라이언트.
+    requests.Session과 HTTPAdapter 커넥션 풀을 재사용하여
+    호출마다 DNS 조회 + TCP/TLS 연결을 다시 맺지 않도록 합니다 (HTTP keep-alive).
     """
-    if not api_key:
-        return {"error": "Potens.dev API 키가 누락되었습니다."}
 
-    potens_api_endpoint = "https://ai.potens.ai/api/chat"
-    
+    def __init__(self, endpoint: str = POTENS_API_ENDPOINT,
+                 pool_connections: int = 4, pool_maxsize: int = 16,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT):
+        self.endpoint = endpoint
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Accept-Encoding": "gzip, deflate", # 응답 본문 gzip 압축 허용
+            "Connection": "keep-alive"
+        })
+
+    def call_raw(self, prompt_message: str, api_key: str, response_schema=None, timeout=None) -> dict:
+        """
+        주어진 프롬프트 메시지로 Potens.dev API를 호출하고 원본 응답을 반환합니다.
+        response_schema: JSON 응답을 위한 스키마 (선택 사항)
+        timeout: (connect, read) 타임아웃. None이면 클라이언트 기본값 사용
+        실패 시 반환 딕셔너리에는 "error" 외에 재시도 판단을 위한 "error_type"이 포함됩니다.
+        (429/503 응답은 "status_code", "retry_after"도 포함)
+        """
+        if not api_key:
+            return {"error": "Potens.dev API 키가 누락되었습니다.", "error_type": "missing_api_key"}
+
+        headers, encoded_payload = build_potens_request(prompt_message, api_key, response_schema)
+        response_dict = self._post(headers, encoded_payload, response_schema, timeout)
+        response_dict["request_bytes"] = len(encoded_payload) # 계측용 (ai_metrics)
+        return response_dict
+
+    def _post(self, headers: dict, encoded_payload: bytes, response_schema, timeout) -> dict:
+        try:
+            # 'json' 파라미터 대신 'data' 파라미터를 사용하여 미리 인코딩된 바이트 전송
+            response = self.session.post(self.endpoint, headers=headers, data=encoded_payload, timeout=timeout or self.timeout)
+            response.raise_for_status()
+            response_json = response.json()
+            response_dict = parse_potens_response(response_json, response_schema)
+            response_dict["response_bytes"] = len(response.content)
+            return response_dict
+
+        except json.JSONDecodeError as e:
+            # requests의 JSONDecodeError는 RequestException이기도 하므로 먼저 처리
+            # JSON 디코딩 오류 발생 시 원본 응답 텍스트를 포함하여 디버깅에 도움
+            try:
+                raw_response_text = response.text
+                return {"error": f"Potens.dev API 응답 JSON 디코딩 오류. Raw response: {raw_response_text[:500]}...", "error_type": "schema", "raw_response": raw_response_text}
+            except Exception:
+                return {"error": f"Potens.dev API 응답 JSON 디코딩 오류: {e}", "error_type": "schema"}
+        except requests.exceptions.RequestException as e:
+            return request_exception_dict(e)
+        except Exception as e:
+            return {"error": f"알 수 없는 오류 발생: {e}", "error_type": "unknown"}
+
+    def stream_raw(self, prompt_message: str, api_key: str, timeout=None):
+        """
+        스트리밍 호출. 응답 텍스트 조각(str)을 도착하는 대로 yield하고, 마지막에 결과 딕셔너리를 한 번 yield합니다.
+        서버가 SSE(text/event-stream, "data: {"message": "<조각>"}" 줄, 종료는 "data: [DONE]")로 응답하면 조각 단위로 전달하고,
+        일반 JSON 응답({"message": ...})이면 조각 없이 결과 딕셔너리만 yield합니다 ("streamed": False).
+        결과 딕셔너리는 call_raw와 같은 형식입니다 (성공 시 "text", 실패 시 "error"/"error_type").
+        """
+        if not api_key:
+            yield {"error": "Potens.dev API 키가 누락되었습니다.", "error_type": "missing_api_key"}
+            return
+
+        headers, encoded_payload = build_potens_request(prompt_message, api_key)
+        headers["Accept"] = "text/event-stream, application/json"
+        result = {"request_bytes": len(encoded_payload)}
+        try:
+            with self.session.post(self.endpoint, headers=headers, data=encoded_payload,
+                                   timeout=timeout or self.timeout, stream=True) as response:
+                response.raise_for_status()
+                if response.headers.get("Content-Type", "").startswith("text/event-stream"):
+                    parts = []
+                    received_bytes = 0
+                    for line in response.iter_lines(chunk_size=None): # 수신되는 대로 처리 (고정 크기 버퍼링 없음)
+                        received_bytes += len(line) + 1
+                        if not line.startswith(b"data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == b"[DONE]":
+                            break
+                        delta = _parse_stream_delta(data)
+                        if delta:
+                            parts.append(delta)
+                            yield delta
+                    result.update({"text": "".join(parts).strip(), "response_bytes": received_bytes, "streamed": True})
+                else:
+                    body = response.content
+                    result.update(parse_potens_response(json.loads(body), None))
+                    result.update({"response_bytes": len(body), "streamed": False})
+        except json.JSONDecodeError as e:
+            result.update({"error": f"Potens.dev API 응답 JSON 디코딩 오류: {e}", "error_type": "schema"})
+        except requests.exceptions.RequestException as e:
+            result.update(request_exception_dict(e))
+        except Exception as e:
+            result.update({"error": f"알 수 없는 오류 발생: {e}", "error_type": "unknown"})
+        yield result
+
+    def close(self):
+        """커넥션 풀을 정리합니다."""
+        self.session.close()
+
+
+def build_potens_request(prompt_message: str, api_key: str, response_schema=None) -> tuple[dict, bytes]:
+    """Potens.dev /api/chat 요청 헤더와 UTF-8로 인코딩된 페이로드를 만듭니다 (동기/비동기 클라이언트 공용)."""
     payload = {
         "prompt": prompt_message
     }
@@ -36,66 +158,538 @@ def call_potens_api_raw(prompt_message: str, api_key: str, response_schema=None)
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json; charset=utf-8" # Content-Type 헤더에 charset 명시
     }
+    return headers, encoded_payload
+
+
+def parse_potens_response(response_json: dict, response_schema=None) -> dict:
+    """Potens.dev 응답 JSON의 message 필드를 결과 딕셔너리로 변환합니다."""
+    if "message" in response_json:
+        if response_schema:
+            try:
+                parsed_content = json.loads(response_json["message"].strip())
+                return {"text": parsed_content, "raw_response": response_json}
+            except json.JSONDecodeError:
+                return {"error": f"Potens.dev API 응답 JSON 디코딩 오류 (message 필드): {response_json['message']}", "error_type": "schema"}
+        else:
+            return {"text": response_json["message"].strip(), "raw_response": response_json}
+    else:
+        return {"error": "Potens.dev API 응답 형식이 올바라지 않습니다.", "error_type": "schema", "raw_response": response_json}
+
+
+def _parse_stream_delta(data: bytes) -> str:
+    """SSE data 한 줄에서 텍스트 조각을 꺼냅니다 ({"message": ...} 또는 {"delta": ...} JSON, 아니면 원문 그대로)."""
+    text = data.decode("utf-8")
+    try:
+        event = json.loads(text)
+    except json.JSONDecodeError:
+        return text
+    if isinstance(event, dict):
+        return event.get("message", event.get("delta", ""))
+    return str(event)
+
+
+def request_exception_dict(e: requests.exceptions.RequestException) -> dict:
+    """requests 예외를 error_type이 분류된 오류 딕셔너리로 변환합니다."""
+    if e.response is not None:
+        return http_error_dict(e, e.response.status_code, e.response.text, e.response.headers.get("Retry-After"))
+    return http_error_dict(e, error_type=_classify_request_exception(e))
+
+
+def _classify_status_code(status_code: int) -> str:
+    if status_code == 429:
+        return "rate_limit"
+    if status_code >= 500:
+        return "server"
+    return "client"
+
+
+def _classify_request_exception(e: requests.exceptions.RequestException) -> str:
+    """requests 예외(응답 없음)를 재시도 판단용 오류 유형 문자열로 분류합니다."""
+    if isinstance(e, requests.exceptions.Timeout): # ConnectTimeout도 여기서 timeout으로 분류
+        return "timeout"
+    if isinstance(e, requests.exceptions.ConnectionError):
+        return "connection"
+    return "unknown"
 
+
+def http_error_dict(e: Exception, status_code: int | None = None, response_text: str | None = None,
+                    retry_after_header: str | None = None, error_type: str | None = None) -> dict:
+    """
+    네트워크/HTTP 오류를 오류 딕셔너리로 변환합니다.
+    status_code가 있으면 상태 코드로 error_type을 분류하고 Retry-After를 해석합니다.
+    """
+    error_message = f"Potens.dev API 호출 오류 발생 ( network/timeout/HTTP): {e}"
+    error_dict = {"error_type": error_type or "unknown"}
+    if status_code is not None:
+        error_message += f" Response content: {response_text}"
+        error_dict["error_type"] = _classify_status_code(status_code)
+        error_dict["status_code"] = status_code
+        retry_after = _parse_retry_after(retry_after_header)
+        if retry_after is not None:
+            error_dict["retry_after"] = retry_after
+    error_dict["error"] = error_message
+    return error_dict
+
+
+def _parse_retry_after(value) -> float | None:
+    """Retry-After 헤더 값(초 또는 HTTP 날짜)을 대기 초로 변환합니다."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
     try:
-        # 'json' 파라미터 대신 'data' 파라미터를 사용하여 미리 인코딩된 바이트 전송
-        response = requests.post(potens_api_endpoint, headers=headers, data=encoded_payload, timeout=300)
-        response.raise_for_status()
-        response_json = response.json()
-
-        if "message" in response_json:
-            if response_schema:
-                try:
-                    parsed_content = json.loads(response_json["message"].strip())
-                    return {"text": parsed_content, "raw_response": response_json}
-                except json.JSONDecodeError:
-                    return {"error": f"Potens.dev API 응답 JSON 디코딩 오류 (message 필드): {response_json['message']}"}
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+def get_default_client() -> AIClient:
+    """프로세스 전체에서 공유하는 기본 AIClient를 반환합니다 (최초 호출 시 생성)."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = AIClient(endpoint=os.getenv(POTENS_API_ENDPOINT_ENV) or POTENS_API_ENDPOINT)
+    return _default_client
+
+
+def configure_default_client(**client_kwargs) -> AIClient:
+    """
+    기본 AIClient를 주어진 설정(AIClient 생성자 인자)으로 교체합니다.
+    벤치마크에서 모의 서버를 가리키도록 바꿀 때 사용합니다. 기존 클라이언트의 커넥션 풀은 닫습니다.
+    """
+    global _default_client
+    with _default_client_lock:
+        previous, _default_client = _default_client, AIClient(**client_kwargs)
+    if previous is not None:
+        previous.close()
+    return _default_client
+
+
+# 일시적인 오류만 재시도 (API 키 누락, 4xx, 스키마/디코딩 오류는 다시 시도해도 같은 결과)
+# 서킷 브레이커도 같은 유형만 엔드포인트 장애로 집계합니다.
+RETRYABLE_ERROR_TYPES = frozenset({"timeout", "connection", "rate_limit", "server"})
+
+CIRCUIT_OPEN_ERROR_MESSAGE = "Potens.dev AI 서비스 응답이 불안정하여 호출을 일시적으로 중단했습니다. 잠시 후 다시 시도해주세요."
+# 재시도 후 최종 실패한 호출의 오류 메시지 머리말 (작업 함수는 응답 텍스트 대신 이 메시지를 반환)
+FINAL_FAILURE_PREFIX = "AI 호출 최종 실패"
+
+
+class CircuitBreaker:
+    """
+    Potens.dev 엔드포인트용 서킷 브레이커.
+    - closed: 최근 window_size개 호출 중 min_calls개 이상이 쌓이고 실패율이 failure_rate_threshold 이상이면 open으로 전환
+    - open: open_seconds 동안 모든 호출을 즉시 실패 처리 (네트워크 호출 없음)
+    - half_open: open_seconds 경과 후 half_open_max_calls개의 시험 호출만 허용.
+      시험 호출이 성공하면 closed, 실패하면 다시 open
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, window_size: int = 20, min_calls: int = 5, failure_rate_threshold: float = 0.5,
+                 open_seconds: float = 60.0, half_open_max_calls: int = 1):
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._results = deque(maxlen=window_size) # True = 실패
+        self._opened_at = None
+        self._half_open_in_flight = 0
+        self._open_count = 0
+        self._rejected_count = 0
+
+    def _refresh_state(self):
+        # open 유지 시간이 지나면 half_open으로 전환 (lock 보유 상태에서 호출)
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._half_open_in_flight = 0
+
+    def _trip(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._open_count += 1
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh_state()
+            return self._state
+
+    def allow_request(self) -> bool:
+        """호출을 진행해도 되는지 확인합니다. False면 즉시 실패 처리해야 합니다."""
+        with self._lock:
+            self._refresh_state()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+                self._half_open_in_flight += 1
+                return True
+            self._rejected_count += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._results.clear()
+                self._half_open_in_flight = 0
             else:
-                return {"text": response_json["message"].strip(), "raw_response": response_json}
+                self._results.append(False)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._results.clear()
+                self._trip()
+                return
+            self._results.append(True)
+            if self._state == self.CLOSED and len(self._results) >= self.min_calls and \
+               self._failure_rate() >= self.failure_rate_threshold:
+                self._trip()
+
+    def record_abandoned(self):
+        """결과 없이 끝난 호출(스트림을 중간에 닫은 경우 등). 성공/실패로 집계하지 않고 half_open 시험 호출 슬롯만 반환합니다."""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._half_open_in_flight > 0:
+                self._half_open_in_flight -= 1
+
+    def _failure_rate(self) -> float:
+        return sum(self._results) / len(self._results) if self._results else 0.0
+
+    def metrics(self) -> dict:
+        """브레이커 상태 지표 (state_code: 0=closed, 1=half_open, 2=open)."""
+        with self._lock:
+            self._refresh_state()
+            return {
+                "state": self._state,
+                "state_code": {self.CLOSED: 0, self.HALF_OPEN: 1, self.OPEN: 2}[self._state],
+                "failure_rate": round(self._failure_rate(), 3),
+                "window_calls": len(self._results),
+                "open_count": self._open_count,
+                "rejected_count": self._rejected_count,
+                "seconds_until_half_open": (max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+                                            if self._state == self.OPEN else 0.0)
+            }
+
+
+_circuit_breaker = CircuitBreaker()
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Potens.dev 엔드포인트 공용 서킷 브레이커를 반환합니다."""
+    return _circuit_breaker
+
+def get_circuit_breaker_metrics() -> dict:
+    """공용 서킷 브레이커의 현재 상태 지표를 반환합니다."""
+    return _circuit_breaker.metrics()
+
+ai_metrics.get_registry().register_gauge("circuit_breaker", get_circuit_breaker_metrics)
+
+def is_circuit_open_error(result) -> bool:
+    """AI 호출 결과(딕셔너리 또는 오류 문자열)가 서킷 브레이커에 의한 즉시 실패인지 확인합니다."""
+    if isinstance(result, dict):
+        return result.get("error_type") == "circuit_open"
+    return isinstance(result, str) and CIRCUIT_OPEN_ERROR_MESSAGE in result
+
+def is_ai_failure_text(text) -> bool:
+    """작업 함수(get_article_summary 등)가 반환한 텍스트가 응답이 아니라 최종 실패 오류 메시지인지 확인합니다."""
+    return isinstance(text, str) and text.startswith(FINAL_FAILURE_PREFIX)
+
+
+def call_potens_api_raw(prompt_message: str, api_key: str, response_schema=None, timeout=None) -> dict:
+    """
+    주어진 프롬프트 메시지로 Potens.dev API를 호출하고 원본 응답을 반환합니다.
+    공유 기본 클라이언트(get_default_client)에 위임하며, 서킷 브레이커가 열려 있으면
+    네트워크 호출 없이 error_type "circuit_open"으로 즉시 실패합니다.
+    response_schema: JSON 응답을 위한 스키마 (선택 사항)
+    """
+    rejected = check_call_allowed(api_key)
+    if rejected:
+        return rejected
+
+    response_dict = get_default_client().call_raw(prompt_message, api_key=api_key, response_schema=response_schema, timeout=timeout)
+    record_call_result(response_dict)
+    return response_dict
+
+
+def check_call_allowed(api_key: str) -> dict | None:
+    """호출 전 검사. API 키가 없거나 서킷이 열려 있으면 즉시 반환할 오류 딕셔너리를, 아니면 None을 반환합니다."""
+    if not api_key:
+        return {"error": "Potens.dev API 키가 누락되었습니다.", "error_type": "missing_api_key"}
+    if not _circuit_breaker.allow_request():
+        return {"error": CIRCUIT_OPEN_ERROR_MESSAGE, "error_type": "circuit_open"}
+    return None
+
+
+def record_call_result(response_dict: dict):
+    """실제 호출 결과를 서킷 브레이커에 집계합니다."""
+    if response_dict.get("error_type") in RETRYABLE_ERROR_TYPES:
+        _circuit_breaker.record_failure()
+    else:
+        # 4xx/스키마 오류는 엔드포인트 자체는 응답하고 있으므로 성공으로 집계
+        _circuit_breaker.record_success()
+
+
+def record_call_abandoned():
+    """결과를 받기 전에 중단된 호출을 서킷 브레이커에 알립니다 (집계하지 않고 half_open 시험 호출 슬롯만 반환)."""
+    _circuit_breaker.record_abandoned()
+
+
+class RetryPolicy:
+    """
+    AI 호출 재시도 정책.
+    - 오류 유형(error_type)이 retryable_error_types에 속할 때만 재시도합니다.
+    - 대기 시간은 지수 백오프 + full jitter: uniform(0, min(max_delay, base_delay * 2**attempt))
+    - 응답에 Retry-After가 있으면 그 값을 우선합니다 (max_delay로 제한하지 않음).
+    - deadline_seconds: 첫 시도부터 모든 재시도를 포함한 전체 허용 시간 (None이면 제한 없음)
+    """
+
+    def __init__(self, max_attempts: int = 2, base_delay: float = 1.0, max_delay: float = 15.0,
+                 deadline_seconds: float | None = None,
+                 retryable_error_types=RETRYABLE_ERROR_TYPES):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline_seconds = deadline_seconds
+        self.retryable_error_types = retryable_error_types
+
+    def is_retryable(self, response_dict: dict) -> bool:
+        return response_dict.get("error_type") in self.retryable_error_types
+
+    def backoff_delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """attempt번째(0부터) 실패 후 다음 시도까지 대기할 초."""
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def remaining(self, started_at: float) -> float | None:
+        """전체 제한 시간까지 남은 초 (제한이 없으면 None)."""
+        if self.deadline_seconds is None:
+            return None
+        return self.deadline_seconds - (time.monotonic() - started_at)
+
+    def attempt_timeout(self, started_at: float, default_timeout: tuple) -> tuple | None:
+        """이번 시도에 사용할 (connect, read) 타임아웃. 제한 시간이 없으면 None (클라이언트 기본값)."""
+        remaining = self.remaining(started_at)
+        if remaining is None:
+            return None
+        connect_timeout, read_timeout = default_timeout
+        return (min(connect_timeout, remaining), min(read_timeout, remaining))
+
+    def next_step(self, attempt: int, response_dict: dict, started_at: float) -> tuple[dict | None, float]:
+        """
+        실패한 시도 이후의 처리를 결정합니다.
+        반환 값: (최종 오류 딕셔너리, 0) — 더 이상 재시도하지 않음 / (None, 대기 초) — 대기 후 재시도
+        """
+        error_msg = response_dict.get("error", "알 수 없는 오류")
+        error_type = response_dict.get("error_type", "unknown")
+        if not self.is_retryable(response_dict) or attempt == self.max_attempts - 1:
+            return {"error": f"{FINAL_FAILURE_PREFIX}: {error_msg}", "error_type": error_type, "attempts": attempt + 1}, 0
+
+        delay = self.backoff_delay(attempt, response_dict.get("retry_after"))
+        remaining = self.remaining(started_at)
+        if remaining is not None and delay >= remaining:
+            return {"error": f"{FINAL_FAILURE_PREFIX} (제한 시간 {self.deadline_seconds}초 초과): {error_msg}",
+                    "error_type": "deadline", "attempts": attempt + 1}, 0
+        return None, delay
+
+
+class SingleFlight:
+    """
+    진행 중인(in-flight) 동일 요청 병합기.
+    같은 키로 동시에 들어온 호출 중 첫 호출만 실제로 실행하고,
+    나머지 호출은 그 결과가 나올 때까지 기다렸다가 같은 결과를 공유합니다.
+    (완료된 결과는 보관하지 않으므로 캐시가 아니라 동시 호출 병합만 수행)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key: str, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = {"event": threading.Event(), "result": None, "exception": None}
+                self._calls[key] = call
+
+        if not is_leader:
+            call["event"].wait()
         else:
-            return {"error": "Potens.dev API 응답 형식이 올바라지 않습니다.", "raw_response": response_json}
+            try:
+                call["result"] = fn()
+            except Exception as e:
+                call["exception"] = e
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call["event"].set()
 
-    except requests.exceptions.RequestException as e:
-        error_message = f"Potens.dev API 호출 오류 발생 ( network/timeout/HTTP): {e}"
-        if e.response is not None:
-            error_message += f" Response content: {e.response.text}"
-        return {"error": error_message}
-    except json.JSONDecodeError:
-        # JSON 디코딩 오류 발생 시 원본 응답 텍스트를 포함하여 디버깅에 도움
-        try:
-            raw_response_text = response.text
-            return {"error": f"Potens.dev API 응답 JSON 디코딩 오류. Raw response: {raw_response_text[:500]}...", "raw_response": raw_response_text}
-        except Exception:
-            return {"error": f"Potens.dev API 응답 JSON 디코딩 오류: {e}"}
-    except Exception as e:
-        return {"error": f"알 수 없는 오류 발생: {e}"}
+        if call["exception"] is not None:
+            raise call["exception"]
+        result = call["result"]
+        # 호출자별로 결과 딕셔너리를 수정해도 서로 영향이 없도록 얕은 복사
+        return dict(result) if isinstance(result, dict) else result
+
+    def in_flight_count(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+_single_flight = SingleFlight()
+
+def _prompt_key(prompt: str, api_key: str, response_schema=None) -> str:
+    """프롬프트/스키마/API 키 조합으로 요청 병합 키를 만듭니다."""
+    raw = json.dumps([prompt, response_schema, api_key], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
-def retry_ai_call(prompt: str, api_key: str, response_schema=None, max_retries: int = 2, delay_seconds: int = 15) -> dict:
+
+def retry_ai_call(prompt: str, api_key: str, response_schema=None, max_retries: int = 2, delay_seconds: int = 15,
+                  retry_policy: RetryPolicy | None = None, deadline_seconds: float | None = None,
+                  coalesce: bool = True, call_site: str = "unknown") -> dict:
     """
     Potens.dev API 호출에 대한 재시도 로직을 포함한 래퍼 함수.
-    call_potens_api_raw를 호출하고 실패 시 재시도합니다.
+    call_potens_api_raw를 호출하고, 재시도 가능한 오류(timeout/연결/429/5xx)일 때만
+    지수 백오프(+jitter, Retry-After 우선)로 재시도합니다.
+    retry_policy를 주지 않으면 max_retries를 최대 시도 횟수, delay_seconds를 백오프 상한으로 사용합니다.
+    deadline_seconds: 호출 전체(재시도 포함)의 최대 허용 시간. 각 시도의 타임아웃도 남은 시간으로 줄어듭니다.
+    coalesce: True면 동시에 진행 중인 동일 프롬프트 호출과 하나의 HTTP 요청(재시도 포함)을 공유합니다.
+    call_site: 계측용 호출 지점 이름 (ai_metrics 요약 표의 행 단위, 예: "qa", "endorsement_section")
     """
-    for attempt in range(max_retries):
-        response_dict = call_potens_api_raw(prompt, api_key=api_key, response_schema=response_schema)
+    if coalesce:
+        return _single_flight.do(
+            _prompt_key(prompt, api_key, response_schema),
+            lambda: _retry_ai_call(prompt, api_key, response_schema, max_retries, delay_seconds, retry_policy, deadline_seconds, call_site)
+        )
+    return _retry_ai_call(prompt, api_key, response_schema, max_retries, delay_seconds, retry_policy, deadline_seconds, call_site)
+
+
+def _retry_ai_call(prompt: str, api_key: str, response_schema, max_retries: int, delay_seconds: int,
+                   retry_policy: RetryPolicy | None, deadline_seconds: float | None, call_site: str) -> dict:
+    if retry_policy is None:
+        retry_policy = RetryPolicy(max_attempts=max_retries, max_delay=delay_seconds, deadline_seconds=deadline_seconds)
+
+    default_timeout = get_default_client().timeout
+    started_at = time.monotonic()
+    attempt_results = []
+    for attempt in range(retry_policy.max_attempts):
+        timeout = retry_policy.attempt_timeout(started_at, default_timeout)
+        response_dict = call_potens_api_raw(prompt, api_key=api_key, response_schema=response_schema, timeout=timeout)
+        attempt_results.append(response_dict)
 
         if "error" not in response_dict:
+            record_call_metrics(call_site, prompt, started_at, attempt_results, response_dict)
             return response_dict
-        else:
-            error_msg = response_dict.get("error", "알 수 없는 오류")
-            if attempt < max_retries - 1:
-                time.sleep(delay_seconds)
-            else:
-                return {"error": f"AI 호출 최종 실패: {error_msg}"}
-    return {"error": "AI 응답을 가져오는 데 최종 실패했습니다. 나중에 다시 시도해주세요."}
 
+        final_error, delay = retry_policy.next_step(attempt, response_dict, started_at)
+        if final_error:
+            record_call_metrics(call_site, prompt, started_at, attempt_results, final_error)
+            return final_error
+        time.sleep(delay)
 
-def get_article_summary(title: str, link: str, date_str: str, summary_snippet: str, api_key: str, max_attempts: int = 2, delay_seconds: int = 15) -> str:
+
+def record_call_metrics(call_site: str, prompt: str, started_at: float, attempt_results: list[dict], final_result: dict):
+    """재시도를 포함한 AI 호출 1건의 계측 값을 ai_metrics에 기록합니다 (동기/비동기 재시도 공용)."""
+    response_text = final_result.get("text")
+    ai_metrics.record_ai_call(
+        call_site,
+        latency_seconds=time.monotonic() - started_at,
+        attempts=len(attempt_results),
+        outcome="success" if "error" not in final_result else final_result.get("error_type", "unknown"),
+        request_bytes=sum(result.get("request_bytes", 0) for result in attempt_results),
+        response_bytes=sum(result.get("response_bytes", 0) for result in attempt_results),
+        prompt_tokens=ai_metrics.estimate_tokens(prompt) * len(attempt_results),
+        response_tokens=ai_metrics.estimate_tokens(response_text if isinstance(response_text, str) else json.dumps(response_text, ensure_ascii=False)) if response_text is not None else 0,
+    )
+
+
+_STREAM_FALLBACK_CHUNK_RE = re.compile(r"\S+\s*|\s+")
+
+def stream_ai_call(prompt: str, api_key: str, max_retries: int = 2, delay_seconds: int = 15,
+                   call_site: str = "unknown", on_complete=None):
     """
-    Potens.dev AI를 호출하여 제공된 제목, 링크, 날짜, 미리보기 요약을 바탕으로
-    뉴스 기사 내용을 요약합니다. (단일 호출)
-    링크 접근이 불가능할 경우에도 제공된 정보만으로 요약을 시도합니다.
+    retry_ai_call의 스트리밍 버전. 응답 텍스트 조각(str)을 yield하는 제너레이터로, st.write_stream에 바로 넘길 수 있습니다.
+    엔드포인트가 스트리밍을 지원하지 않으면 전체 응답을 받은 뒤 단어 단위로 나누어 yield합니다 (체감 지연은 전체 생성 시간과 같음).
+    재시도는 첫 조각을 내보내기 전까지만 수행하며, 최종 실패 시 오류 메시지를 텍스트로 yield합니다
+    (서킷 브레이커에 의한 실패는 is_circuit_open_error로 확인 가능).
+    첫 조각까지의 시간(TTFT)은 ai_metrics 레지스트리의 ai_call_ttft_ms 히스토그램에 기록됩니다.
+    on_complete: 스트림이 끝나면 최종 결과 dict(성공 응답 또는 "error" 키가 있는 오류)로 호출됩니다 (예: 성공한 답변만 캐시).
     """
-    initial_prompt = (
+    retry_policy = RetryPolicy(max_attempts=max_retries, max_delay=delay_seconds)
+    started_at = time.monotonic()
+    attempt_results = []
+    first_chunk_emitted = False
+
+    def observe_first_chunk():
+        nonlocal first_chunk_emitted
+        if not first_chunk_emitted:
+            first_chunk_emitted = True
+            ai_metrics.get_registry().observe("ai_call_ttft_ms", call_site, (time.monotonic() - started_at) * 1000)
+
+    for attempt in range(retry_policy.max_attempts):
+        result = check_call_allowed(api_key)
+        if result is None:
+            try:
+                for item in get_default_client().stream_raw(prompt, api_key=api_key,
+                                                            timeout=retry_policy.attempt_timeout(started_at, get_default_client().timeout)):
+                    if isinstance(item, dict):
+                        result = item
+                    else:
+                        observe_first_chunk()
+                        yield item
+            finally:
+                # 소비자가 스트림을 중간에 닫아도(GeneratorExit) half_open 시험 호출 슬롯이 남지 않도록 항상 기록
+                if result is not None:
+                    record_call_result(result)
+                else:
+                    record_call_abandoned()
+        attempt_results.append(result)
+
+        if "error" not in result:
+            if not result.get("streamed"):
+                for chunk in _STREAM_FALLBACK_CHUNK_RE.findall(result["text"]):
+                    observe_first_chunk()
+                    yield chunk
+            record_call_metrics(call_site, prompt, started_at, attempt_results, result)
+            if on_complete:
+                on_complete(result)
+            return
+
+        if first_chunk_emitted:
+            # 이미 일부 응답을 내보냈으므로 재시도하면 내용이 중복됨
+            final_error = {"error": f"AI 응답 스트림이 중단되었습니다: {result['error']}", "error_type": result.get("error_type", "unknown")}
+            record_call_metrics(call_site, prompt, started_at, attempt_results, final_error)
+            if on_complete:
+                on_complete(final_error)
+            yield f"\n\n[{final_error['error']}]"
+            return
+
+        final_error, delay = retry_policy.next_step(attempt, result, started_at)
+        if final_error:
+            record_call_metrics(call_site, prompt, started_at, attempt_results, final_error)
+            if on_complete:
+                on_complete(final_error)
+            yield final_error["error"]
+            return
+        time.sleep(delay)
+
+
+# --- 프롬프트 생성 함수 (동기/비동기 작업 함수 공용) ---
+def build_article_summary_prompt(title: str, link: str, date_str: str, summary_snippet: str) -> str:
+    return (
         f"다음은 뉴스 기사에 대한 정보입니다. 이 정보를 바탕으로 뉴스 기사 내용을 요약해 주세요.\n"
         f"**제공된 링크에 접근할 수 없거나 기사를 찾을 수 없는 경우, 아래 제공된 제목, 날짜, 미리보기 요약만을 사용하여 기사 내용을 파악하고 요약해 주세요.**\n"
         f"광고나 불필요한 정보 없이 핵심 내용만 간결하게 제공해 주세요.\n\n"
@@ -105,7 +699,204 @@ def get_article_summary(title: str, link: str, date_str: str, summary_snippet: s
         f"미리보기 요약: {summary_snippet}"
     )
 
-    response_dict = retry_ai_call(initial_prompt, api_key=api_key, max_retries=max_attempts, delay_seconds=delay_seconds)
+
+RELEVANT_KEYWORDS_SCHEMA = {
+    "type": "ARRAY",
+    "items": {"type": "STRING"}
+}
+
+def build_relevant_keywords_prompt(trending_keywords_data: list[dict], perspective: str) -> str:
+    prompt_keywords = [{"keyword": k['keyword'], "recent_freq": k['recent_freq']} for k in trending_keywords_data]
+    return (
+        f"다음은 뉴스 기사에서 식별된 트렌드 키워드 목록입니다. 이 키워드들을 '{perspective}'의 관점에서 "
+        f"가장 유의미하다고 판단되는 순서대로 최대 5개까지 골라 JSON 배열 형태로 반환해 주세요. "
+        f"다른 설명 없이 JSON 배열만 반환해야 합니다. 각 키워드는 문자열이어야 합니다.\n\n"
+        f"키워드 목록: {json.dumps(prompt_keywords, ensure_ascii=False)}"
+    )
+
+
+def build_text_summary_prompt(text: str) -> str:
+    return f"다음 텍스트를 간결하게 요약해 주세요.\n\n텍스트: {text}"
+
+
+def combine_article_summaries(summarized_articles: list[dict]) -> str:
+    """요약된 기사 내용을 하나의 긴 텍스트로 결합합니다."""
+    return "\n\n---\n\n".join([
+        f"제목: {art['제목']}\n날짜: {art['날짜']}\n요약: {art['내용']}"
+        for art in summarized_articles
+    ])
+
+
+def build_trend_summary_prompt(processed_content_for_ai: str) -> str:
+    return (
+        f"다음은 최근 뉴스 기사 요약문들을 종합한 내용입니다.\n"
+        f"이 내용을 바탕으로 전반적인 뉴스 트렌드를 간결하게 요약해 주세요.\n\n"
+        f"종합된 뉴스 요약 내용:\n{processed_content_for_ai}"
+    )
+
+
+def build_insurance_implications_prompt(trend_summary_text: str) -> str:
+    # 프롬프트 변경: 트렌드 요약문을 바탕으로 자동차 보험 산업에 미칠 영향 추론
+    return (
+        f"다음은 최근 뉴스 트렌드를 요약한 내용입니다.\n"
+        f"이 트렌드 요약문을 바탕으로 '자동차 보험 산업'에 미칠 수 있는 영향에 대해 간결하게 요약해 주세요.\n" # <-- 추론 요청
+        f"한국어로 요약 내용을 제공해 주세요.\n\n"
+        f"뉴스 트렌드 요약문:\n{trend_summary_text}"
+    )
+
+
+def build_markdown_format_prompt(text_to_format: str) -> str:
+    return (
+        f"다음 텍스트를 전문적이고 가독성 높은 마크다운 형식으로 재구성해 주세요.\n"
+        f"텍스트 파일로 저장했을 때 줄바꿈과 들여쓰기가 명확하게 보이도록 마크다운 문법을 활용하여 구조화해 주세요.\n"
+        f"핵심 내용은 강조(예: 볼드체)하거나 목록 형태로 정리하여 시각적으로 돋보이게 해주세요.\n"
+        f"문단 간의 간격을 적절히 조절하여 가독성을 높여 주세요. 각 문단은 최소 한 줄 이상 비워주세요.\n"
+        f"불필요한 반복이나 비문은 수정하고, 전문적인 보고서 톤앤매너를 유지해 주세요.\n"
+        f"모든 내용은 한국어로 작성해 주세요.\n"
+        f"**중요: 응답은 오직 재구성된 내용만 포함해야 합니다. 다른 설명이나 서두 문구는 절대 포함하지 마세요.**\n\n"
+        f"[원본 텍스트]\n"
+        f"{text_to_format}"
+    )
+
+
+# 트렌드 요약 + 보험 영향 분석을 마크다운으로 한 번에 받는 구조화 응답 스키마
+TREND_INSIGHTS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "trend_summary_markdown": {"type": "STRING"},
+        "insurance_implications_markdown": {"type": "STRING"}
+    },
+    "required": ["trend_summary_markdown", "insurance_implications_markdown"]
+}
+
+def build_trend_insights_prompt(processed_content_for_ai: str) -> str:
+    return (
+        f"다음은 최근 뉴스 기사 요약문들을 종합한 내용입니다.\n"
+        f"이 내용을 바탕으로 아래 두 항목을 작성하여 JSON 객체로 반환해 주세요.\n"
+        f"- trend_summary_markdown: 전반적인 뉴스 트렌드를 간결하게 요약한 내용\n"
+        f"- insurance_implications_markdown: 이 트렌드가 '자동차 보험 산업'에 미칠 수 있는 영향을 간결하게 요약한 내용\n\n"
+        f"각 항목은 전문적이고 가독성 높은 마크다운 형식으로 작성해 주세요.\n"
+        f"텍스트 파일로 저장했을 때 줄바꿈과 들여쓰기가 명확하게 보이도록 마크다운 문법을 활용하여 구조화해 주세요.\n"
+        f"핵심 내용은 강조(예: 볼드체)하거나 목록 형태로 정리하여 시각적으로 돋보이게 해주세요.\n"
+        f"문단 간의 간격을 적절히 조절하여 가독성을 높여 주세요. 각 문단은 최소 한 줄 이상 비워주세요.\n"
+        f"전문적인 보고서 톤앤매너를 유지하고, 모든 내용은 한국어로 작성해 주세요.\n"
+        f"**중요: 각 항목에는 내용만 포함해야 합니다. 다른 설명이나 서두 문구는 절대 포함하지 마세요.**\n\n"
+        f"종합된 뉴스 요약 내용:\n{processed_content_for_ai}"
+    )
+
+
+# 특약 구성 항목 (문서 분석 페이지의 특약 생성과 예약 보고서의 특약 동적 생성에서 공통 사용)
+ENDORSEMENT_SECTIONS = {
+    "1. 특약의 명칭": "자동차 보험 표준약관을 참고하여 특약의 **명칭**을 작성해줘.",
+    "2. 특약의 목적": "이 특약의 **목적**을 설명해줘.",
+    "3. 보장 범위": "**보장 범위**에 대해 상세히 작성해줘.",
+    "4. 보험금 지급 조건": "**보험금 지급 조건**을 구체적으로 작성해줘.",
+    "5. 보험료 산정 방식": "**보험료 산정 방식**을 설명해줘.",
+    "6. 면책 사항": "**면책 사항**에 해당하는 내용을 작성해줘.",
+    "7. 특약의 적용 기간": "**적용 기간**을 명시해줘.",
+    "8. 기타 특별 조건": "**기타 특별 조건**이 있다면 제안해줘.",
+    "9. 운전가능자 제한": "**운전자 연령과 범위**에 따른 특별 약관을 제안해줘.",
+    "10. 보험료 할인": "**보험료 할인**에 해당하는 특별 약관을 작성해줘.",
+    "11. 보장 확대": "**법률비용 및 다른 자동차 운전**에 해당하는 특별 약관을 작성해줘"
+}
+
+def endorsement_section_query(title: str, question: str) -> str:
+    """특약 섹션의 관련 조항 검색 질의 (번호와 마크다운 강조 기호 제거)."""
+    return f"{title.split('. ', 1)[-1]} {question.replace('**', '')}"
+
+def build_endorsement_section_prompt(title: str, question: str, context: str) -> str:
+    """특약 섹션 프롬프트. context는 섹션 질문으로 검색한 관련 조항 (토큰 예산 내)."""
+    return f"""
+너는 자동차 보험을 설계하고 있는 보험사 직원이야.
+다음 조건에 따라 자동차 보험 특약의 '{title}'을 3~5줄 정도로 작성해줘.
+
+[기획 목적]
+- 이 특약은 보험 상품 기획 초기 단계에서 트렌드 조사 및 방향성 도출에 도움 되는 목적으로 작성돼야 해.
+- 새로운 기술(예: 블랙박스, 자율주행 등)이나 최근 사회적 이슈(예: 고령 운전자 증가 등)를 반영해도 좋아.
+- 표준약관 표현 방식을 따라줘.
+
+[표준약관 관련 내용]
+{context}
+
+[질문]
+{question}
+
+[답변]
+"""
+
+
+# 특약 섹션 동시 생성 설정: 동시 요청 수와 요청 시작 간 최소 간격(초, 0이면 제한 없음)
+ENDORSEMENT_CONCURRENCY = int(os.getenv("ENDORSEMENT_CONCURRENCY", "4"))
+ENDORSEMENT_MIN_START_INTERVAL = float(os.getenv("ENDORSEMENT_MIN_START_INTERVAL", "0"))
+
+def iter_concurrent_ai_calls(prompts: dict, api_key: str, max_concurrency: int | None = None,
+                             min_start_interval: float | None = None, call_site: str = "unknown", **retry_kwargs):
+    """
+    서로 독립적인 프롬프트들(이름 → 프롬프트)을 동시에 호출하고 완료되는 순서대로 (이름, 응답 dict)를 yield합니다.
+    max_concurrency로 동시 요청 수를, min_start_interval로 요청 시작 간격을 제한합니다.
+    각 작업은 호출 시점의 contextvars를 복사해 실행하므로 ai_metrics 실행(run) 기록이 그대로 이어집니다.
+    소비를 중단하면(예: 서킷 오픈 후 break) 아직 시작하지 않은 요청은 취소됩니다.
+    """
+    max_concurrency = max(1, max_concurrency or ENDORSEMENT_CONCURRENCY)
+    min_start_interval = ENDORSEMENT_MIN_START_INTERVAL if min_start_interval is None else min_start_interval
+    spacing_lock = threading.Lock()
+    next_start = [time.monotonic()]
+
+    def call(prompt):
+        if min_start_interval > 0:
+            with spacing_lock:
+                now = time.monotonic()
+                start_at = max(now, next_start[0])
+                next_start[0] = start_at + min_start_interval
+            if start_at > now:
+                time.sleep(start_at - now)
+        return retry_ai_call(prompt, api_key, call_site=call_site, **retry_kwargs)
+
+    executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"ai-{call_site}")
+    try:
+        futures = {executor.submit(contextvars.copy_context().run, call, prompt): name for name, prompt in prompts.items()}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def format_endorsement_text(answers: dict, section_titles) -> str:
+    """섹션별 답변을 표준 섹션 순서(section_titles)로 합쳐 다운로드/저장용 전체 텍스트를 만듭니다."""
+    return "".join(f"#### {title}\n{answers[title].strip()}\n\n" for title in section_titles if title in answers)
+
+
+def parse_trend_insights(response_dict: dict) -> dict | None:
+    """
+    구조화 응답에서 인사이트 결과를 만듭니다. 필드가 없거나 비어 있으면 None (기존 단계별 호출로 대체).
+    반환 값: {"trend_summary", "insurance_info", "formatted_trend_summary", "formatted_insurance_info"}
+    """
+    insights = response_dict.get("text")
+    if not isinstance(insights, dict):
+        return None
+    trend_markdown = insights.get("trend_summary_markdown")
+    insurance_markdown = insights.get("insurance_implications_markdown")
+    if not (isinstance(trend_markdown, str) and trend_markdown.strip() and
+            isinstance(insurance_markdown, str) and insurance_markdown.strip()):
+        return None
+    return {
+        # 평문 버전은 기존 단계별 호출 결과와 같이 마크다운 기호를 제거한 형태
+        "trend_summary": clean_ai_response_text(trend_markdown),
+        "insurance_info": clean_ai_response_text(insurance_markdown),
+        "formatted_trend_summary": clean_prettified_report_text(trend_markdown),
+        "formatted_insurance_info": clean_prettified_report_text(insurance_markdown)
+    }
+
+
+def get_article_summary(title: str, link: str, date_str: str, summary_snippet: str, api_key: str, max_attempts: int = 2, delay_seconds: int = 15) -> str:
+    """
+    Potens.dev AI를 호출하여 제공된 제목, 링크, 날짜, 미리보기 요약을 바탕으로
+    뉴스 기사 내용을 요약합니다. (단일 호출)
+    링크 접근이 불가능할 경우에도 제공된 정보만으로 요약을 시도합니다.
+    """
+    initial_prompt = build_article_summary_prompt(title, link, date_str, summary_snippet)
+
+    response_dict = retry_ai_call(initial_prompt, api_key=api_key, max_retries=max_attempts, delay_seconds=delay_seconds, call_site="article_summary")
     if "text" in response_dict:
         return response_dict["text"]
     else:
@@ -117,21 +908,9 @@ def get_relevant_keywords(trending_keywords_data: list[dict], perspective: str,
     Potens.dev AI를 호출하여 트렌드 키워드 중 특정 관점에서 유의미한 키워드를 선별합니다.
     반환 값: ['keyword1', 'keyword2', ...]
     """
-    prompt_keywords = [{"keyword": k['keyword'], "recent_freq": k['recent_freq']} for k in trending_keywords_data]
-
-    prompt = (
-        f"다음은 뉴스 기사에서 식별된 트렌드 키워드 목록입니다. 이 키워드들을 '{perspective}'의 관점에서 "
-        f"가장 유의미하다고 판단되는 순서대로 최대 5개까지 골라 JSON 배열 형태로 반환해 주세요. "
-        f"다른 설명 없이 JSON 배열만 반환해야 합니다. 각 키워드는 문자열이어야 합니다.\n\n"
-        f"키워드 목록: {json.dumps(prompt_keywords, ensure_ascii=False)}"
-    )
-
-    response_schema = {
-        "type": "ARRAY",
-        "items": {"type": "STRING"}
-    }
+    prompt = build_relevant_keywords_prompt(trending_keywords_data, perspective)
 
-    response_dict = retry_ai_call(prompt, api_key=api_key, response_schema=response_schema, max_retries=max_attempts, delay_seconds=delay_seconds)
+    response_dict = retry_ai_call(prompt, api_key=api_key, response_schema=RELEVANT_KEYWORDS_SCHEMA, max_retries=max_attempts, delay_seconds=delay_seconds, call_site="relevant_keywords")
     if "text" in response_dict and isinstance(response_dict["text"], list):
         return response_dict["text"]
     else:
@@ -151,9 +930,9 @@ def summarize_long_combined_text(combined_text: str, api_key: str,
 
     if len(combined_text) <= max_length_for_direct_call:
         # 길이가 충분히 짧으면 직접 요약 요청
-        prompt = f"다음 텍스트를 간결하게 요약해 주세요.\n\n텍스트: {combined_text}"
+        prompt = build_text_summary_prompt(combined_text)
         # delay_seconds 인자 추가
-        response_dict = retry_ai_call(prompt, api_key=api_key, max_retries=max_attempts, delay_seconds=delay_between_chunks)
+        response_dict = retry_ai_call(prompt, api_key=api_key, max_retries=max_attempts, delay_seconds=delay_between_chunks, call_site="text_summary")
         if "text" in response_dict:
             return clean_ai_response_text(response_dict["text"])
         else:
@@ -164,9 +943,9 @@ def summarize_long_combined_text(combined_text: str, api_key: str,
     
     summarized_chunks = []
     for i, chunk in enumerate(chunks):
-        prompt = f"다음 텍스트를 간결하게 요약해 주세요.\n\n텍스트: {chunk}"
+        prompt = build_text_summary_prompt(chunk)
         # delay_seconds 인자 추가
-        response_dict = retry_ai_call(prompt, api_key=api_key, max_retries=max_attempts, delay_seconds=delay_between_chunks)
+        response_dict = retry_ai_call(prompt, api_key=api_key, max_retries=max_attempts, delay_seconds=delay_between_chunks, call_site="text_summary")
         
         if "text" in response_dict:
             summarized_chunks.append(clean_ai_response_text(response_dict["text"]))
@@ -180,19 +959,16 @@ def summarize_long_combined_text(combined_text: str, api_key: str,
     return " ".join(summarized_chunks)
 
 
-def get_overall_trend_summary(summarized_articles: list[dict], api_key: str, max_attempts: int = 2, delay_seconds: int = 15) -> str:
+def prepare_trend_summary_input(summarized_articles: list[dict], api_key: str) -> tuple[str, str | None]:
     """
-    AI가 요약된 기사들을 바탕으로 전반적인 뉴스 트렌드를 요약합니다.
-    이때, 입력 텍스트가 길 경우 중간 요약 과정을 거칩니다.
+    트렌드 요약 프롬프트에 넣을 입력을 준비합니다. 요약된 기사들을 결합하고, 길 경우 중간 요약 과정을 거칩니다.
+    반환 값: (처리된 텍스트, None) 또는 ("", 실패 메시지)
     """
     if not summarized_articles:
-        return "요약된 기사가 없어 뉴스 트렌드를 요약할 수 없습니다."
+        return "", "요약된 기사가 없어 뉴스 트렌드를 요약할 수 없습니다."
 
     # 요약된 기사 내용을 하나의 긴 텍스트로 결합
-    combined_summaries = "\n\n---\n\n".join([
-        f"제목: {art['제목']}\n날짜: {art['날짜']}\n요약: {art['내용']}"
-        for art in summarized_articles
-    ])
+    combined_summaries = combine_article_summaries(summarized_articles)
 
     # 결합된 요약문이 길 경우, 중간 요약 과정을 거침
     processed_content_for_ai = summarize_long_combined_text(
@@ -204,16 +980,25 @@ def get_overall_trend_summary(summarized_articles: list[dict], api_key: str, max
     )
     
     if "요약 실패" in processed_content_for_ai or not processed_content_for_ai:
-        return f"뉴스 트렌드 요약을 위한 사전 처리 실패: {processed_content_for_ai}"
+        return "", f"뉴스 트렌드 요약을 위한 사전 처리 실패: {processed_content_for_ai}"
+    return processed_content_for_ai, None
 
 
-    prompt = (
-        f"다음은 최근 뉴스 기사 요약문들을 종합한 내용입니다.\n"
-        f"이 내용을 바탕으로 전반적인 뉴스 트렌드를 간결하게 요약해 주세요.\n\n"
-        f"종합된 뉴스 요약 내용:\n{processed_content_for_ai}"
-    )
+def get_overall_trend_summary(summarized_articles: list[dict], api_key: str, max_attempts: int = 2, delay_seconds: int = 15) -> str:
+    """
+    AI가 요약된 기사들을 바탕으로 전반적인 뉴스 트렌드를 요약합니다.
+    이때, 입력 텍스트가 길 경우 중간 요약 과정을 거칩니다.
+    """
+    processed_content_for_ai, error_message = prepare_trend_summary_input(summarized_articles, api_key)
+    if error_message:
+        return error_message
+    return _summarize_trend(processed_content_for_ai, api_key, max_attempts, delay_seconds)
+
+
+def _summarize_trend(processed_content_for_ai: str, api_key: str, max_attempts: int, delay_seconds: int) -> str:
+    prompt = build_trend_summary_prompt(processed_content_for_ai)
 
-    response_dict = retry_ai_call(prompt, api_key=api_key, max_retries=max_attempts, delay_seconds=delay_seconds)
+    response_dict = retry_ai_call(prompt, api_key=api_key, max_retries=max_attempts, delay_seconds=delay_seconds, call_site="trend_summary")
     if "text" in response_dict:
         return response_dict["text"]
     else:
@@ -227,29 +1012,16 @@ def get_insurance_implications_from_ai(trend_summary_text: str, api_key: str, ma
     if not trend_summary_text:
         return "트렌드 요약문이 없어 자동차 보험 산업 관련 정보를 도출할 수 없습니다."
 
-    # 프롬프트 변경: 트렌드 요약문을 바탕으로 자동차 보험 산업에 미칠 영향 추론
-    prompt = (
-        f"다음은 최근 뉴스 트렌드를 요약한 내용입니다.\n"
-        f"이 트렌드 요약문을 바탕으로 '자동차 보험 산업'에 미칠 수 있는 영향에 대해 간결하게 요약해 주세요.\n" # <-- 추론 요청
-        f"한국어로 요약 내용을 제공해 주세요.\n\n"
-        f"뉴스 트렌드 요약문:\n{trend_summary_text}"
-    )
+    prompt = build_insurance_implications_prompt(trend_summary_text)
 
-    response_dict = retry_ai_call(prompt, api_key=api_key, max_retries=max_attempts, delay_seconds=delay_seconds)
+    response_dict = retry_ai_call(prompt, api_key=api_key, max_retries=max_attempts, delay_seconds=delay_seconds, call_site="insurance_implications")
     if "text" in response_dict:
         return response_dict["text"]
     else:
         return response_dict.get("error", "알 수 없는 오류")
 
-def clean_prettified_report_text(text: str) -> str:
-    """
-    AI가 포맷한 보고서 텍스트에서 불필요한 AI 서두/맺음말 문구만 제거하고,
-    마크다운 포맷팅(헤더, 목록, 줄바꿈)은 최대한 유지합니다.
-    """
-    cleaned_text = text
-
-    # AI가 자주 사용하는 서두/맺음말 문구 제거 (정규표현식으로 유연하게 매칭)
-    patterns_to_remove = [
+# AI가 자주 사용하는 서두/맺음말 문구 (정규표현식으로 유연하게 매칭)
+_REPORT_PREAMBLE_PATTERNS = [
         r'다음은 뉴스 트렌드 분석 및 보험 상품 개발 인사이트에 대한 보고서 초안을 바탕으로 재구성된 전문적인 보고서입니다[.:\s]*',
         r'다음은 요청하신 지침에 따라 재구성된 보고서입니다[.:\s]*',
         r'다음은 재구성된 보고서입니다[.:\s]*',
@@ -266,15 +1038,97 @@ def clean_prettified_report_text(text: str) -> str:
         r'다음은 제공된 텍스트를 바탕으로 재구성된 자동차 보험 산업 관련 정보입니다[.:\s]*', # 추가된 패턴
         r'뉴스 트렌드 요약:\s*', # 추가된 패턴
         r'자동차 보험 산업 관련 주요 사실 및 법적 책임:\s*' # 추가된 패턴
-    ]
-    for pattern in patterns_to_remove:
-        cleaned_text = re.sub(pattern, '', cleaned_text, flags=re.IGNORECASE)
+]
+
+# AI가 자주 사용하는 서두 문구 (정규표현식으로 유연하게 매칭)
+_RESPONSE_PREAMBLE_PATTERNS = [
+        r'제공해주신\s*URL의\s*뉴스\s*기사\s*내용을\s*요약해드리겠습니다[.:\s]*',
+        r'주요\s*내용[.:\s]*',
+        r'제공해주신\s*텍스트를\s*요약\s*하겠\s*습니다[.:\s]*\s*요약[.:\s]*',
+        r'요약해\s*드리겠습니다[.:\s]*\s*주요\s*내용\s*요약[.:\s]*',
+        r'다음\s*텍스트의\s*요약입니다[.:\s]*',
+        r'주요\s*내용을\s*요약\s*하면\s*다음과\s*같습니다[.:\s]*',
+        r'핵심\s*내용은\s*다음과\s*같습니다[.:\s]*',
+        r'요약하자면[.:\s]*',
+        r'주요\s*요약[.:\s]*',
+        r'텍스트를\s*요약하면\s*다음과\s*같습니다[.:\s]*',
+        r'제공된\s*텍스트에\s*대한\s*요약입니다[.:\s]*',
+        r'다음은\s*ai가\s*내용을\s*요약한\s*것입니다[.:\s]*',
+        r'먼저\s*최신\s*정보가\s*필요합니다[.:\s]*\s*현재\s*자율주행차\s*기술과\s*관련된\s*최신\s*트렌드를\s*확인해보겠습니다[.:\s]*',
+        r'ai\s*답변[.:\s]*',
+        r'ai\s*분석[.:\s]*',
+        r'다음은\s*요청하신\s*링크의\s*본문\s*내용입니다[.:\s]*',
+        r'다음은\s*제공된\s*뉴스\s*기사의\s*핵심\s*내용입니다[.:\s]*',
+        r'뉴스\s*기사\s*주요\s*내용\s*요약[.:\s]*',
+        r'검색을\s*진행할\s*URL을\s*찾고\s*있어요[.:\s]*\s*\(1/3\)\s*제공해주신\s*URL에서\s*뉴스\s*기사의\s*주요\s*내용을\s*추출하겠습니다[.:\s]*',
+        r'검색을\s*진행할\s*URL을\s*찾았습니다[.:\s]*\s*\(1/3\)\s*해당\s*링크에서\s*뉴스\s*기사의\s*핵심\s*내용을\s*추출하겠습니다[.:\s]*',
+        r'검색을\s*진행할\s*URL을\s*찾고\s*있어요[.:\s]*\s*\(1/3\)\s*제공해주신\s*링크에서\s*기사\s*내용을\s*추출하겠습니다[.:\s]*',
+        r'검색을\s*진행할\s*URL을\s*찾고\s*있어요[.:\s]*\s*\(1/3\)\s*해당\s*URL에서\s*뉴스\s*기사의\s*주요\s*내용을\s*추출하겠습니다[.:\s]*',
+        r'검색을\s*진행할\s*URL을\s*찾고\s*있어요[.:\s]*\s*\(1/3\)\s*URL을\s*검색하여\s*기사\s*내용을\s*확인하겠습니다[.:\s]*\s*검색\s*결과를\s*바탕으로\s*다음과\s*같이\s*기사의\s*핵심\s*내용만\s*추출했습니다[.:\s]*',
+        r'검색을\s*진행할\s*URL을\s*찾고\s*있어요[.:\s]*\s*\(1/3\)\s*해당\s*URL에서\s*기사\s*내용을\s*확인하겠습니다[.:\s]*\s*기사의\s*주요\s*내용을\s*추출했습니다[.:\s]*',
+        r'검색을\s*진행할\s*URL을\s*찾고\s*있어요[.:\s]*\s*\(1/3\)\s*웹사이트의\s*내용을\s*확인하겠습니다[.:\s]*\s*기사의\s*주요\s*내용을\s*광고나\s*불필요한\s*정보\s*없이\s*추출해\s*드리겠습니다[.:\s]*',
+        r'이상입니다[.:\s]*',
+        r'이상입니다[.:\s]*\s*광고나\s*불필요한\s*정보는\s*제외하고\s*주요\s*내용만\s*추출했습니다[.:\s]*',
+        r'이것이\s*제공해주신\s*YTN\s*뉴스\s*링크에서\s*추출한\s*핵심\s*기사\s*내용입니다[.:\s]*\s*광고나\s*불필요한\s*정보는\s*제외하고\s*기사의\s*주요\s*내용만\s*추출했습니다[.:\s]*',
+        r'위\s*내용은\s*제공해주신\s*URL에서\s*추출한\s*기사의\s*핵심\s*내용입니다[.:\s]*\s*광고나\s*불필요한\s*정보를\s*제거하고\s*주요\s*내용만\s*정리했습니다[.:\s]*',
+        r'제공해주신\s*링크\(https?://[^\s]+\)\s*는\s*연합뉴스의\s*사진\s*기사로,\s*\d{4}년\s*\d{1,2}월\s*\d{1,2}일에\s*게시된\s*내용입니다[.:\s]*\s*기사\s*제목:\s*""[^""]+""\s*핵심\s*내용:[.:\s]*',
+]
+
+
+def _compile_preamble_patterns(patterns: list[str]) -> tuple[list, "re.Pattern"]:
+    """
+    서두 문구 패턴을 미리 컴파일하고, 각 패턴이 매칭되려면 반드시 포함되어야 하는
+    한글 리터럴(패턴 안의 가장 긴 한글 구간)을 함께 반환합니다.
+    패턴은 기존과 같이 순서대로 하나씩 적용해야 결과가 동일하므로(앞 패턴의 제거가 뒤 패턴의 매칭에 영향)
+    하나의 alternation으로 합치지 않고, 리터럴 사전 필터로 매칭될 수 없는 re.sub만 건너뜁니다.
+    예: "요약해 드리겠습니다. 주요 내용 요약: 본문"은 '주요 내용'이 먼저 제거되어 "요약해 드리겠습니다. 요약: 본문"이 되지만,
+    하나의 alternation은 더 긴 '요약해 드리겠습니다 ... 주요 내용 요약' 패턴을 먼저 매칭해 "본문"만 남깁니다.
+    """
+    compiled = []
+    for pattern in patterns:
+        literal = max(re.findall(r'[가-힣]{2,}', pattern), key=len)
+        compiled.append((re.compile(pattern, re.IGNORECASE), literal))
+    # 리터럴 중 하나라도 있는지 한 번에 확인하기 위한 사전 필터
+    prefilter = re.compile("|".join(sorted({re.escape(literal) for _, literal in compiled}, key=len, reverse=True)))
+    return compiled, prefilter
+
+
+_REPORT_PREAMBLE_COMPILED, _REPORT_PREAMBLE_PREFILTER = _compile_preamble_patterns(_REPORT_PREAMBLE_PATTERNS)
+_RESPONSE_PREAMBLE_COMPILED, _RESPONSE_PREAMBLE_PREFILTER = _compile_preamble_patterns(_RESPONSE_PREAMBLE_PATTERNS)
+
+_CODE_BLOCK_RE = re.compile(r'```(?:json|text)?\s*([\s\S]*?)\s*```', re.IGNORECASE)
+_BOLD_STAR_RE = re.compile(r'\*\*(.*?)\*\*')
+_BOLD_UNDERSCORE_RE = re.compile(r'__(.*?)__')
+_ITALIC_STAR_RE = re.compile(r'\*(.*?)\*')
+_ITALIC_UNDERSCORE_RE = re.compile(r'_(.*?)_')
+_LIST_MARKER_RE = re.compile(r'^\s*[-+]\s*', re.MULTILINE)
+_NUMBERED_MARKER_RE = re.compile(r'^\s*\d+\.\s*', re.MULTILINE)
+_HORIZONTAL_SPACE_RE = re.compile(r'[ \t]+')
+_LEADING_SPACE_RE = re.compile(r'^\s+', re.MULTILINE)
+
+
+def _remove_preamble_phrases(text: str, compiled_patterns: list, prefilter) -> str:
+    """서두 문구 패턴을 순서대로 제거합니다. 필수 리터럴이 현재 텍스트에 없는 패턴은 건너뜁니다."""
+    if not prefilter.search(text):
+        return text
+    for pattern, literal in compiled_patterns:
+        if literal in text:
+            text = pattern.sub('', text)
+    return text
+
+
+def clean_prettified_report_text(text: str) -> str:
+    """
+    AI가 포맷한 보고서 텍스트에서 불필요한 AI 서두/맺음말 문구만 제거하고,
+    마크다운 포맷팅(헤더, 목록, 줄바꿈)은 최대한 유지합니다.
+    """
+    cleaned_text = _remove_preamble_phrases(text, _REPORT_PREAMBLE_COMPILED, _REPORT_PREAMBLE_PREFILTER)
 
     # 여러 개의 공백을 하나로 대체 (줄바꿈은 유지)
-    cleaned_text = re.sub(r'[ \t]+', ' ', cleaned_text)
+    cleaned_text = _HORIZONTAL_SPACE_RE.sub(' ', cleaned_text)
     
     # 문단 시작 부분의 불필요한 공백 제거 (줄바꿈은 유지)
-    cleaned_text = re.sub(r'^\s+', '', cleaned_text, flags=re.MULTILINE)
+    cleaned_text = _LEADING_SPACE_RE.sub('', cleaned_text)
 
     return cleaned_text.strip()
 
@@ -286,93 +1140,102 @@ def format_text_with_markdown(text_to_format: str, api_key: str, max_attempts: i
     if not text_to_format:
         return "포맷팅할 내용이 없습니다."
 
-    prompt = (
-        f"다음 텍스트를 전문적이고 가독성 높은 마크다운 형식으로 재구성해 주세요.\n"
-        f"텍스트 파일로 저장했을 때 줄바꿈과 들여쓰기가 명확하게 보이도록 마크다운 문법을 활용하여 구조화해 주세요.\n"
-        f"핵심 내용은 강조(예: 볼드체)하거나 목록 형태로 정리하여 시각적으로 돋보이게 해주세요.\n"
-        f"문단 간의 간격을 적절히 조절하여 가독성을 높여 주세요. 각 문단은 최소 한 줄 이상 비워주세요.\n"
-        f"불필요한 반복이나 비문은 수정하고, 전문적인 보고서 톤앤매너를 유지해 주세요.\n"
-        f"모든 내용은 한국어로 작성해 주세요.\n"
-        f"**중요: 응답은 오직 재구성된 내용만 포함해야 합니다. 다른 설명이나 서두 문구는 절대 포함하지 마세요.**\n\n"
-        f"[원본 텍스트]\n"
-        f"{text_to_format}"
-    )
+    prompt = build_markdown_format_prompt(text_to_format)
 
-    response_dict = retry_ai_call(prompt, api_key=api_key, max_retries=max_attempts, delay_seconds=delay_seconds)
+    response_dict = retry_ai_call(prompt, api_key=api_key, max_retries=max_attempts, delay_seconds=delay_seconds, call_site="markdown_format")
     if "text" in response_dict:
         # 새로운 클리닝 함수를 사용하여 AI가 포맷한 보고서 텍스트를 정리
         return clean_prettified_report_text(response_dict["text"])
     else:
         return response_dict.get("error", "AI를 통한 보고서 포맷팅 실패.")
 
+
+NO_TREND_SUMMARY_MESSAGE = "트렌드 요약문이 없어 자동차 보험 산업 관련 정보를 도출할 수 없습니다."
+
+def get_trend_insights(summarized_articles: list[dict], api_key: str, max_attempts: int = 2, delay_seconds: int = 15,
+                       structured: bool = True) -> dict:
+    """
+    트렌드 요약, 자동차 보험 산업 영향 분석, 두 결과의 마크다운 포맷팅을 생성합니다.
+    structured=True면 response_schema(TREND_INSIGHTS_SCHEMA)를 사용한 한 번의 호출로 두 결과를 마크다운까지 받고,
+    구조화 응답이 실패하거나 형식이 맞지 않으면 기존 4단계 호출(트렌드 요약 → 보험 영향 → 각각 포맷팅)로 대체합니다.
+    대체 호출에서 트렌드 요약 포맷팅은 보험 영향 분석/포맷팅과 동시에 실행합니다.
+    반환 값: {"trend_summary", "insurance_info", "formatted_trend_summary", "formatted_insurance_info", "mode"}
+    (mode: "structured" / "chain"(대체 호출) / "failed"(사전 처리 실패 또는 서킷 차단, formatted_* 는 빈 문자열))
+    """
+    processed_content_for_ai, error_message = prepare_trend_summary_input(summarized_articles, api_key)
+    if error_message:
+        return {"trend_summary": error_message, "insurance_info": NO_TREND_SUMMARY_MESSAGE,
+                "formatted_trend_summary": "", "formatted_insurance_info": "", "mode": "failed"}
+
+    if structured:
+        response_dict = retry_ai_call(build_trend_insights_prompt(processed_content_for_ai), api_key=api_key,
+                                      response_schema=TREND_INSIGHTS_SCHEMA, max_retries=max_attempts,
+                                      delay_seconds=delay_seconds, call_site="trend_insights")
+        insights = parse_trend_insights(response_dict)
+        if insights:
+            return {**insights, "mode": "structured"}
+        if is_circuit_open_error(response_dict): # 대체 호출도 즉시 실패하므로 바로 반환
+            return {"trend_summary": response_dict["error"], "insurance_info": response_dict["error"],
+                    "formatted_trend_summary": "", "formatted_insurance_info": "", "mode": "failed"}
+
+    trend_summary = clean_ai_response_text(_summarize_trend(processed_content_for_ai, api_key, max_attempts, delay_seconds))
+    # 트렌드 요약 포맷팅은 보험 영향 분석과 서로 의존하지 않으므로 작업 스레드에서 동시에 실행합니다
+    # (대기 시간: 트렌드 요약 → 보험 영향 → 보험 영향 포맷팅. ai_metrics 실행 기록이 이어지도록 contextvars를 복사).
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-markdown_format") as executor:
+        formatted_trend_future = executor.submit(contextvars.copy_context().run, format_text_with_markdown,
+                                                 trend_summary, api_key, max_attempts, delay_seconds)
+        insurance_info = clean_ai_response_text(get_insurance_implications_from_ai(trend_summary, api_key, max_attempts, delay_seconds))
+        formatted_insurance_info = format_text_with_markdown(insurance_info, api_key, max_attempts, delay_seconds)
+        formatted_trend_summary = formatted_trend_future.result()
+    return {
+        "trend_summary": trend_summary,
+        "insurance_info": insurance_info,
+        "formatted_trend_summary": formatted_trend_summary,
+        "formatted_insurance_info": formatted_insurance_info,
+        "mode": "chain"
+    }
+
+
 def clean_ai_response_text(text: str) -> str:
     """
     AI 응답 텍스트에서 불필요한 마크다운 기호, 여러 줄바꿈,
     그리고 AI가 자주 사용하는 서두 문구들을 제거하여 평탄화합니다.
     이 함수는 주로 요약이나 QA 답변 등 일반 텍스트 출력을 위해 사용됩니다.
+    각 단계는 해당 기호가 텍스트에 있을 때만 실행합니다 (결과는 항상 실행할 때와 동일).
     """
+    cleaned_text = text
+
     # 1. 마크다운 코드 블록 제거 (예: ```json ... ```)
-    cleaned_text = re.sub(r'```(?:json|text)?\s*([\s\S]*?)\s*```', r'\1', text, flags=re.IGNORECASE)
+    if '```' in cleaned_text:
+        cleaned_text = _CODE_BLOCK_RE.sub(r'\1', cleaned_text)
 
     # 2. 마크다운 헤더 기호 제거 (예: #, ##, ### 등) - 줄 시작에 관계없이 모든 # 제거
     #    이전 버전에서 #+ 였으나, 이제는 #만 제거하고 +는 리스트 기호로 따로 처리
-    cleaned_text = re.sub(r'#+', '', cleaned_text)
+    cleaned_text = cleaned_text.replace('#', '')
 
     # 3. 마크다운 볼드체/이탤릭체 기호 제거 (예: **, __, *, _) - 텍스트는 남기고 기호만 제거
-    cleaned_text = re.sub(r'\*\*(.*?)\*\*', r'\1', cleaned_text) # **text** -> text
-    cleaned_text = re.sub(r'__(.*?)__', r'\1', cleaned_text) # __text__ -> text
-    cleaned_text = re.sub(r'\*(.*?)\*', r'\1', cleaned_text) # *text* -> text
-    cleaned_text = re.sub(r'_(.*?)_', r'\1', cleaned_text) # _text_ -> text
+    if '**' in cleaned_text:
+        cleaned_text = _BOLD_STAR_RE.sub(r'\1', cleaned_text) # **text** -> text
+    if '__' in cleaned_text:
+        cleaned_text = _BOLD_UNDERSCORE_RE.sub(r'\1', cleaned_text) # __text__ -> text
+    if '*' in cleaned_text:
+        cleaned_text = _ITALIC_STAR_RE.sub(r'\1', cleaned_text) # *text* -> text
+    if '_' in cleaned_text:
+        cleaned_text = _ITALIC_UNDERSCORE_RE.sub(r'\1', cleaned_text) # _text_ -> text
 
     # 4. 마크다운 리스트 기호 제거 (예: -, +) - 줄 시작에 관계없이 제거
     #    \s*는 공백을 의미하며, 리스트 기호 뒤에 공백이 있을 수 있으므로 포함
-    cleaned_text = re.sub(r'^\s*[-+]\s*', '', cleaned_text, flags=re.MULTILINE)
+    if '-' in cleaned_text or '+' in cleaned_text:
+        cleaned_text = _LIST_MARKER_RE.sub('', cleaned_text)
 
     # 5. 번호가 매겨진 목록 마커 제거 (예: "1.", "2.", "3.") - 줄 시작에 관계없이 제거
-    cleaned_text = re.sub(r'^\s*\d+\.\s*', '', cleaned_text, flags=re.MULTILINE)
+    if '.' in cleaned_text:
+        cleaned_text = _NUMBERED_MARKER_RE.sub('', cleaned_text)
 
-    # 6. AI가 자주 사용하는 서두 문구 제거 (정규표현식으로 유연하게 매칭)
-    patterns_to_remove = [
-        r'제공해주신\s*URL의\s*뉴스\s*기사\s*내용을\s*요약해드리겠습니다[.:\s]*',
-        r'주요\s*내용[.:\s]*',
-        r'제공해주신\s*텍스트를\s*요약\s*하겠\s*습니다[.:\s]*\s*요약[.:\s]*',
-        r'요약해\s*드리겠습니다[.:\s]*\s*주요\s*내용\s*요약[.:\s]*',
-        r'다음\s*텍스트의\s*요약입니다[.:\s]*',
-        r'주요\s*내용을\s*요약\s*하면\s*다음과\s*같습니다[.:\s]*',
-        r'핵심\s*내용은\s*다음과\s*같습니다[.:\s]*',
-        r'요약하자면[.:\s]*',
-        r'주요\s*요약[.:\s]*',
-        r'텍스트를\s*요약하면\s*다음과\s*같습니다[.:\s]*',
-        r'제공된\s*텍스트에\s*대한\s*요약입니다[.:\s]*',
-        r'다음은\s*ai가\s*내용을\s*요약한\s*것입니다[.:\s]*',
-        r'먼저\s*최신\s*정보가\s*필요합니다[.:\s]*\s*현재\s*자율주행차\s*기술과\s*관련된\s*최신\s*트렌드를\s*확인해보겠습니다[.:\s]*',
-        r'ai\s*답변[.:\s]*',
-        r'ai\s*분석[.:\s]*',
-        r'다음은\s*요청하신\s*링크의\s*본문\s*내용입니다[.:\s]*',
-        r'다음은\s*제공된\s*뉴스\s*기사의\s*핵심\s*내용입니다[.:\s]*',
-        r'뉴스\s*기사\s*주요\s*내용\s*요약[.:\s]*',
-        r'검색을\s*진행할\s*URL을\s*찾고\s*있어요[.:\s]*\s*\(1/3\)\s*제공해주신\s*URL에서\s*뉴스\s*기사의\s*주요\s*내용을\s*추출하겠습니다[.:\s]*',
-        r'검색을\s*진행할\s*URL을\s*찾았습니다[.:\s]*\s*\(1/3\)\s*해당\s*링크에서\s*뉴스\s*기사의\s*핵심\s*내용을\s*추출하겠습니다[.:\s]*',
-        r'검색을\s*진행할\s*URL을\s*찾고\s*있어요[.:\s]*\s*\(1/3\)\s*제공해주신\s*링크에서\s*기사\s*내용을\s*추출하겠습니다[.:\s]*',
-        r'검색을\s*진행할\s*URL을\s*찾고\s*있어요[.:\s]*\s*\(1/3\)\s*해당\s*URL에서\s*뉴스\s*기사의\s*주요\s*내용을\s*추출하겠습니다[.:\s]*',
-        r'검색을\s*진행할\s*URL을\s*찾고\s*있어요[.:\s]*\s*\(1/3\)\s*URL을\s*검색하여\s*기사\s*내용을\s*확인하겠습니다[.:\s]*\s*검색\s*결과를\s*바탕으로\s*다음과\s*같이\s*기사의\s*핵심\s*내용만\s*추출했습니다[.:\s]*',
-        r'검색을\s*진행할\s*URL을\s*찾고\s*있어요[.:\s]*\s*\(1/3\)\s*해당\s*URL에서\s*기사\s*내용을\s*확인하겠습니다[.:\s]*\s*기사의\s*주요\s*내용을\s*추출했습니다[.:\s]*',
-        r'검색을\s*진행할\s*URL을\s*찾고\s*있어요[.:\s]*\s*\(1/3\)\s*웹사이트의\s*내용을\s*확인하겠습니다[.:\s]*\s*기사의\s*주요\s*내용을\s*광고나\s*불필요한\s*정보\s*없이\s*추출해\s*드리겠습니다[.:\s]*',
-        r'이상입니다[.:\s]*',
-        r'이상입니다[.:\s]*\s*광고나\s*불필요한\s*정보는\s*제외하고\s*주요\s*내용만\s*추출했습니다[.:\s]*',
-        r'이것이\s*제공해주신\s*YTN\s*뉴스\s*링크에서\s*추출한\s*핵심\s*기사\s*내용입니다[.:\s]*\s*광고나\s*불필요한\s*정보는\s*제외하고\s*기사의\s*주요\s*내용만\s*추출했습니다[.:\s]*',
-        r'위\s*내용은\s*제공해주신\s*URL에서\s*추출한\s*기사의\s*핵심\s*내용입니다[.:\s]*\s*광고나\s*불필요한\s*정보를\s*제거하고\s*주요\s*내용만\s*정리했습니다[.:\s]*',
-        r'제공해주신\s*링크\(https?://[^\s]+\)\s*는\s*연합뉴스의\s*사진\s*기사로,\s*\d{4}년\s*\d{1,2}월\s*\d{1,2}일에\s*게시된\s*내용입니다[.:\s]*\s*기사\s*제목:\s*""[^""]+""\s*핵심\s*내용:[.:\s]*',
-    ]
-    for pattern in patterns_to_remove:
-        cleaned_text = re.sub(pattern, '', cleaned_text, flags=re.IGNORECASE)
+    # 6. AI가 자주 사용하는 서두 문구 제거
+    cleaned_text = _remove_preamble_phrases(cleaned_text, _RESPONSE_PREAMBLE_COMPILED, _RESPONSE_PREAMBLE_PREFILTER)
 
     # 7. 줄바꿈 및 공백 정규화
-    #    두 개 이상의 줄바꿈은 단락 구분으로 유지
-    cleaned_text = re.sub(r'\n{2,}', '\n\n', cleaned_text)
-    #    단일 줄바꿈은 공백으로 처리 (긴 줄 방지 및 자연스러운 흐름)
-    cleaned_text = re.sub(r'\n', ' ', cleaned_text)
-    #    여러 공백을 하나로, 앞뒤 공백 제거
-    cleaned_text = re.sub(r'\s+', ' ', cleaned_text).strip()
-
-    return cleaned_text
+    #    단락 구분(\n\n), 단일 줄바꿈, 여러 공백이 모두 결국 공백 하나로 합쳐지므로
+    #    공백 문자 기준 split/join 한 번으로 처리하고 앞뒤 공백 제거
+    return " ".join(cleaned_text.split())
@@ -2,8 +2,6 @@
 
 import sqlite3
 from datetime import datetime
-import streamlit as st # Streamlit의 st.session_state, st.success, st.error 등을 사용하기 위해 임시로 import.
-                        # 실제 프로덕션에서는 이 로깅 부분을 다른 방식으로 처리하는 것이 좋습니다.
 
 DB_FILE = 'news_data.db'
 
@@ -52,7 +50,7 @@ def init_db():
             generation_timestamp TEXT NOT NULL
         )
     ''')
-    # 새 테이블 추가: 문서 분석을 위해 업로드된 문서의 전체 텍스트 저장
+    # 문서 분석을 위해 업로드된 문서의 전체 텍스트 저장 (현재는 기록하지 않음. 이전 버전에서 저장한 텍스트는 초기화 시 삭제)
     c.execute('''
         CREATE TABLE IF NOT EXISTS document_texts (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -60,6 +58,57 @@ def init_db():
             timestamp TEXT NOT NULL
         )
     ''')
+    # 새 테이블 추가: 실행(run)별 AI 호출 계측 기록 (modules/ai_metrics.py)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS ai_call_metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT NOT NULL,
+            run_name TEXT NOT NULL,
+            call_site TEXT NOT NULL,
+            started_at TEXT NOT NULL,
+            latency_ms REAL NOT NULL,
+            attempts INTEGER NOT NULL,
+            outcome TEXT NOT NULL,
+            request_bytes INTEGER NOT NULL,
+            response_bytes INTEGER NOT NULL,
+            prompt_tokens INTEGER NOT NULL,
+            response_tokens INTEGER NOT NULL
+        )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_ai_call_metrics_run_id ON ai_call_metrics (run_id)")
+    # 새 테이블 추가: 문서 QA 답변 캐시 (modules/qa_cache.py)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS qa_cache (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            doc_set_key TEXT NOT NULL,
+            question_norm TEXT NOT NULL,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            sources_json TEXT NOT NULL,
+            embedding BLOB,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            UNIQUE(doc_set_key, question_norm)
+        )
+    ''')
+    # 새 테이블 추가: 백그라운드 작업 상태/진행률/결과 (modules/job_runner.py)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL, -- queued, running, succeeded, failed
+            stage TEXT NOT NULL DEFAULT '',
+            progress REAL NOT NULL DEFAULT 0,
+            message TEXT NOT NULL DEFAULT '',
+            params_json TEXT NOT NULL,
+            result_json TEXT,
+            error TEXT,
+            created_at TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT,
+            updated_at TEXT NOT NULL
+        )
+    ''')
     conn.commit()
     conn.close()
 
@@ -88,6 +137,10 @@ def get_all_articles():
 
 def clear_db_content():
     """데이터베이스의 모든 기사 기록을 삭제합니다."""
+    # 결과 메시지를 st.session_state에 남기는 이 함수에서만 Streamlit을 사용하므로 여기서 import
+    # (벤치마크/CLI 등 Streamlit 없이 이 모듈을 쓰는 경로에서 streamlit을 불러오지 않음)
+    # 실제 프로덕션에서는 이 로깅 부분을 다른 방식으로 처리하는 것이 좋습니다.
+    import streamlit as st
     conn = sqlite3.connect(DB_FILE)
     c = conn.cursor()
     try:
@@ -97,6 +150,9 @@ def clear_db_content():
         c.execute("DELETE FROM scheduled_tasks")
         c.execute("DELETE FROM generated_endorsements")
         c.execute("DELETE FROM document_texts")
+        c.execute("DELETE FROM ai_call_metrics")
+        c.execute("DELETE FROM qa_cache")
+        c.execute("DELETE FROM jobs WHERE status IN ('succeeded', 'failed')") # 실행 중인 작업은 유지
         conn.commit()
         st.session_state['db_status_message'] = "데이터베이스의 모든 기록이 성공적으로 삭제되었습니다."
         st.session_state['db_status_type'] = "success"
@@ -256,37 +312,155 @@ def get_latest_generated_endorsement() -> str | None:
         return result[0]
     return None
 
-# --- 문서 텍스트 저장 및 로드 함수 (새로 추가) ---
-def save_document_text(full_text: str):
-    """
-    업로드된 문서의 전체 텍스트를 데이터베이스에 저장합니다.
-    항상 가장 최신 텍스트만 유지합니다 (기존 텍스트 삭제 후 새로 삽입).
-    """
+# --- AI 호출 계측 기록 저장 및 로드 함수 ---
+AI_CALL_METRIC_COLUMNS = ("call_site", "started_at", "latency_ms", "attempts", "outcome",
+                          "request_bytes", "response_bytes", "prompt_tokens", "response_tokens")
+
+def save_ai_call_metrics(run_id: str, run_name: str, records: list[dict]):
+    """한 실행(run)에서 발생한 AI 호출 기록(ai_metrics.record_ai_call 형식)을 저장합니다."""
     conn = sqlite3.connect(DB_FILE)
     c = conn.cursor()
     try:
-        # 기존 문서 텍스트 삭제
-        c.execute("DELETE FROM document_texts")
-        # 새 문서 텍스트 삽입
-        c.execute("INSERT INTO document_texts (full_text, timestamp) VALUES (?, ?)",
-                  (full_text, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+        c.executemany(
+            f"INSERT INTO ai_call_metrics (run_id, run_name, {', '.join(AI_CALL_METRIC_COLUMNS)}) "
+            f"VALUES (?, ?, {', '.join('?' * len(AI_CALL_METRIC_COLUMNS))})",
+            [(run_id, run_name, *(record[col] for col in AI_CALL_METRIC_COLUMNS)) for record in records]
+        )
         conn.commit()
         return True
     except Exception as e:
-        print(f"오류: 문서 텍스트 저장 실패 - {e}")
+        print(f"오류: AI 호출 계측 기록 저장 실패 - {e} (run_id: {run_id})")
         return False
     finally:
         conn.close()
 
-def get_latest_document_text() -> str | None:
-    """
-    데이터베이스에 저장된 가장 최신 문서 텍스트를 가져옵니다.
-    """
+def get_ai_call_metrics(run_id: str) -> list[dict]:
+    """지정된 실행의 AI 호출 기록을 호출 순서대로 가져옵니다."""
     conn = sqlite3.connect(DB_FILE)
     c = conn.cursor()
-    c.execute("SELECT full_text FROM document_texts ORDER BY timestamp DESC LIMIT 1")
-    result = c.fetchone()
+    c.execute(f"SELECT {', '.join(AI_CALL_METRIC_COLUMNS)} FROM ai_call_metrics WHERE run_id = ? ORDER BY id", (run_id,))
+    rows = c.fetchall()
     conn.close()
-    if result:
-        return result[0]
-    return None
+    return [dict(zip(AI_CALL_METRIC_COLUMNS, row)) for row in rows]
+
+def get_recent_ai_runs(limit: int = 10) -> list[dict]:
+    """최근 실행 목록(run_id, run_name, 호출 수, 시작 시각)을 최신순으로 가져옵니다."""
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("SELECT run_id, run_name, COUNT(*), MIN(started_at) FROM ai_call_metrics "
+              "GROUP BY run_id, run_name ORDER BY MAX(id) DESC LIMIT ?", (limit,))
+    rows = c.fetchall()
+    conn.close()
+    return [{"run_id": r[0], "run_name": r[1], "call_count": r[2], "started_at": r[3]} for r in rows]
+
+# --- 문서 QA 답변 캐시 저장 및 조회 함수 ---
+QA_CACHE_COLUMNS = ("question", "answer", "sources_json", "embedding", "created_at")
+
+def save_qa_cache_entry(doc_set_key: str, question_norm: str, question: str, answer: str, sources_json: str,
+                        embedding: bytes | None, created_at: float, expires_at: float):
+    """QA 답변을 캐시에 저장합니다. 같은 문서 묶음/정규화 질문이 있으면 교체합니다."""
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    try:
+        c.execute("INSERT OR REPLACE INTO qa_cache (doc_set_key, question_norm, question, answer, sources_json, embedding, created_at, expires_at) "
+                  "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                  (doc_set_key, question_norm, question, answer, sources_json, embedding, created_at, expires_at))
+        conn.commit()
+        return True
+    except Exception as e:
+        print(f"오류: QA 캐시 저장 실패 - {e}")
+        return False
+    finally:
+        conn.close()
+
+def get_qa_cache_entry(doc_set_key: str, question_norm: str, now: float) -> dict | None:
+    """만료되지 않은 QA 캐시 항목을 정확히 일치하는 정규화 질문으로 가져옵니다."""
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute(f"SELECT {', '.join(QA_CACHE_COLUMNS)} FROM qa_cache WHERE doc_set_key = ? AND question_norm = ? AND expires_at > ?",
+              (doc_set_key, question_norm, now))
+    row = c.fetchone()
+    conn.close()
+    return dict(zip(QA_CACHE_COLUMNS, row)) if row else None
+
+def get_qa_cache_entries(doc_set_key: str, now: float, limit: int = 2000) -> list[dict]:
+    """문서 묶음의 만료되지 않은 QA 캐시 항목 중 임베딩이 있는 최근 항목을 최대 limit개 가져옵니다 (유사 질문 검색용)."""
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute(f"SELECT {', '.join(QA_CACHE_COLUMNS)} FROM qa_cache WHERE doc_set_key = ? AND expires_at > ? AND embedding IS NOT NULL "
+              "ORDER BY created_at DESC LIMIT ?",
+              (doc_set_key, now, limit))
+    rows = c.fetchall()
+    conn.close()
+    return [dict(zip(QA_CACHE_COLUMNS, row)) for row in rows]
+
+def delete_expired_qa_cache(now: float) -> int:
+    """만료된 QA 캐시 항목을 삭제하고 삭제한 개수를 반환합니다."""
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    try:
+        c.execute("DELETE FROM qa_cache WHERE expires_at <= ?", (now,))
+        conn.commit()
+        return c.rowcount
+    finally:
+        conn.close()
+
+# --- 백그라운드 작업 저장 및 조회 함수 ---
+JOB_COLUMNS = ("id", "kind", "status", "stage", "progress", "message", "params_json", "result_json", "error",
+               "created_at", "started_at", "finished_at", "updated_at")
+
+def create_job(job_id: str, kind: str, params_json: str) -> bool:
+    """대기(queued) 상태의 작업을 추가합니다."""
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    try:
+        c.execute("INSERT INTO jobs (id, kind, status, params_json, created_at, updated_at) VALUES (?, ?, 'queued', ?, ?, ?)",
+                  (job_id, kind, params_json, now, now))
+        conn.commit()
+        return True
+    except Exception as e:
+        print(f"오류: 작업 생성 실패 - {e} (job_id: {job_id})")
+        return False
+    finally:
+        conn.close()
+
+def update_job(job_id: str, **fields) -> bool:
+    """작업의 지정된 컬럼(status, stage, progress, message, result_json, error, started_at, finished_at)을 갱신합니다."""
+    unknown = set(fields) - set(JOB_COLUMNS[2:])
+    if unknown:
+        raise ValueError(f"알 수 없는 작업 컬럼: {sorted(unknown)}")
+    fields["updated_at"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    try:
+        c.execute(f"UPDATE jobs SET {', '.join(f'{col} = ?' for col in fields)} WHERE id = ?", (*fields.values(), job_id))
+        conn.commit()
+        return c.rowcount > 0
+    except Exception as e:
+        print(f"오류: 작업 상태 갱신 실패 - {e} (job_id: {job_id})")
+        return False
+    finally:
+        conn.close()
+
+def get_job(job_id: str) -> dict | None:
+    """작업 한 건을 가져옵니다."""
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,))
+    row = c.fetchone()
+    conn.close()
+    return dict(zip(JOB_COLUMNS, row)) if row else None
+
+def fail_unfinished_jobs(error: str) -> int:
+    """대기/실행 중으로 남은 작업(이전 프로세스가 종료되며 중단된 작업)을 실패로 표시하고 개수를 반환합니다."""
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    try:
+        c.execute("UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, updated_at = ? "
+                  "WHERE status IN ('queued', 'running')", (error, now, now))
+        conn.commit()
+        return c.rowcount
+    finally:
+        conn.close()
@@ -7,7 +7,10 @@ from datetime import datetime # 파일명에 타임스탬프를 위해 추가
 
 # --- 모듈 임포트 ---
 from modules import ai_service # AI 서비스 모듈
+from modules import ai_metrics # AI 호출 계측 모듈
 from modules import document_processor # 새로 만든 문서 처리 모듈
+from modules import vector_index_store # 문서 해시 기반 FAISS 인덱스 저장소
+from modules import qa_cache # 문서 QA 답변 캐시
 from modules import database_manager # 데이터베이스 관리 모듈 임포트
 
 from langchain.memory import StreamlitChatMessageHistory # Langchain Streamlit 통합
@@ -51,14 +54,17 @@ def document_analysis_page():
     # 세션 상태 초기화
     if "vectordb" not in st.session_state:
         st.session_state.vectordb = None
+    if "retriever" not in st.session_state: # BM25 + 벡터 하이브리드 검색기 (문서 처리 시 생성)
+        st.session_state.retriever = None
+    if "document_set_key" not in st.session_state: # 처리한 문서 묶음의 내용 해시 (QA 캐시 키)
+        st.session_state.document_set_key = None
     if 'messages' not in st.session_state:
         st.session_state.messages = [{
             "role": "assistant",
             "content": "안녕하세요! 문서 기반 질문을 해보세요."
         }]
-    # 오류 수정: 'not not'을 'not in'으로 변경
-    if "docs" not in st.session_state: # 특약 생성 기능에서 필요
-        st.session_state.docs = []
+    if "failed_document_reports" not in st.session_state: # 마지막 문서 처리에서 읽지 못한 파일의 보고
+        st.session_state.failed_document_reports = []
     # 'generated_endorsement_text' 대신 'generated_endorsement_sections'로 변경하여 각 섹션별로 저장
     if 'generated_endorsement_sections' not in st.session_state:
         st.session_state.generated_endorsement_sections = {}
@@ -76,6 +82,16 @@ def document_analysis_page():
         selected_menu = st.selectbox("📌 메뉴 선택", ["최신 QA", "특약 생성"])
         uploaded_files = st.file_uploader("📎 문서 업로드", type=['pdf', 'docx', 'pptx', 'txt'], accept_multiple_files=True)
         process = st.button("📚 문서 처리")
+        # 읽지 못한 파일은 건너뛰고 나머지로 분석하므로 사용자에게 알림
+        for report in st.session_state.failed_document_reports:
+            st.warning(f"⚠️ '{report['file_name']}' 처리 실패로 제외됨: {report['error']}")
+
+        embedding_stats = document_processor.get_embedding_model_stats()
+        if embedding_stats["loaded"]:
+            # 임베딩 모델은 모든 세션이 공유하는 단일 인스턴스
+            st.caption(f"임베딩 모델: {embedding_stats['model_name']} "
+                       f"(파라미터 {document_processor.format_megabytes(embedding_stats['parameter_bytes'])}, "
+                       f"프로세스 메모리 {document_processor.format_megabytes(embedding_stats['process_rss_bytes'])})")
 
     if process:
         if not uploaded_files:
@@ -83,16 +99,29 @@ def document_analysis_page():
             st.stop()
 
         with st.spinner("문서를 처리 중입니다..."):
-            docs = document_processor.get_text(uploaded_files)
-            chunks = document_processor.get_text_chunks(docs)
-            vectordb = document_processor.get_vectorstore(chunks)
+            # 같은 문서 묶음은 저장된 인덱스를 재사용 (파일 내용 해시 기준)
+            embedding_progress = st.empty()
+            def show_embedding_progress(done, total, chunks_per_sec):
+                embedding_progress.progress(done / total, text=f"임베딩 중... {done}/{total} 청크 ({chunks_per_sec:.1f} 청크/초)")
+            file_reports = []
+            try:
+                vectordb, from_index_store = vector_index_store.get_or_build_vectorstore(
+                    uploaded_files, show_embedding_progress, reports=file_reports
+                )
+            except ValueError as e:
+                st.error(f"🚨 {e}")
+                for report in file_reports:
+                    if report["error"]:
+                        st.warning(f"⚠️ '{report['file_name']}': {report['error']}")
+                st.stop()
+            embedding_progress.empty()
+            st.session_state.failed_document_reports = [report for report in file_reports if report["error"]]
             st.session_state.vectordb = vectordb
-            st.session_state.docs = docs # 'docs' 세션 상태에 저장 (특약 생성에서 사용)
-            
-            # 문서의 전체 텍스트를 추출하여 데이터베이스에 저장 (새로 추가된 부분)
-            all_text_from_docs = "\n\n".join([doc.page_content for doc in docs])
-            database_manager.save_document_text(all_text_from_docs)
+            st.session_state.retriever = document_processor.HybridRetriever(vectordb)
+            st.session_state.document_set_key = vector_index_store.document_set_key([(f.name, f.getvalue()) for f in uploaded_files])
 
+            if from_index_store:
+                st.info("이전에 처리한 문서입니다. 저장된 인덱스를 불러왔습니다.")
             st.success("✅ 문서 분석 완료! 메뉴를 선택해 진행하세요.")
             st.session_state.messages = [{ # 문서 처리 후 메시지 초기화
                 "role": "assistant",
@@ -118,13 +147,24 @@ def document_analysis_page():
                 st.markdown(query)
 
             with st.chat_message("assistant"):
-                if not st.session_state.vectordb:
+                if not st.session_state.retriever:
                     st.warning("먼저 문서를 업로드하고 처리해야 합니다.")
                     st.stop()
 
-                with st.spinner("답변 생성 중..."):
-                    retriever = st.session_state.vectordb.as_retriever(search_type="similarity", k=3)
-                    docs = retriever.get_relevant_documents(query)
+                # 같은 문서 묶음에 같은(또는 유사한) 질문이 있었으면 캐시된 답변을 바로 표시
+                # (질의 임베딩은 같은 질문이 없을 때만 계산되며, 아래 검색과 캐시 저장에 다시 사용)
+                cached, query_vector = qa_cache.lookup(st.session_state.document_set_key, query,
+                                                       document_processor.get_embeddings().embed_query)
+                if cached:
+                    match_note = "같은 질문" if cached["match"] == "exact" else f"유사 질문: \"{cached['question']}\", 유사도 {cached['similarity']:.2f}"
+                    st.caption(f"⚡ 캐시된 답변 ({match_note})")
+                    st.markdown(cached["answer"])
+                    answer = cached["answer"]
+                    sources = cached["sources"]
+                else:
+                    with st.spinner("관련 문서 검색 중..."):
+                        # 조문 번호/용어 일치(BM25)와 의미 유사도(FAISS)를 함께 사용
+                        docs = st.session_state.retriever.retrieve(query, k=3, query_vector=query_vector)
 
                     context = "\n\n".join([doc.page_content for doc in docs])
                     final_prompt = f"""다음 문서를 참고하여 질문에 답하세요.
@@ -137,79 +177,70 @@ def document_analysis_page():
 
 [답변]:
 """
-                    # ai_service 모듈의 retry_ai_call 함수 사용
-                    response_dict = ai_service.retry_ai_call(final_prompt, POTENS_API_KEY)
-                    answer = ai_service.clean_ai_response_text(response_dict.get("text", response_dict.get("error", "AI 응답 실패.")))
-
-                    st.markdown(answer)
-                    with st.expander("📄 참고 문서"):
-                        for doc_ref in docs:
-                            st.markdown(f"**출처**: {doc_ref.metadata.get('source', '알 수 없음')}")
-                            st.markdown(doc_ref.page_content)
-
-                    st.session_state.messages.append({"role": "assistant", "content": answer})
+                    # 답변을 생성되는 대로 표시 (체감 지연 = 첫 조각까지의 시간)
+                    final_result = {}
+                    streamed_answer = st.write_stream(ai_service.stream_ai_call(
+                        final_prompt, POTENS_API_KEY, call_site="qa", on_complete=final_result.update
+                    ))
+                    if ai_service.is_circuit_open_error(streamed_answer):
+                        st.error(f"🚨 {ai_service.CIRCUIT_OPEN_ERROR_MESSAGE}")
+                        st.stop()
+                    # 대화 기록에는 기존과 같이 정리된 답변을 저장
+                    answer = ai_service.clean_ai_response_text(streamed_answer or "AI 응답 실패.")
+                    sources = qa_cache.sources_from_documents(docs)
+                    if final_result and "error" not in final_result: # 성공한 답변만 캐시
+                        qa_cache.store(st.session_state.document_set_key, query, answer, sources, query_vector)
+
+                with st.expander("📄 참고 문서"):
+                    for source in sources:
+                        st.markdown(f"**출처**: {source['source']}")
+                        st.markdown(source["page_content"])
+
+                st.session_state.messages.append({"role": "assistant", "content": answer})
 
     elif selected_menu == "특약 생성":
         st.subheader("📑 보험 특약 생성기")
 
-        # 기존 로직 유지: 세션 상태에 docs가 없으면 경고 (문서 처리 필요)
-        if "docs" not in st.session_state or not st.session_state.docs:
-            # 하지만 이제 DB에서 원본 텍스트를 불러올 수 있으므로, 해당 텍스트가 있다면 특약 생성을 시도할 수 있음
-            # 여기서는 편의상 기존 동작을 유지하고, DB 로직은 자동화 페이지에서 활용
+        # 기존 로직 유지: 이 세션에서 처리한 문서가 없으면 경고 (문서 처리 필요)
+        if not st.session_state.retriever:
             st.warning("문서를 먼저 업로드하고 처리해주세요.")
             st.stop()
 
-        # 세션 상태에 저장된 docs를 사용하거나, DB에서 불러온 텍스트를 사용
-        # 현재 페이지에서는 'docs' 세션 상태가 우선이므로 그대로 사용
-        all_text = "\n\n".join([doc.page_content for doc in st.session_state.docs])
-        
-        # 특약 구성 항목 정의 (협업자 파일에서 가져옴)
-        sections = {
-            "1. 특약의 명칭": "자동차 보험 표준약관을 참고하여 특약의 **명칭**을 작성해줘.",
-            "2. 특약의 목적": "이 특약의 **목적**을 설명해줘.",
-            "3. 보장 범위": "**보장 범위**에 대해 상세히 작성해줘.",
-            "4. 보험금 지급 조건": "**보험금 지급 조건**을 구체적으로 작성해줘.",
-            "5. 보험료 산정 방식": "**보험료 산정 방식**을 설명해줘.",
-            "6. 면책 사항": "**면책 사항**에 해당하는 내용을 작성해줘.",
-            "7. 특약의 적용 기간": "**적용 기간**을 명시해줘.",
-            "8. 기타 특별 조건": "**기타 특별 조건**이 있다면 제안해줘.",
-            # 새로 추가된 항목들
-            "9. 운전가능자 제한": "**운전자 연령과 범위**에 따른 특별 약관을 제안해줘.",
-            "10. 보험료 할인": "**보험료 할인**에 해당하는 특별 약관을 작성해줘.",
-            "11. 보장 확대": "**법률비용 및 다른 자동차 운전**에 해당하는 특별 약관을 작성해줘"
-        }
+        # 특약 구성 항목 정의 (ai_service.ENDORSEMENT_SECTIONS, 예약 보고서의 특약 생성과 공통)
+        sections = ai_service.ENDORSEMENT_SECTIONS
 
         if st.button("🚀 특약 생성 시작"):
             all_generated_sections = {} # 각 섹션별 답변을 저장할 딕셔너리
-            full_text_for_download = "" # 다운로드용 전체 텍스트 (이제 세션 상태에도 저장)
-
-            with st.spinner("Potens API에 순차적으로 요청 중입니다..."):
-                for title, question in sections.items():
-                    st.info(f"⏳ {title} 생성 중...")
-                    prompt = f"""
-너는 자동차 보험을 설계하고 있는 보험사 직원이야.
-다음 조건에 따라 자동차 보험 특약의 '{title}'을 3~5줄 정도로 작성해줘.
-
-[기획 목적]
-- 이 특약은 보험 상품 기획 초기 단계에서 트렌드 조사 및 방향성 도출에 도움 되는 목적으로 작성돼야 해.
-- 새로운 기술(예: 블랙박스, 자율주행 등)이나 최근 사회적 이슈(예: 고령 운전자 증가 등)를 반영해도 좋아.
-- 표준약관 표현 방식을 따라줘.
-
-[표준약관 내용]
-{all_text}
-
-[질문]
-{question}
-
-[답변]
-"""
-                    # ai_service 모듈의 retry_ai_call 함수 사용
-                    response_dict = ai_service.retry_ai_call(prompt, POTENS_API_KEY)
+            ai_run = ai_metrics.start_run("endorsement_generation") # 특약 섹션별 AI 호출 계측
+
+            # 섹션별 근거 조항 검색과 프롬프트 구성은 먼저 끝내고, AI 호출은 동시에 진행
+            prompts = {
+                title: ai_service.build_endorsement_section_prompt(
+                    title, question,
+                    document_processor.build_section_context(st.session_state.retriever, ai_service.endorsement_section_query(title, question))
+                )
+                for title, question in sections.items()
+            }
+            # 섹션 순서대로 자리를 만들어 두고 완료되는 대로 채움
+            placeholders = {title: st.empty() for title in sections}
+            for title, placeholder in placeholders.items():
+                placeholder.info(f"⏳ {title} 생성 중...")
+
+            with st.spinner(f"Potens API에 동시에 요청 중입니다 (최대 {ai_service.ENDORSEMENT_CONCURRENCY}개)..."):
+                for title, response_dict in ai_service.iter_concurrent_ai_calls(prompts, POTENS_API_KEY, call_site="endorsement_section"):
+                    if ai_service.is_circuit_open_error(response_dict):
+                        ai_metrics.finish_run(ai_run)
+                        st.error(f"🚨 {ai_service.CIRCUIT_OPEN_ERROR_MESSAGE}")
+                        st.stop()
                     answer = ai_service.clean_ai_response_text(response_dict.get("text", response_dict.get("error", "AI 응답 실패.")))
-                    
                     all_generated_sections[title] = answer # 각 섹션별로 저장
-                    full_text_for_download += f"#### {title}\n{answer.strip()}\n\n" # 다운로드용 텍스트에 추가
+                    placeholders[title].markdown(f"#### {title}\n{answer}")
+
+            # 표시/다운로드/DB 저장은 완료 순서와 관계없이 표준 섹션 순서로
+            all_generated_sections = {title: all_generated_sections[title] for title in sections if title in all_generated_sections}
+            full_text_for_download = ai_service.format_endorsement_text(all_generated_sections, sections)
 
+            st.session_state['endorsement_ai_call_metrics'] = ai_metrics.finish_run(ai_run)
             st.session_state.generated_endorsement_sections = all_generated_sections # 세션 상태에 딕셔너리로 저장
             st.session_state['generated_endorsement_full_text'] = full_text_for_download # 새로 추가: 전체 특약 텍스트 세션 상태에 저장
             database_manager.save_generated_endorsement(full_text_for_download) # 데이터베이스에 특약 저장
@@ -233,3 +264,7 @@ def document_analysis_page():
                 file_name=f"생성된_보험_특약_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt", # 파일명에 타임스탬프 추가
                 mime="text/plain"
             )
+
+            if st.session_state.get('endorsement_ai_call_metrics'):
+                with st.expander("⏱️ 특약 생성 AI 호출 성능 요약"):
+                    st.dataframe(st.session_state['endorsement_ai_call_metrics'], use_container_width=True, hide_index=True)
@@ -1,68 +1,706 @@
 # modules/document_processor.py
 
+import bisect
+import functools
+import heapq
+import io
+import math
+import os
+import queue
+import re
+import sys
+import tempfile
+import threading
+import time
 import tiktoken
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, Iterable, Iterator, List
 
-from langchain.document_loaders import (
-    PyPDFLoader, Docx2txtLoader, UnstructuredPowerPointLoader, TextLoader
-)
+import faiss
+import numpy as np
+from pypdf import PdfReader
+from langchain.docstore.document import Document
+from langchain.docstore.in_memory import InMemoryDocstore
+from langchain.document_loaders import Docx2txtLoader, UnstructuredPowerPointLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.embeddings import HuggingFaceEmbeddings
 from langchain.vectorstores import FAISS
 
+from modules import embedding_cache
+
+
+TIKTOKEN_ENCODING = "cl100k_base"
+
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
 
+def get_tokenizer() -> tiktoken.Encoding:
+    """프로세스 전체에서 공유하는 tiktoken 인코더를 반환합니다 (최초 호출 시 로드)."""
+    global _tokenizer
+    if _tokenizer is None:
+        with _tokenizer_lock:
+            if _tokenizer is None:
+                _tokenizer = tiktoken.get_encoding(TIKTOKEN_ENCODING)
+    return _tokenizer
+
+
+# RecursiveCharacterTextSplitter는 같은 조각의 길이를 분할 검사와 병합 단계에서 반복 계산하므로
+# 최근 결과를 캐시합니다 (키가 청크 크기 이하의 문자열이라 크기를 작게 유지).
+@functools.lru_cache(maxsize=4096)
 def tiktoken_len(text):
-    """텍스트의 토큰 길이를 계산합니다."""
-    tokenizer = tiktoken.get_encoding("cl100k_base")
-    return len(tokenizer.encode(text))
+    """텍스트의 토큰 길이를 계산합니다. (특수 토큰 문자열도 일반 텍스트로 취급)"""
+    return len(get_tokenizer().encode_ordinary(text))
 
 
-def get_text(uploaded_files):
-    """업로드된 문서에서 텍스트를 추출합니다."""
-    all_docs = []
-    for doc in uploaded_files:
-        file_name = doc.name
-        try:
-            # Streamlit 환경에서는 파일을 직접 저장해야 로더가 접근 가능
-            with open(file_name, "wb") as f:
-                f.write(doc.getvalue())
-            logger.info(f"Uploaded: {file_name}")
-
-            if file_name.endswith('.pdf'):
-                loader = PyPDFLoader(file_name)
-            elif file_name.endswith('.docx'):
-                loader = Docx2txtLoader(file_name)
-            elif file_name.endswith('.pptx'):
-                loader = UnstructuredPowerPointLoader(file_name)
-            elif file_name.endswith('.txt'):
-                loader = TextLoader(file_name, encoding="utf-8")
-            else:
-                logger.warning(f"지원하지 않는 파일 형식입니다: {file_name}. 건너뜁니다.")
+def tiktoken_len_batch(texts: List[str], num_threads: int = 8) -> List[int]:
+    """여러 텍스트의 토큰 길이를 한 번에 계산합니다 (tiktoken 배치 인코딩, 멀티스레드)."""
+    return [len(tokens) for tokens in get_tokenizer().encode_ordinary_batch(list(texts), num_threads=num_threads)]
+
+
+# 업로드 파일을 병렬로 읽을 작업자 수
+DOCUMENT_LOAD_WORKERS = int(os.getenv("DOCUMENT_LOAD_WORKERS", "4"))
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.pptx', '.txt')
+# 스트리밍 처리(iter_page_batches) 시 한 번에 청크 분할/임베딩하는 페이지 수
+PAGE_BATCH_SIZE = int(os.getenv("PAGE_BATCH_SIZE", "32"))
+# 스트리밍 처리 시 파일별로 미리 읽어 둘 배치 수 (메모리 사용량 ≈ 작업자 수 × 이 값 × 배치 크기)
+PAGE_BATCH_PREFETCH = int(os.getenv("PAGE_BATCH_PREFETCH", "2"))
+
+
+def _load_with_temp_file(file_name: str, data: bytes, loader_cls) -> List[Document]:
+    """메모리 입력을 지원하지 않는 로더용: 요청별 임시 디렉터리에 기록 후 로드하고 자동으로 삭제합니다."""
+    with tempfile.TemporaryDirectory(prefix="upload-") as tmp_dir:
+        path = os.path.join(tmp_dir, os.path.basename(file_name))
+        with open(path, "wb") as f:
+            f.write(data)
+        docs = loader_cls(path).load()
+    for doc in docs:
+        doc.metadata["source"] = file_name # 임시 경로 대신 원래 파일명
+    return docs
+
+
+def _iter_raw_pages(file_name: str, data: bytes) -> Iterator[Document]:
+    """파일의 페이지 단위 문서를 순서대로 yield합니다 (PDF는 한 페이지씩 추출, 그 외 형식은 로더가 한 번에 읽음)."""
+    lower_name = file_name.lower()
+    if lower_name.endswith('.pdf'):
+        reader = PdfReader(io.BytesIO(data))
+        for i, page in enumerate(reader.pages):
+            yield Document(page_content=page.extract_text() or "", metadata={"source": file_name, "page": i})
+    elif lower_name.endswith('.txt'):
+        yield Document(page_content=data.decode("utf-8"), metadata={"source": file_name})
+    elif lower_name.endswith('.docx'):
+        yield from _load_with_temp_file(file_name, data, Docx2txtLoader)
+    elif lower_name.endswith('.pptx'):
+        yield from _load_with_temp_file(file_name, data, UnstructuredPowerPointLoader)
+    else:
+        raise ValueError(f"지원하지 않는 파일 형식입니다: {file_name}")
+
+
+def _produce_page_batches(file_name: str, data: bytes, pages_per_batch: int, out: queue.Queue, stop: threading.Event):
+    """한 파일의 페이지 배치(분할된 문서 목록)를 out 큐에 넣고, 마지막에 파일별 보고(dict)를 넣습니다. stop이 설정되면 중단합니다."""
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
                 continue
+        return False
+
+    start = time.perf_counter()
+    report = {"file_name": file_name, "size_bytes": len(data), "documents": 0, "seconds": 0.0, "error": None}
+    splitter = RecursiveCharacterTextSplitter()
+    try:
+        if not file_name.lower().endswith(SUPPORTED_EXTENSIONS):
+            report["error"] = "지원하지 않는 파일 형식"
+            logger.warning(f"지원하지 않는 파일 형식입니다: {file_name}. 건너뜁니다.")
+        else:
+            batch = []
+            for page in _iter_raw_pages(file_name, data):
+                batch.append(page)
+                if len(batch) >= pages_per_batch:
+                    split_batch, batch = splitter.split_documents(batch), []
+                    report["documents"] += len(split_batch)
+                    if not put(split_batch):
+                        return
+            if batch:
+                split_batch = splitter.split_documents(batch)
+                report["documents"] += len(split_batch)
+                if not put(split_batch):
+                    return
+    except Exception as e:
+        report["error"] = str(e)
+        logger.error(f"문서 처리 중 오류 발생 ({file_name}): {e}", exc_info=True)
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    put(report)
+
+
+def iter_page_batches(uploaded_files, pages_per_batch: int | None = None,
+                      reports: List[Dict[str, Any]] | None = None, max_workers: int | None = None) -> Iterator[List[Document]]:
+    """
+    업로드 파일들의 페이지를 pages_per_batch개씩 묶어 업로드 순서대로 yield합니다 (load_and_split과 같은 기본 분할 적용).
+    파일은 작업자 스레드에서 병렬로 읽고(DOCUMENT_LOAD_WORKERS), 파일마다 PAGE_BATCH_PREFETCH개 배치까지만 미리 읽어 둡니다.
+    PDF/TXT는 메모리의 바이트에서 바로 파싱하고, DOCX/PPTX는 자동 삭제되는 요청별 임시 파일을 사용합니다.
+    페이지를 모두 모으지 않으므로 메모리 사용량은 문서 크기가 아니라 배치 크기에 비례합니다.
+    reports 목록을 넘기면 파일별 보고 {file_name, size_bytes, documents, seconds, error}를 업로드 순서대로 추가합니다.
+    실패한 파일은 건너뜁니다.
+    """
+    pages_per_batch = pages_per_batch or PAGE_BATCH_SIZE
+    files = [(uploaded_file.name, uploaded_file.getvalue()) for uploaded_file in uploaded_files]
+    if not files:
+        return
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=PAGE_BATCH_PREFETCH) for _ in files]
+    executor = ThreadPoolExecutor(max_workers=max_workers or DOCUMENT_LOAD_WORKERS, thread_name_prefix="doc-load")
+    try:
+        # 작업자는 제출 순서대로 파일을 맡으므로, 소비 순서(업로드 순서)와 같아 큐가 가득 차도 교착되지 않음
+        for (file_name, data), out in zip(files, queues):
+            executor.submit(_produce_page_batches, file_name, data, pages_per_batch, out, stop)
+        for out in queues:
+            while True:
+                item = out.get()
+                if isinstance(item, dict): # 파일별 보고 = 파일 끝
+                    if item["error"] is None:
+                        logger.info(f"Uploaded: {item['file_name']} ({item['documents']}개 문서, {item['seconds']:.2f}초)")
+                    if reports is not None:
+                        reports.append(item)
+                    break
+                yield item
+    finally:
+        # 소비가 중간에 끝나면(임베딩 오류 등) 대기 중인 작업자를 멈춤
+        stop.set()
+        executor.shutdown(wait=True)
+
+
+# 청크 분할 파라미터 (인덱스 저장소 캐시 키에도 포함됩니다)
+CHUNK_SIZE = 900
+CHUNK_OVERLAP = 100
+# 분할 방식: "token" (페이지를 한 번만 토큰화하여 토큰 위치로 분할, 기본값) 또는 "recursive" (기존 RecursiveCharacterTextSplitter)
+CHUNKER = os.getenv("CHUNKER", "token")
+
+# 분할 지점 후보와 우선순위 (높을수록 우선): 조 제목/항 번호 앞 > 빈 줄 > 문장 끝/줄바꿈
+_CHUNK_BOUNDARY_PATTERNS = (
+    (3, re.compile(r"(?=제\s*\d+\s*조(?:의\s*\d+)?\s*\()|(?=^[ \t]*[①-⑳])", re.MULTILINE)),
+    (2, re.compile(r"\n[ \t]*\n\s*")),
+    (1, re.compile(r"(?<=[.?!。])\s+|\n")),
+)
+
+
+def _boundary_tokens(text: str, offsets: List[int]) -> List[tuple]:
+    """분할 지점 후보를 (토큰 위치, 우선순위) 목록으로 만듭니다. 토큰 위치 t에서 자르면 청크는 t 직전 토큰에서 끝납니다."""
+    levels: Dict[int, int] = {}
+    for level, pattern in _CHUNK_BOUNDARY_PATTERNS:
+        for match in pattern.finditer(text):
+            # 경계 문자 위치를 포함하는 토큰 앞에서 자름 (tiktoken 토큰은 앞 공백을 포함하는 경우가 많음)
+            token_index = bisect.bisect_right(offsets, match.end()) - 1
+            if token_index > 0:
+                levels[token_index] = max(levels.get(token_index, 0), level)
+    return sorted(levels.items())
+
 
-            all_docs.extend(loader.load_and_split())
-        except Exception as e:
-            logger.error(f"문서 처리 중 오류 발생 ({file_name}): {e}", exc_info=True)
-            continue # 오류 발생 시 해당 파일은 건너뛰고 다음 파일 처리
-    return all_docs
+def _best_boundary(boundaries: List[tuple], positions: List[int], low: int, high: int) -> int | None:
+    """(low, high] 구간의 분할 지점 중 우선순위가 가장 높고, 같으면 가장 뒤에 있는 토큰 위치."""
+    best = None
+    for i in range(bisect.bisect_right(positions, low), bisect.bisect_right(positions, high)):
+        if best is None or boundaries[i][1] >= best[1]:
+            best = boundaries[i]
+    return best[0] if best else None
+
+
+def split_text_by_tokens(text: str, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """
+    텍스트를 한 번만 토큰화한 뒤 토큰 위치로 잘라 chunk_size 토큰 이하의 청크로 나눕니다.
+    청크 끝은 뒤쪽 절반 안에서 조/항 표시, 빈 줄, 문장 끝 순으로 경계에 맞추고,
+    다음 청크는 chunk_overlap 토큰 이내에서 가장 앞의 경계부터 시작합니다 (경계가 없으면 토큰 위치 그대로).
+    """
+    encoder = get_tokenizer()
+    tokens = encoder.encode_ordinary(text)
+    if len(tokens) <= chunk_size:
+        return [text.strip()] if text.strip() else []
+    _, offsets = encoder.decode_with_offsets(tokens)
+    boundaries = _boundary_tokens(text, offsets)
+    positions = [position for position, _ in boundaries]
+
+    def char_at(token_index):
+        return offsets[token_index] if token_index < len(tokens) else len(text)
+
+    chunks = []
+    start = 0
+    while start < len(tokens):
+        end = len(tokens)
+        if start + chunk_size < len(tokens):
+            end = _best_boundary(boundaries, positions, start + chunk_size // 2, start + chunk_size) or start + chunk_size
+        piece = text[char_at(start):char_at(end)].strip()
+        # 잘린 조각을 다시 토큰화하면 경계의 토큰이 달라질 수 있으므로 크기를 확인하고 넘치면 줄임
+        excess = len(encoder.encode_ordinary(piece)) - chunk_size
+        while excess > 0 and end - excess > start:
+            end -= excess
+            piece = text[char_at(start):char_at(end)].strip()
+            excess = len(encoder.encode_ordinary(piece)) - chunk_size
+        if piece:
+            chunks.append(piece)
+        if end >= len(tokens):
+            break
+        overlap_start = bisect.bisect_left(positions, end - chunk_overlap)
+        next_start = positions[overlap_start] if overlap_start < len(positions) and positions[overlap_start] < end else end - chunk_overlap
+        start = max(next_start, start + 1)
+    return chunks
 
 
 def get_text_chunks(texts):
-    """텍스트를 청크 단위로 분할합니다."""
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=900,
-        chunk_overlap=100,
-        length_function=tiktoken_len
-    )
-    return splitter.split_documents(texts)
+    """
+    텍스트를 청크 단위로 분할합니다 (CHUNK_SIZE 토큰, CHUNK_OVERLAP 토큰 겹침, 분할 방식은 CHUNKER).
+    각 청크의 토큰 수는 배치 인코딩으로 계산하여 metadata["token_count"]에 기록합니다.
+    """
+    if CHUNKER == "recursive":
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=CHUNK_OVERLAP,
+            length_function=tiktoken_len
+        )
+        chunks = splitter.split_documents(texts)
+    else:
+        chunks = [
+            Document(page_content=piece, metadata=dict(doc.metadata))
+            for doc in texts for piece in split_text_by_tokens(doc.page_content)
+        ]
+    token_counts = tiktoken_len_batch([chunk.page_content for chunk in chunks])
+    for chunk, token_count in zip(chunks, token_counts):
+        chunk.metadata["token_count"] = token_count
+    logger.info(f"청크 분할 완료: {len(chunks)}개 청크, 총 {sum(token_counts)} 토큰")
+    return chunks
+
+
+EMBEDDING_MODEL_NAME = "jhgan/ko-sroberta-multitask"
+# 임베딩 배치 크기와 torch intra-op 스레드 수 (0이면 torch 기본값 = 물리 코어 수)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_NUM_THREADS = int(os.getenv("EMBEDDING_NUM_THREADS", "0"))
+
+# 임베딩 모델은 프로세스 전체(모든 Streamlit 세션)에서 하나만 로드하여 공유합니다.
+_embeddings = None
+_embeddings_lock = threading.Lock()
+_embeddings_load_seconds = None
+_warmup_thread = None
+
+
+def get_embeddings() -> HuggingFaceEmbeddings:
+    """공유 임베딩 모델을 반환합니다 (최초 호출 시 로드, 동시에 호출되어도 한 번만 로드)."""
+    global _embeddings, _embeddings_load_seconds
+    if _embeddings is None:
+        with _embeddings_lock:
+            if _embeddings is None:
+                start = time.perf_counter()
+                configure_torch_threads(EMBEDDING_NUM_THREADS)
+                _embeddings = HuggingFaceEmbeddings(
+                    model_name=EMBEDDING_MODEL_NAME,
+                    model_kwargs={'device': 'cpu'},
+                    encode_kwargs={'normalize_embeddings': True, 'batch_size': EMBEDDING_BATCH_SIZE}
+                )
+                _embeddings_load_seconds = time.perf_counter() - start
+                stats = get_embedding_model_stats()
+                logger.info(f"임베딩 모델 로드 완료: {EMBEDDING_MODEL_NAME} ({_embeddings_load_seconds:.1f}초, "
+                            f"파라미터 {format_megabytes(stats['parameter_bytes'])}, 프로세스 RSS {format_megabytes(stats['process_rss_bytes'])})")
+    return _embeddings
+
+
+def configure_torch_threads(num_threads: int):
+    """임베딩 연산에 사용할 torch intra-op 스레드 수를 설정합니다 (0 이하면 변경하지 않음)."""
+    if num_threads <= 0:
+        return
+    import torch # sentence-transformers 의존성, 모델 로드 시점에만 필요
+    torch.set_num_threads(num_threads)
+    logger.info(f"torch intra-op 스레드 수: {torch.get_num_threads()}")
+
+
+def warm_up_embeddings():
+    """모델을 로드하고 짧은 문장을 한 번 임베딩하여 첫 요청의 지연을 없앱니다."""
+    get_embeddings().embed_query("자동차 보험 특약")
+
+
+def start_embedding_warmup():
+    """백그라운드 스레드에서 warm_up_embeddings를 한 번만 실행합니다 (앱 시작 시 호출, 반복 호출해도 안전)."""
+    global _warmup_thread
+    with _embeddings_lock:
+        if _warmup_thread is not None or _embeddings is not None:
+            return
+        _warmup_thread = threading.Thread(target=_run_warmup, name="embedding-warmup", daemon=True)
+    _warmup_thread.start()
+
+
+def _run_warmup():
+    try:
+        warm_up_embeddings()
+    except Exception as e:
+        logger.error(f"임베딩 모델 워밍업 실패: {e}", exc_info=True)
+
+
+def get_embedding_model_stats() -> Dict[str, Any]:
+    """임베딩 모델 로드 상태와 메모리 사용량(모델 파라미터 바이트, 프로세스 RSS 바이트)을 반환합니다."""
+    parameter_bytes = None
+    if _embeddings is not None:
+        try:
+            parameter_bytes = sum(p.numel() * p.element_size() for p in _embeddings.client.parameters())
+        except Exception:
+            parameter_bytes = None
+    return {
+        "model_name": EMBEDDING_MODEL_NAME,
+        "loaded": _embeddings is not None,
+        "load_seconds": _embeddings_load_seconds,
+        "parameter_bytes": parameter_bytes,
+        "process_rss_bytes": _process_rss_bytes(),
+    }
+
+
+def _process_rss_bytes() -> int | None:
+    """현재 프로세스의 RSS(상주 메모리) 바이트. Linux는 /proc, 그 외 Unix는 최대 RSS로 대체, 측정 불가 시 None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024 # macOS는 바이트, Linux는 KB 단위
+    except (ImportError, OSError):
+        return None
+
 
+def format_megabytes(num_bytes) -> str:
+    return "알 수 없음" if num_bytes is None else f"{num_bytes / (1024 * 1024):.0f}MB"
 
-def get_vectorstore(chunks):
-    """텍스트 청크를 기반으로 벡터 데이터베이스를 생성합니다."""
-    embeddings = HuggingFaceEmbeddings(
-        model_name="jhgan/ko-sroberta-multitask",
-        model_kwargs={'device': 'cpu'},
-        encode_kwargs={'normalize_embeddings': True}
+
+def embed_texts(texts: List[str], batch_size: int | None = None,
+                progress_callback: Callable[[int, int, float], None] | None = None) -> List[List[float]]:
+    """
+    텍스트를 배치 단위로 임베딩합니다 (결과는 입력 순서).
+    길이가 비슷한 텍스트끼리 배치되도록 길이순으로 정렬하여 패딩 낭비를 줄이고,
+    배치마다 progress_callback(완료 수, 전체 수, 초당 청크 수)을 호출합니다.
+    """
+    batch_size = batch_size or EMBEDDING_BATCH_SIZE
+    embeddings = get_embeddings()
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+    vectors = [None] * len(texts)
+    start = time.perf_counter()
+    for batch_start in range(0, len(order), batch_size):
+        batch = order[batch_start:batch_start + batch_size]
+        # HuggingFaceEmbeddings.embed_documents와 같은 전처리/설정으로 배치 크기만 지정하여 인코딩
+        encoded = embeddings.client.encode(
+            [texts[i].replace("\n", " ") for i in batch],
+            **{**embeddings.encode_kwargs, "batch_size": batch_size, "show_progress_bar": False}
+        )
+        for i, vector in zip(batch, encoded):
+            vectors[i] = vector.tolist()
+        if progress_callback:
+            done = batch_start + len(batch)
+            progress_callback(done, len(texts), done / max(time.perf_counter() - start, 1e-9))
+    if texts:
+        elapsed = time.perf_counter() - start
+        logger.info(f"임베딩 완료: {len(texts)}개 ({elapsed:.1f}초, {len(texts) / max(elapsed, 1e-9):.1f} chunks/s, 배치 {batch_size})")
+    return vectors
+
+
+def embed_chunks(chunks, progress_callback: Callable[[int, int, float], None] | None = None) -> List[List[float]]:
+    """
+    청크 임베딩을 계산합니다. 청크 임베딩 캐시에 있는 청크는 재사용하고
+    처음 보는 청크만 모델로 임베딩한 뒤 캐시에 추가합니다.
+    """
+    texts = [chunk.page_content for chunk in chunks]
+    cache = embedding_cache.get_embedding_cache(EMBEDDING_MODEL_NAME)
+    vectors = cache.get_many(texts)
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        new_vectors = embed_texts([texts[i] for i in missing], progress_callback=progress_callback)
+        cache.put_many([texts[i] for i in missing], new_vectors)
+        for i, vector in zip(missing, new_vectors):
+            vectors[i] = vector
+    logger.info(f"청크 임베딩: {len(texts)}개 중 캐시 재사용 {len(texts) - len(missing)}개, 신규 계산 {len(missing)}개")
+    return vectors
+
+
+# --- FAISS 인덱스 종류 ---
+# flat: 정확 검색 (기본값, 기존 동작), ivf_flat: 역파일 + 원본 벡터, ivf_pq: 역파일 + 곱 양자화, sq8: 8비트 스칼라 양자화.
+# IVF 계열은 학습 표본으로 군집 중심을 학습하며, 학습 표본이 적으면 nlist를 줄이고 그래도 부족하면 flat으로 대체합니다.
+FAISS_INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "sq8")
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat")
+FAISS_INDEX_PARAMS = {
+    "nlist": int(os.getenv("FAISS_NLIST", "1024")),      # IVF 군집 수 (상한)
+    "nprobe": int(os.getenv("FAISS_NPROBE", "16")),      # 검색 시 확인할 군집 수
+    "pq_m": int(os.getenv("FAISS_PQ_M", "48")),          # PQ 부분 벡터 수 (차원의 약수, 768 → 48 = 16차원씩)
+    "pq_bits": int(os.getenv("FAISS_PQ_BITS", "8")),
+    "train_size": int(os.getenv("FAISS_TRAIN_SIZE", "50000")), # 학습 표본 최대 크기
+}
+# 군집당 최소 학습 벡터 수 (faiss 권장값)
+_MIN_POINTS_PER_CENTROID = 39
+
+
+def faiss_index_config(index_type: str | None = None, params: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    """인덱스 종류와 파라미터 (인덱스 저장소 캐시 키/메타데이터에 기록됩니다)."""
+    index_type = index_type or FAISS_INDEX_TYPE
+    if index_type not in FAISS_INDEX_TYPES:
+        raise ValueError(f"지원하지 않는 FAISS 인덱스 종류입니다: {index_type} (가능: {', '.join(FAISS_INDEX_TYPES)})")
+    return {"type": index_type, **FAISS_INDEX_PARAMS, **(params or {})}
+
+
+def build_faiss_index(vectors: np.ndarray, config: Dict[str, Any] | None = None) -> faiss.Index:
+    """
+    설정에 맞는 빈 FAISS 인덱스를 만들고 (IVF/SQ는 vectors에서 뽑은 표본으로) 학습합니다. 벡터는 추가하지 않습니다.
+    거리는 기존 FAISS.from_documents와 같은 L2를 사용합니다 (정규화된 임베딩이므로 코사인 순위와 동일).
+    """
+    config = config or faiss_index_config()
+    dim = vectors.shape[1]
+    index_type = config["type"]
+    if index_type == "flat":
+        return faiss.IndexFlatL2(dim)
+
+    rng = np.random.default_rng(0)
+    sample = vectors if len(vectors) <= config["train_size"] else vectors[rng.choice(len(vectors), config["train_size"], replace=False)]
+    sample = np.ascontiguousarray(sample, dtype=np.float32)
+    if index_type == "sq8":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2)
+    else:
+        nlist = min(config["nlist"], len(sample) // _MIN_POINTS_PER_CENTROID)
+        if nlist < 2:
+            logger.warning(f"학습 표본({len(sample)}개)이 부족하여 {index_type} 대신 flat 인덱스를 사용합니다.")
+            return faiss.IndexFlatL2(dim)
+        quantizer = faiss.IndexFlatL2(dim)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_L2)
+        else:
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, config["pq_m"], config["pq_bits"])
+        index.nprobe = min(config["nprobe"], nlist)
+    start = time.perf_counter()
+    index.train(sample)
+    if isinstance(index, faiss.IndexIVF):
+        index.make_direct_map() # MMR용 벡터 복원(reconstruct) 지원
+    logger.info(f"FAISS {index_type} 인덱스 학습 완료: 표본 {len(sample)}개 ({time.perf_counter() - start:.1f}초)")
+    return index
+
+
+def apply_search_params(index: faiss.Index, config: Dict[str, Any]):
+    """저장소에서 불러온 인덱스에 검색 파라미터(nprobe)를 다시 적용합니다."""
+    if isinstance(index, faiss.IndexIVF):
+        index.nprobe = min(config.get("nprobe", index.nprobe), index.nlist)
+
+
+def create_vectorstore(chunks, vectors, config: Dict[str, Any] | None = None):
+    """임베딩이 끝난 청크로 설정된 종류의 FAISS 벡터 데이터베이스를 만듭니다."""
+    config = config or faiss_index_config()
+    if config["type"] == "flat":
+        return FAISS.from_embeddings(
+            list(zip([chunk.page_content for chunk in chunks], vectors)),
+            get_embeddings(),
+            metadatas=[chunk.metadata for chunk in chunks]
+        )
+    index = build_faiss_index(np.asarray(vectors, dtype=np.float32), config)
+    vectordb = FAISS(get_embeddings(), index, InMemoryDocstore(), {})
+    _add_embedded_chunks(vectordb, chunks, vectors)
+    return vectordb
+
+
+def _add_embedded_chunks(vectordb, chunks, vectors):
+    vectordb.add_embeddings(
+        list(zip([chunk.page_content for chunk in chunks], vectors)),
+        metadatas=[chunk.metadata for chunk in chunks]
     )
-    return FAISS.from_documents(chunks, embeddings)
+
+
+def get_vectorstore(chunks, progress_callback: Callable[[int, int, float], None] | None = None):
+    """텍스트 청크를 기반으로 벡터 데이터베이스를 생성합니다 (공유 임베딩 모델, 청크 임베딩 캐시, FAISS_INDEX_TYPE 사용)."""
+    return create_vectorstore(chunks, embed_chunks(chunks, progress_callback))
+
+
+def build_vectorstore_streaming(page_batches: Iterable[List[Document]], vectordb=None,
+                                progress_callback: Callable[[int, int, float], None] | None = None):
+    """
+    페이지 배치를 하나씩 청크 분할 → 임베딩하여 벡터 데이터베이스에 추가합니다 (vectordb가 없으면 새로 생성).
+    처리한 배치는 보관하지 않으므로 최대 메모리는 배치 크기로 제한됩니다.
+    학습이 필요한 인덱스(IVF/SQ)는 학습 표본 크기(train_size)만큼 청크를 모은 뒤 생성합니다.
+    반환: (vectordb 또는 추출된 청크가 없으면 None, 추가한 청크 수)
+    """
+    config = faiss_index_config()
+    pending_chunks, pending_vectors = [], []
+    chunk_count = 0
+    for batch in page_batches:
+        chunks = get_text_chunks(batch)
+        if not chunks:
+            continue
+        vectors = embed_chunks(chunks, progress_callback)
+        chunk_count += len(chunks)
+        if vectordb is not None:
+            _add_embedded_chunks(vectordb, chunks, vectors)
+            continue
+        pending_chunks.extend(chunks)
+        pending_vectors.extend(vectors)
+        if config["type"] == "flat" or len(pending_vectors) >= config["train_size"]:
+            vectordb = create_vectorstore(pending_chunks, pending_vectors, config)
+            pending_chunks, pending_vectors = [], []
+    if vectordb is None and pending_chunks:
+        vectordb = create_vectorstore(pending_chunks, pending_vectors, config)
+    return vectordb, chunk_count
+
+
+# --- 하이브리드 검색 (BM25 + FAISS) ---
+# 조문 번호("제12조", "제3조의2")는 공백을 제거해 한 토큰으로, 한글 어절은 어절 전체와 글자 bigram으로 색인하여
+# 조사가 붙은 형태("면책은", "면책사항")도 일치하도록 합니다.
+ARTICLE_PATTERN = re.compile(r"제\s*\d+\s*(?:조|항|호|관|장|절)(?:\s*의\s*\d+)?")
+_TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-z]+|\d+")
+RRF_K = 60 # reciprocal-rank fusion 상수
+
+
+def bm25_tokenize(text: str) -> List[str]:
+    """BM25 색인/질의용 토큰화 (조문 번호, 한글 어절 + 글자 bigram, 영문 단어, 숫자)."""
+    text = text.lower()
+    tokens = [re.sub(r"\s+", "", match) for match in ARTICLE_PATTERN.findall(text)]
+    for word in _TOKEN_PATTERN.findall(text):
+        tokens.append(word)
+        if len(word) > 2 and "가" <= word[0] <= "힣":
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class BM25Index:
+    """청크 텍스트에 대한 Okapi BM25 역색인 (질의 시 질의어의 posting만 순회)."""
+
+    def __init__(self, texts: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1, self.b = k1, b
+        self.postings: Dict[str, List[tuple]] = {}
+        self.doc_lengths = []
+        for doc_index, text in enumerate(texts):
+            tokens = bm25_tokenize(text)
+            self.doc_lengths.append(len(tokens))
+            term_freqs: Dict[str, int] = {}
+            for token in tokens:
+                term_freqs[token] = term_freqs.get(token, 0) + 1
+            for token, tf in term_freqs.items():
+                self.postings.setdefault(token, []).append((doc_index, tf))
+        self.doc_count = len(self.doc_lengths)
+        self.avg_doc_length = (sum(self.doc_lengths) / self.doc_count) if self.doc_count else 0.0
+        self.idf = {
+            token: math.log(1 + (self.doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for token, posting in self.postings.items()
+        }
+
+    def search(self, query: str, k: int) -> List[tuple]:
+        """BM25 점수 상위 k개 (문서 번호, 점수) 목록."""
+        scores: Dict[int, float] = {}
+        for token in set(bm25_tokenize(query)):
+            idf = self.idf.get(token)
+            if idf is None:
+                continue
+            for doc_index, tf in self.postings[token]:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_index] / (self.avg_doc_length or 1.0))
+                scores[doc_index] = scores.get(doc_index, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+class KeywordRetriever:
+    """
+    BM25만 사용하는 검색기 (임베딩 모델 없이 짧은 텍스트에서 관련 청크를 고를 때 사용, 예: 예약 보고서 본문).
+    HybridRetriever와 같은 retrieve(query, k) 인터페이스를 제공합니다.
+    """
+
+    def __init__(self, docs: List[Document]):
+        self.docs = docs
+        self.bm25 = BM25Index([doc.page_content for doc in docs])
+
+    @classmethod
+    def from_text(cls, text: str, source: str = "text") -> "KeywordRetriever":
+        return cls(get_text_chunks([Document(page_content=text, metadata={"source": source})]))
+
+    def retrieve(self, query: str, k: int = 3, **_) -> List[Document]:
+        """BM25 상위 k개. 일치하는 청크가 k개보다 적으면 나머지를 문서 순서대로 채웁니다 (짧은 텍스트는 전체 사용)."""
+        ranked = [doc_index for doc_index, _ in self.bm25.search(query, k)]
+        ranked += [i for i in range(len(self.docs)) if i not in ranked][:k - len(ranked)]
+        return [self.docs[doc_index] for doc_index in ranked]
+
+
+class HybridRetriever:
+    """
+    FAISS 밀집 검색과 BM25 희소 검색 결과를 reciprocal-rank fusion(RRF)으로 합치는 검색기.
+    BM25 색인은 벡터 DB의 docstore에 있는 청크로 만들므로 저장소에서 불러온 인덱스에도 그대로 사용할 수 있습니다.
+    mmr=True면 융합 후보에서 maximal marginal relevance로 중복이 적은 청크를 고릅니다.
+    """
+
+    def __init__(self, vectordb):
+        self.vectordb = vectordb
+        positions = sorted(vectordb.index_to_docstore_id)
+        self.docs = [vectordb.docstore.search(vectordb.index_to_docstore_id[pos]) for pos in positions]
+        self.positions = positions
+        self._position_to_doc = {pos: i for i, pos in enumerate(positions)}
+        start = time.perf_counter()
+        self.bm25 = BM25Index([doc.page_content for doc in self.docs])
+        logger.info(f"BM25 색인 생성: {len(self.docs)}개 청크, 어휘 {len(self.bm25.postings)}개 ({time.perf_counter() - start:.2f}초)")
+
+    def _dense_search(self, query_vector: np.ndarray, k: int) -> List[int]:
+        _, indices = self.vectordb.index.search(query_vector.reshape(1, -1), k)
+        return [self._position_to_doc[int(pos)] for pos in indices[0] if int(pos) in self._position_to_doc]
+
+    def retrieve(self, query: str, k: int = 3, fetch_k: int = 20, mmr: bool = False, lambda_mult: float = 0.5,
+                 query_vector=None) -> List[Document]:
+        """
+        질의에 대한 상위 k개 청크. 밀집/희소 검색 각각 fetch_k개 후보를 RRF로 융합합니다.
+        query_vector: 이미 계산한 질의 임베딩 (예: QA 캐시 조회에 쓴 값, 없으면 계산)
+        """
+        if not self.docs:
+            return []
+        if query_vector is None:
+            query_vector = get_embeddings().embed_query(query)
+        query_vector = np.asarray(query_vector, dtype=np.float32)
+        dense = self._dense_search(query_vector, fetch_k)
+        sparse = [doc_index for doc_index, _ in self.bm25.search(query, fetch_k)]
+
+        fused: Dict[int, float] = {}
+        for ranking in (dense, sparse):
+            for rank, doc_index in enumerate(ranking):
+                fused[doc_index] = fused.get(doc_index, 0.0) + 1.0 / (RRF_K + rank + 1)
+        candidates = sorted(fused, key=fused.get, reverse=True)
+        if mmr and len(candidates) > k:
+            candidates = self._mmr(query_vector, candidates, fused, k, lambda_mult)
+        return [self.docs[doc_index] for doc_index in candidates[:k]]
+
+    def _mmr(self, query_vector, candidates: List[int], fused: Dict[int, float], k: int, lambda_mult: float) -> List[int]:
+        """RRF 점수(관련성)와 이미 고른 청크와의 코사인 유사도(중복)를 절충해 k개를 고릅니다."""
+        try:
+            vectors = np.vstack([self.vectordb.index.reconstruct(self.positions[i]) for i in candidates])
+        except RuntimeError: # 벡터 복원을 지원하지 않는 인덱스
+            return candidates
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+        relevance = np.array([fused[i] for i in candidates])
+        relevance = relevance / relevance.max()
+        selected = [0]
+        while len(selected) < k:
+            redundancy = (vectors @ vectors[selected].T).max(axis=1)
+            scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+            scores[selected] = -np.inf
+            selected.append(int(scores.argmax()))
+        return [candidates[i] for i in selected]
+
+
+# 특약 섹션별 근거 조항: 검색 후보 수와 섹션당 토큰 예산 (문서 크기와 무관하게 프롬프트 크기 고정)
+SECTION_CONTEXT_K = int(os.getenv("SECTION_CONTEXT_K", "8"))
+SECTION_CONTEXT_TOKENS = int(os.getenv("SECTION_CONTEXT_TOKENS", "2000"))
+
+
+def pack_chunks(docs: List[Document], token_budget: int) -> str:
+    """
+    검색 순위대로 청크를 토큰 예산 안에서 이어 붙입니다 (metadata["token_count"]가 없으면 계산).
+    예산을 넘는 청크는 건너뛰고, 첫 청크 하나만으로 예산을 넘으면 예산 길이로 잘라 사용합니다.
+    """
+    parts, used = [], 0
+    for doc in docs:
+        token_count = doc.metadata.get("token_count") or tiktoken_len(doc.page_content)
+        if used + token_count <= token_budget:
+            parts.append(doc.page_content)
+            used += token_count
+        elif not parts:
+            tokens = get_tokenizer().encode_ordinary(doc.page_content)[:token_budget]
+            parts.append(get_tokenizer().decode(tokens))
+            used = len(tokens)
+    return "\n\n".join(parts)
+
+
+def build_section_context(retriever, query: str, token_budget: int | None = None, k: int | None = None) -> str:
+    """특약 섹션 질의로 관련 청크를 검색해 토큰 예산 안의 근거 텍스트를 만듭니다 (HybridRetriever/KeywordRetriever)."""
+    docs = retriever.retrieve(query, k=k or SECTION_CONTEXT_K)
+    return pack_chunks(docs, token_budget or SECTION_CONTEXT_TOKENS)
@@ -0,0 +1,224 @@
+# modules/embedding_cache.py
+# 청크 단위 임베딩 캐시입니다.
+# 청크 텍스트의 SHA-256을 키로, 임베딩 벡터를 float16 memmap 파일 한 개에 행 단위로 이어 붙여 저장하고
+# 키 → 행 번호 색인 표는 같은 디렉터리의 SQLite 파일에 둡니다. 모델별로 디렉터리를 분리합니다.
+# 벡터 파일이 EMBEDDING_CACHE_MAX_MB를 넘으면 가장 오래 사용하지 않은 행부터 버리고 파일을 다시 씁니다 (LRU 압축).
+#
+# 디렉터리 구조: <EMBEDDING_CACHE_DIR>/<모델 이름>/
+#   vectors.f16, vectors-<세대>.f16 - (행 수, 차원) float16 배열 (헤더 없는 원시 바이트, 추가 쓰기만 함)
+#                                     압축할 때마다 새 세대 파일을 만들고 색인 표와 함께 한 트랜잭션으로 전환합니다.
+#   index.db     - chunk_embeddings(text_hash, row, last_used), cache_meta(dim, vectors_file)
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+from loguru import logger
+
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "embedding_cache")
+EMBEDDING_CACHE_MAX_BYTES = int(float(os.getenv("EMBEDDING_CACHE_MAX_MB", "1024")) * 1024 * 1024)
+# 압축 후 남길 크기 (한도 대비 비율). 한도 근처에서 저장할 때마다 압축하지 않도록 여유를 둡니다.
+EMBEDDING_CACHE_COMPACT_RATIO = 0.8
+# 조회 시 last_used 갱신 최소 간격(초). 같은 청크를 반복 조회해도 색인 표 쓰기를 줄입니다.
+LAST_USED_UPDATE_INTERVAL = 60.0
+
+VECTORS_FILE = "vectors.f16" # 첫 세대 벡터 파일 (이후 세대는 vectors-<세대>.f16)
+INDEX_FILE = "index.db"
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    모델 하나의 청크 임베딩 캐시 (스레드 안전).
+    조회는 memmap에서 필요한 행만 읽고, 저장은 벡터 파일 끝에 추가한 뒤 색인 표에 행 번호를 기록합니다.
+    저장 후 벡터 파일이 max_bytes를 넘으면 최근 사용한 행만 남기도록 압축합니다.
+    압축 중 행 번호가 바뀌므로 조회/저장/압축은 같은 잠금으로 직렬화합니다.
+    """
+
+    def __init__(self, model_name: str, directory: str = EMBEDDING_CACHE_DIR, max_bytes: int | None = None):
+        self.model_name = model_name
+        self.max_bytes = EMBEDDING_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.path = os.path.join(directory, re.sub(r"[^0-9A-Za-z._-]+", "_", model_name))
+        os.makedirs(self.path, exist_ok=True)
+        self._index_path = os.path.join(self.path, INDEX_FILE)
+        self._lock = threading.Lock()
+        conn = sqlite3.connect(self._index_path)
+        conn.execute("CREATE TABLE IF NOT EXISTS chunk_embeddings (text_hash TEXT PRIMARY KEY, row INTEGER NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS cache_meta (key TEXT PRIMARY KEY, value TEXT)")
+        columns = [column[1] for column in conn.execute("PRAGMA table_info(chunk_embeddings)")]
+        if "last_used" not in columns: # 이전 버전 캐시: 기존 행은 가장 오래된 것으로 취급
+            conn.execute("ALTER TABLE chunk_embeddings ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+        conn.commit()
+        self.dim = self._read_meta(conn, "dim", int)
+        self.vectors_path = os.path.join(self.path, self._read_meta(conn, "vectors_file", str) or VECTORS_FILE)
+        conn.close()
+        self._remove_stale_vector_files()
+
+    @staticmethod
+    def _read_meta(conn, key: str, cast):
+        row = conn.execute("SELECT value FROM cache_meta WHERE key = ?", (key,)).fetchone()
+        return cast(row[0]) if row else None
+
+    def _remove_stale_vector_files(self):
+        # 압축 도중 중단되어 남은 임시/이전 세대 벡터 파일 정리
+        for name in os.listdir(self.path):
+            if name.startswith("vectors") and os.path.join(self.path, name) != self.vectors_path:
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except OSError:
+                    pass
+
+    def _row_count(self) -> int:
+        if self.dim is None or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (self.dim * 2)
+
+    def get_many(self, texts: list[str]) -> list[list[float] | None]:
+        """텍스트별 캐시된 임베딩(float32 리스트)을 반환합니다. 없는 항목은 None."""
+        results = [None] * len(texts)
+        if not texts or self.dim is None:
+            return results
+        hashes = [text_hash(text) for text in texts]
+        unique_hashes = list(set(hashes))
+        now = time.time()
+        with self._lock:
+            conn = sqlite3.connect(self._index_path)
+            try:
+                rows, stale = {}, []
+                for start in range(0, len(unique_hashes), 500): # SQLite 바인딩 변수 개수 제한
+                    batch = unique_hashes[start:start + 500]
+                    placeholders = ",".join("?" * len(batch))
+                    for h, row, last_used in conn.execute(
+                            f"SELECT text_hash, row, last_used FROM chunk_embeddings WHERE text_hash IN ({placeholders})", batch):
+                        rows[h] = row
+                        if now - last_used >= LAST_USED_UPDATE_INTERVAL:
+                            stale.append((now, h))
+                if stale:
+                    conn.executemany("UPDATE chunk_embeddings SET last_used = ? WHERE text_hash = ?", stale)
+                    conn.commit()
+            finally:
+                conn.close()
+            if not rows:
+                return results
+
+            row_count = self._row_count()
+            vectors = np.memmap(self.vectors_path, dtype=np.float16, mode="r", shape=(row_count, self.dim))
+            for i, h in enumerate(hashes):
+                row = rows.get(h)
+                if row is not None and row < row_count:
+                    results[i] = vectors[row].astype(np.float32).tolist()
+            del vectors
+        return results
+
+    def put_many(self, texts: list[str], embeddings: list[list[float]]):
+        """새 임베딩을 벡터 파일 끝에 추가하고 색인 표에 기록합니다 (이미 있는 텍스트는 건너뜀). 한도를 넘으면 압축합니다."""
+        if not texts:
+            return
+        array = np.asarray(embeddings, dtype=np.float16)
+        with self._lock:
+            conn = sqlite3.connect(self._index_path)
+            try:
+                if self.dim is None:
+                    self.dim = int(array.shape[1])
+                    conn.execute("INSERT OR REPLACE INTO cache_meta (key, value) VALUES ('dim', ?)", (str(self.dim),))
+                elif array.shape[1] != self.dim:
+                    logger.warning(f"임베딩 차원이 캐시({self.dim})와 달라 저장하지 않습니다: {array.shape[1]}")
+                    return
+
+                seen, new_rows = set(), []
+                for i, text in enumerate(texts):
+                    h = text_hash(text)
+                    if h in seen:
+                        continue
+                    seen.add(h)
+                    new_rows.append((h, i))
+                existing = set()
+                hashes = [h for h, _ in new_rows]
+                for start in range(0, len(hashes), 500):
+                    batch = hashes[start:start + 500]
+                    placeholders = ",".join("?" * len(batch))
+                    existing.update(r[0] for r in conn.execute(f"SELECT text_hash FROM chunk_embeddings WHERE text_hash IN ({placeholders})", batch))
+                new_rows = [(h, i) for h, i in new_rows if h not in existing]
+                if not new_rows:
+                    return
+
+                first_row = self._row_count()
+                now = time.time()
+                with open(self.vectors_path, "ab") as f:
+                    f.write(array[[i for _, i in new_rows]].tobytes())
+                conn.executemany(
+                    "INSERT INTO chunk_embeddings (text_hash, row, last_used) VALUES (?, ?, ?)",
+                    [(h, first_row + offset, now) for offset, (h, _) in enumerate(new_rows)]
+                )
+                conn.commit()
+                if self._row_count() * self.dim * 2 > self.max_bytes:
+                    self._compact(conn)
+            finally:
+                conn.close()
+
+    def _compact(self, conn, block_rows: int = 4096) -> int:
+        """
+        최근 사용한 행만 max_bytes × EMBEDDING_CACHE_COMPACT_RATIO 이내로 새 세대 벡터 파일에 옮겨 쓰고,
+        행 번호 갱신과 파일 전환을 한 트랜잭션으로 기록한 뒤 이전 파일을 삭제합니다 (잠금 보유 상태에서 호출).
+        중간에 중단되어도 색인 표는 항상 커밋된 세대의 파일을 가리킵니다. 삭제한 행 수를 반환합니다.
+        """
+        row_bytes = self.dim * 2
+        keep_count = int(self.max_bytes * EMBEDDING_CACHE_COMPACT_RATIO) // row_bytes
+        kept = conn.execute("SELECT text_hash, row FROM chunk_embeddings ORDER BY last_used DESC, row DESC LIMIT ?",
+                            (keep_count,)).fetchall()
+        kept.sort(key=lambda item: item[1]) # 기존 파일 순서대로 읽기
+        old_path, old_rows = self.vectors_path, self._row_count()
+        generation = (self._read_meta(conn, "generation", int) or 0) + 1
+        new_path = os.path.join(self.path, f"vectors-{generation}.f16")
+
+        old_vectors = np.memmap(old_path, dtype=np.float16, mode="r", shape=(old_rows, self.dim))
+        with open(new_path, "wb") as f:
+            for start in range(0, len(kept), block_rows):
+                f.write(np.ascontiguousarray(old_vectors[[row for _, row in kept[start:start + block_rows]]]).tobytes())
+        del old_vectors
+
+        conn.execute("DELETE FROM chunk_embeddings WHERE text_hash NOT IN (SELECT text_hash FROM chunk_embeddings "
+                     "ORDER BY last_used DESC, row DESC LIMIT ?)", (keep_count,))
+        conn.executemany("UPDATE chunk_embeddings SET row = ? WHERE text_hash = ?",
+                         [(new_row, h) for new_row, (h, _) in enumerate(kept)])
+        conn.executemany("INSERT OR REPLACE INTO cache_meta (key, value) VALUES (?, ?)",
+                         [("vectors_file", os.path.basename(new_path)), ("generation", str(generation))])
+        conn.commit()
+        self.vectors_path = new_path
+        try:
+            os.remove(old_path)
+        except OSError:
+            pass
+        evicted = old_rows - len(kept)
+        logger.info(f"임베딩 캐시 한도 초과로 압축: {evicted}개 행 삭제, {len(kept)}개 유지 ({self.model_name})")
+        return evicted
+
+    def stats(self) -> dict:
+        return {
+            "model_name": self.model_name,
+            "rows": self._row_count(),
+            "dim": self.dim,
+            "size_bytes": os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_embedding_cache(model_name: str) -> EmbeddingCache:
+    """모델별 공유 EmbeddingCache 인스턴스를 반환합니다."""
+    cache = _caches.get(model_name)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(model_name)
+            if cache is None:
+                cache = _caches[model_name] = EmbeddingCache(model_name)
+    return cache
@@ -0,0 +1,143 @@
+# modules/job_runner.py
+# 백그라운드 작업 실행기입니다.
+# 트렌드 분석처럼 오래 걸리는 파이프라인을 Streamlit 스크립트 스레드 밖(작업 스레드 풀)에서 실행하고,
+# 작업 상태/단계별 진행률/결과를 SQLite(jobs 테이블)에 저장합니다.
+# 페이지는 세션(과 주소의 쿼리 파라미터)에 보관한 job_id로 상태를 조회(폴링)하므로, 다른 페이지에 다녀오거나 새로고침해도 진행 상황과 결과를 다시 볼 수 있습니다.
+# - recover_interrupted_jobs(): 앱 시작 시 한 번, 이전 프로세스에서 끝나지 못한 작업을 실패로 정리
+# - register_handler(kind, fn): 작업 종류별 실행 함수 등록. fn(params, job) -> 결과 dict (JSON 직렬화 가능)
+# - submit_job(kind, params) -> job_id
+# - get_job(job_id): 상태, 진행률, 결과 조회
+
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from loguru import logger
+
+from modules import database_manager
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# 진행률 DB 기록 최소 간격(초). 기사 단위로 진행률을 보고해도 SQLite 쓰기는 이 간격으로 제한됩니다 (단계가 바뀌면 즉시 기록).
+JOB_PROGRESS_WRITE_INTERVAL = float(os.getenv("JOB_PROGRESS_WRITE_INTERVAL", "0.5"))
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_FAILED)
+
+INTERRUPTED_ERROR_MESSAGE = "서버가 다시 시작되어 작업이 중단되었습니다. 다시 실행해주세요."
+
+_handlers = {}
+
+
+def register_handler(kind: str, fn):
+    """작업 종류 kind의 실행 함수를 등록합니다. 같은 kind로 다시 등록하면 교체됩니다 (Streamlit 재실행 시 모듈 재로드 대비)."""
+    _handlers[kind] = fn
+
+
+class JobContext:
+    """실행 함수에 전달되는 작업 핸들. 진행률 보고와 사용자에게 보여줄 알림(notes) 수집을 담당합니다."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.notes = []
+        self._stage = None
+        self._last_write = 0.0
+
+    def progress(self, stage: str, fraction: float, message: str = ""):
+        """현재 단계와 단계 내 진행률(0~1)을 기록합니다. 같은 단계 안에서는 JOB_PROGRESS_WRITE_INTERVAL마다 한 번만 저장합니다."""
+        now = time.monotonic()
+        if stage == self._stage and fraction < 1.0 and now - self._last_write < JOB_PROGRESS_WRITE_INTERVAL:
+            return
+        self._stage = stage
+        self._last_write = now
+        database_manager.update_job(self.job_id, stage=stage, progress=min(max(fraction, 0.0), 1.0), message=message)
+
+    def note(self, level: str, text: str):
+        """결과와 함께 보여줄 알림을 추가합니다. level: "info", "success", "warning", "error" """
+        self.notes.append({"type": level, "text": text})
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_recovered = False
+
+
+def recover_interrupted_jobs() -> int:
+    """
+    이전 프로세스에서 대기/실행 중으로 남은 작업을 실패로 정리합니다. 앱 시작 시 호출하며, 프로세스당 한 번만 실행됩니다
+    (Streamlit 스크립트가 다시 실행되어도 재실행하지 않음). 작업은 앱 서버 프로세스 하나에서만 실행된다고 가정합니다.
+    반환: 정리한 작업 수 (이미 정리한 경우 0)
+    """
+    global _recovered
+    with _executor_lock:
+        if _recovered or _executor is not None: # 이 프로세스에서 이미 작업을 실행 중이면 정리하지 않음
+            return 0
+        _recovered = True
+        database_manager.init_db()
+        count = database_manager.fail_unfinished_jobs(INTERRUPTED_ERROR_MESSAGE)
+    if count:
+        logger.warning(f"중단된 백그라운드 작업 {count}건을 실패로 정리했습니다.")
+    return count
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """작업 스레드 풀 (프로세스당 하나)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+    return _executor
+
+
+def _run_job(job_id: str, fn, params: dict):
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    database_manager.update_job(job_id, status=JOB_RUNNING, started_at=now)
+    job = JobContext(job_id)
+    try:
+        result = fn(params, job)
+    except Exception as e:
+        logger.exception(f"백그라운드 작업 실패: {job_id}")
+        database_manager.update_job(job_id, status=JOB_FAILED, error=f"{type(e).__name__}: {e}",
+                                    result_json=json.dumps({"notes": job.notes}, ensure_ascii=False),
+                                    finished_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        return
+    result = dict(result or {}, notes=job.notes)
+    database_manager.update_job(job_id, status=JOB_SUCCEEDED, progress=1.0,
+                                result_json=json.dumps(result, ensure_ascii=False, default=str),
+                                finished_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+
+def submit_job(kind: str, params: dict) -> str:
+    """
+    작업을 등록하고 작업 스레드에서 실행합니다. params는 JSON 직렬화 가능해야 합니다 (API 키 등 비밀값은 넣지 않습니다).
+    각 작업은 새 contextvars 컨텍스트에서 실행되므로 ai_metrics 실행(run)이 다른 작업/세션과 섞이지 않습니다.
+    """
+    if kind not in _handlers:
+        raise ValueError(f"등록되지 않은 작업 종류입니다: {kind}")
+    executor = _get_executor()
+    job_id = f"{kind}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    database_manager.create_job(job_id, kind, json.dumps(params, ensure_ascii=False))
+    executor.submit(contextvars.Context().run, _run_job, job_id, _handlers[kind], params)
+    return job_id
+
+
+def _decode(job: dict | None) -> dict | None:
+    if job is None:
+        return None
+    job["params"] = json.loads(job.pop("params_json"))
+    result_json = job.pop("result_json")
+    job["result"] = json.loads(result_json) if result_json else None
+    job["finished"] = job["status"] in FINISHED_STATUSES
+    return job
+
+
+def get_job(job_id: str) -> dict | None:
+    """작업 상태를 조회합니다. 반환: jobs 컬럼 + params/result(디코딩된 dict) + finished 여부"""
+    return _decode(database_manager.get_job(job_id))
@@ -0,0 +1,255 @@
+# modules/mock_potens_server.py
+# 오프라인 부하 테스트/벤치마크용 Potens.dev /api/chat 대체 서버입니다.
+# ai_service.call_potens_api_raw가 기대하는 계약(요청: prompt, generationConfig.responseSchema / 응답: message)을 구현하며,
+# 지연 시간 분포, 오류(5xx)·429 주입, 프롬프트 기반 결정적(deterministic) 응답을 설정할 수 있습니다.
+# stream=True이면 Accept: text/event-stream 요청에 SSE로 응답 조각을 나누어 보냅니다 (ai_service.stream_ai_call 확인용).
+#
+# 실행: python -m modules.mock_potens_server --port 8765 --latency lognormal --latency-ms 800 --latency-spread 0.5
+# 앱/벤치마크 연결: POTENS_API_ENDPOINT=http://127.0.0.1:8765/api/chat
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+
+class MockPotensConfig:
+    """
+    모의 서버 동작 설정.
+    latency: 지연 분포 - fixed(latency_ms 고정), uniform(latency_ms ± latency_spread ms),
+             normal(평균 latency_ms, 표준편차 latency_spread ms), lognormal(중앙값 latency_ms, sigma latency_spread)
+    error_rate: 5xx(500/503) 응답 비율, rate_limit_rate: 429 응답 비율 (Retry-After: retry_after_seconds)
+    seed: 지연/오류 주입 난수 시드 (같은 시드 + 같은 요청 순서면 같은 결과)
+    stream: SSE 스트리밍 응답 허용 여부. 이때 지연 분포는 첫 조각까지의 시간이 되고, 이후 조각은 stream_chunk_ms 간격으로 전송
+            (비스트리밍 요청도 같은 생성 시간(조각 수 × stream_chunk_ms)을 기다린 뒤 한 번에 응답)
+    """
+
+    def __init__(self, latency: str = "fixed", latency_ms: float = 50.0, latency_spread: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after_seconds: int = 1,
+                 seed: int = 0, stream: bool = False, stream_chunk_ms: float = 20.0):
+        if latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"지원하지 않는 지연 분포입니다: {latency} (가능: {', '.join(LATENCY_DISTRIBUTIONS)})")
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.latency_spread = latency_spread
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.seed = seed
+        self.stream = stream
+        self.stream_chunk_ms = stream_chunk_ms
+
+
+class MockPotensServer(ThreadingHTTPServer):
+    """요청 통계와 난수 상태를 보관하는 모의 서버."""
+    daemon_threads = True
+
+    def __init__(self, address, config: MockPotensConfig):
+        super().__init__(address, _MockPotensHandler)
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self.request_count = 0
+        self.status_counts = {}
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/chat"
+
+    def next_injection(self) -> tuple[float, int]:
+        """이번 요청의 (지연 초, 응답 상태 코드)를 결정합니다."""
+        config = self.config
+        with self._lock:
+            self.request_count += 1
+            if config.latency == "fixed":
+                latency_ms = config.latency_ms
+            elif config.latency == "uniform":
+                latency_ms = self._rng.uniform(config.latency_ms - config.latency_spread, config.latency_ms + config.latency_spread)
+            elif config.latency == "normal":
+                latency_ms = self._rng.gauss(config.latency_ms, config.latency_spread)
+            else:
+                latency_ms = self._rng.lognormvariate(0, config.latency_spread) * config.latency_ms
+
+            roll = self._rng.random()
+            if roll < config.rate_limit_rate:
+                status = 429
+            elif roll < config.rate_limit_rate + config.error_rate:
+                status = self._rng.choice((500, 503))
+            else:
+                status = 200
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        return max(0.0, latency_ms) / 1000, status
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"request_count": self.request_count, "status_counts": dict(self.status_counts)}
+
+
+# --- 결정적 모의 응답 ---
+_CANNED_SENTENCES = [
+    "전기차 보급 확대와 함께 배터리 화재 관련 사고 보상 기준에 대한 관심이 높아지고 있습니다.",
+    "자율주행 레벨 3 차량의 사고 책임 주체를 둘러싼 제도 정비 논의가 이어지고 있습니다.",
+    "고령 운전자 비중이 늘어나면서 운전 능력 검증과 보험료 산정 방식 변화가 주목받고 있습니다.",
+    "블랙박스 및 운행 데이터 기반 요율(UBI) 상품이 확대되는 추세입니다.",
+    "차량 수리비 상승으로 손해율 관리가 보험사의 주요 과제로 떠오르고 있습니다.",
+    "공유 모빌리티 이용 증가로 단기·시간제 자동차 보험 수요가 늘고 있습니다.",
+]
+
+
+def _prompt_seed(prompt: str) -> int:
+    return int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def canned_text(prompt: str, sentences: int = 3) -> str:
+    """프롬프트 해시로 고정된 문장들을 골라 항상 같은 응답을 만듭니다."""
+    rng = random.Random(_prompt_seed(prompt))
+    picked = [rng.choice(_CANNED_SENTENCES) for _ in range(sentences)]
+    if "마크다운" in prompt:
+        return "### 주요 내용\n\n" + "\n".join(f"- **{s.split(' ')[0]}** {s}" for s in picked)
+    return " ".join(picked)
+
+
+def canned_json(schema: dict, prompt: str):
+    """responseSchema(Gemini 스타일: type/items/properties)를 따르는 결정적 값을 만듭니다."""
+    schema_type = str(schema.get("type", "STRING")).upper()
+    if schema_type == "ARRAY":
+        match = re.search(r"키워드 목록:\s*(\[.*\])", prompt, re.DOTALL)
+        if match and str(schema.get("items", {}).get("type", "")).upper() == "STRING":
+            try:
+                return [k["keyword"] for k in json.loads(match.group(1))][:5]
+            except (ValueError, KeyError, TypeError):
+                pass
+        return [canned_json(schema.get("items", {}), f"{prompt}#{i}") for i in range(3)]
+    if schema_type == "OBJECT":
+        return {name: canned_json(prop, f"{prompt}#{name}") for name, prop in schema.get("properties", {}).items()}
+    if schema_type in ("INTEGER", "NUMBER"):
+        return _prompt_seed(prompt) % 100
+    if schema_type == "BOOLEAN":
+        return _prompt_seed(prompt) % 2 == 0
+    return canned_text(prompt)
+
+
+class _MockPotensHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keep-alive 지원 (커넥션 풀 동작 확인용)
+    disable_nagle_algorithm = True
+
+    def _send_json(self, status: int, body: dict, extra_headers: dict | None = None):
+        encoded = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(encoded)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def _send_event_stream(self, message: str):
+        """message를 어절 단위 SSE 이벤트로 나누어 chunked 전송합니다."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        events = [f"data: {json.dumps({'message': chunk}, ensure_ascii=False)}\n\n" for chunk in re.findall(r"\S+\s*", message)]
+        for i, event in enumerate(events + ["data: [DONE]\n\n"]):
+            if i:
+                time.sleep(self.server.config.stream_chunk_ms / 1000)
+            encoded = event.encode("utf-8")
+            self.wfile.write(f"{len(encoded):X}\r\n".encode("ascii") + encoded + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send_json(200, self.server.stats())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path != "/api/chat":
+            self._send_json(404, {"error": "not found"})
+            return
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            self._send_json(401, {"error": "missing bearer token"})
+            return
+        try:
+            payload = json.loads(body.decode("utf-8"))
+            prompt = payload["prompt"]
+        except (ValueError, KeyError):
+            self._send_json(400, {"error": "invalid payload"})
+            return
+
+        latency_seconds, status = self.server.next_injection()
+        time.sleep(latency_seconds)
+        if status == 429:
+            self._send_json(429, {"error": "rate limited"}, {"Retry-After": str(self.server.config.retry_after_seconds)})
+            return
+        if status != 200:
+            self._send_json(status, {"error": "injected server error"})
+            return
+
+        response_schema = (payload.get("generationConfig") or {}).get("responseSchema")
+        if not response_schema and self.server.config.stream and "text/event-stream" in self.headers.get("Accept", ""):
+            self._send_event_stream(canned_text(prompt))
+            return
+        if response_schema:
+            message = json.dumps(canned_json(response_schema, prompt), ensure_ascii=False)
+        else:
+            message = canned_text(prompt)
+        if self.server.config.stream:
+            time.sleep(len(re.findall(r"\S+\s*", message)) * self.server.config.stream_chunk_ms / 1000)
+        self._send_json(200, {"message": message})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, config: MockPotensConfig | None = None) -> MockPotensServer:
+    """모의 서버를 백그라운드 스레드에서 시작합니다. 종료는 server.shutdown()."""
+    server = MockPotensServer((host, port), config or MockPotensConfig())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Potens.dev /api/chat 모의 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--latency-spread", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stream", action="store_true", help="Accept: text/event-stream 요청에 SSE로 응답")
+    parser.add_argument("--stream-chunk-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    config = MockPotensConfig(
+        latency=args.latency, latency_ms=args.latency_ms, latency_spread=args.latency_spread,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+        retry_after_seconds=args.retry_after, seed=args.seed,
+        stream=args.stream, stream_chunk_ms=args.stream_chunk_ms
+    )
+    server = MockPotensServer((args.host, args.port), config)
+    print(f"Mock Potens.dev server listening on {server.endpoint} (stats: http://{args.host}:{args.port}/stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
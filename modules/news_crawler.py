@@ -5,10 +5,6 @@ from bs4 import BeautifulSoup
 import time
 from datetime import datetime
 
-# Streamlit의 st.error, st.warning 등을 사용하기 위해 임시로 import.
-# 실제 프로덕션에서는 이 로깅 부분을 다른 방식으로 처리하는 것이 좋습니다.
-import streamlit as st
-
 def crawl_naver_news_metadata(keyword: str, current_search_date: datetime, max_naver_search_pages_per_day: int):
     """
     지정된 키워드와 날짜로 네이버 뉴스 메타데이터를 크롤링합니다.
@@ -77,9 +73,13 @@ def crawl_naver_news_metadata(keyword: str, current_search_date: datetime, max_n
             time.sleep(0.5) # 서버 부하를 줄이기 위한 딜레이
 
         except requests.exceptions.RequestException as e:
+            # Streamlit의 st.error를 사용하기 위해 오류가 났을 때만 import (CLI/벤치마크에서는 streamlit 불필요)
+            # 실제 프로덕션에서는 이 로깅 부분을 다른 방식으로 처리하는 것이 좋습니다.
+            import streamlit as st
             st.error(f"웹 페이지 요청 중 오류 발생 ({formatted_search_date} 날짜, 페이지 {page + 1}): {e}")
             break # 오류 발생 시 해당 날짜의 크롤링 중단
         except Exception as e:
+            import streamlit as st
             st.error(f"스크립트 실행 중 오류 발생 ({formatted_search_date} 날짜, 페이지 {page + 1}): {e}")
             break # 오류 발생 시 해당 날짜의 크롤링 중단
     return articles_on_this_day
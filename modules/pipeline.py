@@ -0,0 +1,517 @@
+# modules/pipeline.py
+# 트렌드 분석 파이프라인입니다 (Streamlit에 의존하지 않음).
+# 뉴스 수집 → 키워드 트렌드 분석 → AI 키워드 선별 → 기사 요약 → 트렌드 요약/보험 인사이트 → 보고서 구성을
+# 입력/출력 타입이 정해진 단계 함수로 제공합니다. 트렌드 분석 페이지(백그라운드 작업), 보고서 자동화 페이지(예약 실행),
+# 명령줄(벤치마크/cron)이 같은 단계를 사용합니다.
+# 진행 상황은 reporter.progress(stage, fraction, message) / reporter.note(level, text)로 알립니다 (job_runner.JobContext와 호환).
+#
+# 실행: python -m modules.pipeline run --preset "전기차 주간"
+#       python -m modules.pipeline run --keyword 전기차 --total-days 14 --recent-days 2 --pages 1 --output report.md --json result.json
+#       python -m modules.pipeline presets
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+from modules import ai_metrics
+from modules import ai_service
+from modules import database_manager
+from modules import news_crawler
+from modules import trend_analyzer
+
+# 단계 이름과 표시 이름 (실행 순서)
+STAGE_LABELS = {
+    "crawl": "뉴스 메타데이터 수집",
+    "analyze": "키워드 트렌드 분석",
+    "select_keywords": "AI 키워드 선별",
+    "summarize": "트렌드 기사 요약",
+    "insights": "트렌드 요약 및 보험 인사이트 도출",
+    "format": "보고서 구성",
+}
+TOP_KEYWORDS = 3
+INSURANCE_PERSPECTIVE = "차량보험사의 보험개발자"
+# 기사 요약 호출 사이 간격(초)
+ARTICLE_SUMMARY_INTERVAL_SECONDS = float(os.getenv("ARTICLE_SUMMARY_INTERVAL_SECONDS", "0.1"))
+
+
+class PipelineReporter:
+    """진행 상황 보고 기본 구현. 진행률은 버리고 알림(notes)만 모읍니다."""
+
+    def __init__(self):
+        self.notes = []
+
+    def progress(self, stage: str, fraction: float, message: str = ""):
+        pass
+
+    def note(self, level: str, text: str):
+        """level: "info", "success", "warning", "error" """
+        self.notes.append({"type": level, "text": text})
+
+
+class ConsoleReporter(PipelineReporter):
+    """명령줄 실행용. 단계가 바뀌거나 진행률이 10% 이상 오를 때 stderr에 출력합니다."""
+
+    def __init__(self):
+        super().__init__()
+        self._stage = None
+        self._fraction = 0.0
+
+    def progress(self, stage: str, fraction: float, message: str = ""):
+        if stage == self._stage and fraction - self._fraction < 0.1:
+            return
+        self._stage, self._fraction = stage, fraction
+        print(f"[{STAGE_LABELS.get(stage, stage)} {fraction:4.0%}] {message}", file=sys.stderr)
+
+    def note(self, level: str, text: str):
+        super().note(level, text)
+        print(f"({level}) {text}", file=sys.stderr)
+
+
+class TrendParams:
+    """파이프라인 입력 (검색 프리셋과 같은 항목)."""
+
+    def __init__(self, keyword: str, total_search_days: int, recent_trend_days: int, max_naver_search_pages_per_day: int = 1):
+        if recent_trend_days >= total_search_days:
+            raise ValueError("최근 트렌드 분석 기간은 총 검색 기간보다 짧아야 합니다.")
+        self.keyword = keyword
+        self.total_search_days = total_search_days
+        self.recent_trend_days = recent_trend_days
+        self.max_naver_search_pages_per_day = max_naver_search_pages_per_day
+
+    @classmethod
+    def from_preset(cls, preset: dict) -> "TrendParams":
+        """database_manager.get_search_profiles()의 항목 또는 같은 키를 가진 dict로 만듭니다."""
+        return cls(preset['keyword'], preset['total_search_days'], preset['recent_trend_days'],
+                   preset['max_naver_search_pages_per_day'])
+
+    def to_dict(self) -> dict:
+        return {
+            "keyword": self.keyword,
+            "total_search_days": self.total_search_days,
+            "recent_trend_days": self.recent_trend_days,
+            "max_naver_search_pages_per_day": self.max_naver_search_pages_per_day,
+        }
+
+
+class CrawlResult:
+    """수집 단계 출력. articles의 "날짜"는 datetime입니다."""
+
+    def __init__(self, articles: list[dict], crawl_date: datetime):
+        self.articles = articles
+        self.crawl_date = crawl_date
+
+
+class KeywordSelection:
+    """키워드 선별 단계 출력. ai_selected가 False이면 AI 선별에 실패하여 전체 트렌드 키워드에서 고른 것입니다."""
+
+    def __init__(self, selected_keywords: list[dict], ai_selected: bool):
+        self.selected_keywords = selected_keywords
+        self.ai_selected = ai_selected
+
+
+class SummaryResult:
+    """기사 요약 단계 출력. articles의 "날짜"는 'YYYY-MM-DD' 문자열, "내용"은 AI 요약입니다."""
+
+    def __init__(self, articles: list[dict], circuit_open: bool = False):
+        self.articles = articles
+        self.circuit_open = circuit_open
+
+
+class TrendInsights:
+    """인사이트 단계 출력. formatted_*는 포맷팅 실패 시 원본 텍스트로 대체된 값입니다."""
+
+    def __init__(self, trend_summary: str, insurance_info: str, formatted_trend_summary: str,
+                 formatted_insurance_info: str, mode: str):
+        self.trend_summary = trend_summary
+        self.insurance_info = insurance_info
+        self.formatted_trend_summary = formatted_trend_summary
+        self.formatted_insurance_info = formatted_insurance_info
+        self.mode = mode
+
+
+class TrendRunResult:
+    """전체 실행 결과. 중간에 끝난 경우(트렌드 키워드/요약 대상 없음, 서킷 열림) 이후 단계 값은 비어 있습니다."""
+
+    def __init__(self, params: TrendParams):
+        self.params = params
+        self.collected_count = 0
+        self.trending_keywords = []
+        self.selected_keywords = []
+        self.summarized_articles = []
+        self.circuit_open = False
+        self.insights = None
+        self.report = ""
+        self.stage_seconds = {}
+
+    def to_dict(self) -> dict:
+        insights = self.insights
+        return {
+            "params": self.params.to_dict(),
+            "collected_count": self.collected_count,
+            "trending_keywords": self.trending_keywords,
+            "selected_keywords": self.selected_keywords,
+            "summarized_articles": self.summarized_articles,
+            "circuit_open": self.circuit_open,
+            "trend_summary": insights.trend_summary if insights else "",
+            "insurance_info": insights.insurance_info if insights else "",
+            "formatted_trend_summary": insights.formatted_trend_summary if insights else "",
+            "formatted_insurance_info": insights.formatted_insurance_info if insights else "",
+            "report": self.report,
+            "stage_seconds": self.stage_seconds,
+        }
+
+
+# --- 단계 함수 ---
+def crawl_news(params: TrendParams, reporter: PipelineReporter | None = None) -> CrawlResult:
+    """총 검색 기간의 날짜별 네이버 뉴스 메타데이터를 수집하고 articles 테이블에 저장합니다."""
+    reporter = reporter or PipelineReporter()
+    reporter.progress("crawl", 0.0, "네이버 뉴스 메타데이터 수집 중...")
+    today_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    search_start_date = today_date - timedelta(days=params.total_search_days - 1)
+    total_expected_articles = params.total_search_days * params.max_naver_search_pages_per_day * 10
+
+    all_collected_news_metadata = []
+    for i in range(params.total_search_days):
+        current_search_date = search_start_date + timedelta(days=i)
+        formatted_search_date = current_search_date.strftime('%Y-%m-%d')
+        daily_articles = news_crawler.crawl_naver_news_metadata(
+            params.keyword,
+            current_search_date,
+            params.max_naver_search_pages_per_day
+        )
+        for article in daily_articles:
+            database_manager.insert_article({
+                "제목": article["제목"],
+                "링크": article["링크"],
+                "날짜": article["날짜"].strftime('%Y-%m-%d'),
+                "내용": article["내용"]
+            })
+            all_collected_news_metadata.append(article)
+            reporter.progress("crawl", min(len(all_collected_news_metadata) / total_expected_articles, 1.0),
+                              f"뉴스 메타데이터 수집 중... ({formatted_search_date}, {len(all_collected_news_metadata)}개 기사 처리 완료)")
+
+    reporter.note("success", f"총 {len(all_collected_news_metadata)}개의 뉴스 메타데이터를 수집했습니다.")
+    return CrawlResult(all_collected_news_metadata, today_date)
+
+
+def analyze_trends(crawl: CrawlResult, params: TrendParams, reporter: PipelineReporter | None = None) -> list[dict]:
+    """최근 기간과 이전 기간의 키워드 언급량을 비교하여 트렌드 키워드 목록을 반환합니다."""
+    (reporter or PipelineReporter()).progress("analyze", 0.0, "키워드 트렌드 분석 중...")
+    return trend_analyzer.analyze_keyword_trends(
+        crawl.articles,
+        recent_days_period=params.recent_trend_days,
+        total_days_period=params.total_search_days
+    )
+
+
+def select_keywords(trending_keywords: list[dict], api_key: str, reporter: PipelineReporter | None = None,
+                    top_n: int = TOP_KEYWORDS, **retry_kwargs) -> KeywordSelection:
+    """
+    AI가 보험 개발자 관점에서 유의미한 키워드를 선별합니다. 선별에 실패하면 전체 트렌드 키워드에서 상위 top_n개를 고릅니다.
+    retry_kwargs(max_attempts, delay_seconds)는 ai_service 호출에 그대로 전달합니다 (이하 AI 단계 공통).
+    """
+    reporter = reporter or PipelineReporter()
+    reporter.progress("select_keywords", 0.0, "AI가 보험 개발자 관점에서 유의미한 키워드를 선별 중...")
+    relevant_keywords_from_ai_raw = ai_service.get_relevant_keywords(trending_keywords, INSURANCE_PERSPECTIVE, api_key, **retry_kwargs)
+
+    if relevant_keywords_from_ai_raw:
+        filtered_trending_keywords = sorted(
+            (kw_data for kw_data in trending_keywords if kw_data['keyword'] in relevant_keywords_from_ai_raw),
+            key=lambda x: x['recent_freq'], reverse=True
+        )
+        reporter.note("info", f"AI가 선별한 보험 개발자 관점의 유의미한 키워드 ({len(filtered_trending_keywords)}개): {[kw['keyword'] for kw in filtered_trending_keywords]}")
+    else:
+        reporter.note("warning", "AI가 보험 개발자 관점에서 유의미한 키워드를 선별하지 못했습니다. 모든 트렌드 키워드를 표시합니다.")
+        filtered_trending_keywords = trending_keywords
+
+    selected_keywords = filtered_trending_keywords[:top_n]
+    if not selected_keywords:
+        reporter.note("info", "보험 개발자 관점에서 유의미한 트렌드 키워드가 식별되지 않습니다.")
+    return KeywordSelection(selected_keywords, bool(relevant_keywords_from_ai_raw))
+
+
+def select_articles_for_summary(crawl: CrawlResult, params: TrendParams, selected_keywords: list[dict]) -> list[dict]:
+    """최근 트렌드 기간의 기사 중 선별된 키워드를 포함하는 기사를 고릅니다 (링크 중복 제거)."""
+    recent_start = crawl.crawl_date - timedelta(days=params.recent_trend_days)
+    selected_words = {kw['keyword'] for kw in selected_keywords}
+    articles, seen_links = [], set()
+    for article in crawl.articles:
+        if not article.get("날짜") or article["날짜"] < recent_start or article["링크"] in seen_links:
+            continue
+        article_keywords = trend_analyzer.extract_keywords_from_text(article["제목"] + " " + article.get("내용", ""))
+        if selected_words.intersection(article_keywords):
+            articles.append(article)
+            seen_links.add(article["링크"])
+    return articles
+
+
+def summarize_articles(articles: list[dict], api_key: str, reporter: PipelineReporter | None = None,
+                       **retry_kwargs) -> SummaryResult:
+    """기사 본문을 AI로 요약합니다. 서킷이 열리면 남은 기사도 모두 즉시 실패하므로 바로 중단합니다 (circuit_open=True)."""
+    reporter = reporter or PipelineReporter()
+    total = len(articles)
+    reporter.progress("summarize", 0.0, f"AI가 트렌드 기사를 요약 중... (0/{total} 완료)")
+    summarized = []
+    for done, article in enumerate(articles, 1):
+        article_date_str = article["날짜"].strftime('%Y-%m-%d')
+        ai_processed_content = ai_service.get_article_summary(
+            article["제목"], article["링크"], article_date_str, article["내용"], api_key, **retry_kwargs
+        )
+        if ai_service.is_circuit_open_error(ai_processed_content):
+            reporter.note("error", f"🚨 {ai_service.CIRCUIT_OPEN_ERROR_MESSAGE}")
+            return SummaryResult(summarized, circuit_open=True)
+
+        if ai_service.is_ai_failure_text(ai_processed_content):
+            final_content = f"본문 요약 실패 (AI 오류): {ai_processed_content}"
+            reporter.note("error", f"AI 요약 실패: {final_content}")
+        else:
+            final_content = ai_service.clean_ai_response_text(ai_processed_content)
+
+        summarized.append({"제목": article["제목"], "링크": article["링크"], "날짜": article_date_str, "내용": final_content})
+        reporter.progress("summarize", done / total, f"AI가 트렌드 기사를 요약 중... ({done}/{total} 완료)")
+        if ARTICLE_SUMMARY_INTERVAL_SECONDS > 0 and done < total:
+            time.sleep(ARTICLE_SUMMARY_INTERVAL_SECONDS)
+    return SummaryResult(summarized)
+
+
+def derive_insights(summarized_articles: list[dict], api_key: str, reporter: PipelineReporter | None = None,
+                    structured: bool = True, **retry_kwargs) -> TrendInsights:
+    """
+    요약 기사로 트렌드 요약과 자동차 보험 산업 관련 정보를 마크다운으로 도출합니다.
+    구조화(JSON) 호출 1회로 요약/보험 영향 분석/포맷팅을 함께 받고, 실패 시 ai_service가 단계별 호출로 대체합니다.
+    structured=False면 처음부터 단계별 호출을 사용합니다.
+    """
+    reporter = reporter or PipelineReporter()
+    reporter.progress("insights", 0.0, "AI가 뉴스 트렌드 요약 및 자동차 보험 산업 관련 정보를 분석 중...")
+    trend_insights = ai_service.get_trend_insights(summarized_articles, api_key, structured=structured, **retry_kwargs)
+
+    trend_summary = trend_insights['trend_summary']
+    if trend_insights['mode'] == "failed" or trend_summary.startswith("요약된 기사가 없어") or ai_service.is_ai_failure_text(trend_summary):
+        reporter.note("error", f"AI 트렌드 요약 실패: {trend_summary}")
+
+    insurance_info = trend_insights['insurance_info']
+    if trend_insights['mode'] == "failed" or insurance_info.startswith("요약된 기사가 없어") or \
+       ai_service.is_ai_failure_text(insurance_info) or insurance_info.startswith("트렌드 요약문이 없어"):
+        reporter.note("error", f"AI 자동차 보험 산업 관련 정보 분석 실패: {insurance_info}")
+
+    # 포맷팅 실패 시 원본 텍스트 사용
+    formatted_trend_summary = trend_insights['formatted_trend_summary']
+    if not formatted_trend_summary or formatted_trend_summary.startswith("AI를 통한 보고서 포맷팅 실패"):
+        reporter.note("warning", "AI 뉴스 트렌드 요약 포맷팅에 실패했습니다. 원본 텍스트가 사용됩니다.")
+        formatted_trend_summary = trend_summary
+
+    formatted_insurance_info = trend_insights['formatted_insurance_info']
+    if not formatted_insurance_info or formatted_insurance_info.startswith("AI를 통한 보고서 포맷팅 실패"):
+        reporter.note("warning", "AI 자동차 보험 산업 관련 정보 포맷팅에 실패했습니다. 원본 텍스트가 사용됩니다.")
+        formatted_insurance_info = insurance_info
+    else:
+        reporter.note("success", "AI 뉴스 트렌드 요약 및 자동차 보험 산업 관련 정보 분석 완료!")
+
+    return TrendInsights(trend_summary, insurance_info, formatted_trend_summary, formatted_insurance_info, trend_insights['mode'])
+
+
+def build_report(insights: TrendInsights, selected_keywords: list[dict], summarized_articles: list[dict]) -> str:
+    """최종 보고서 결합 (AI 포맷팅 결과 + 직접 구성 부록)."""
+    report = ""
+    report += "# 뉴스 트렌드 분석 및 보험 상품 개발 인사이트\n\n"
+    report += "## 개요\n\n"
+    report += "이 보고서는 최근 뉴스 트렌드를 분석하고, 이를 바탕으로 자동차 보험 상품 개발에 필요한 주요 인사이트를 제공합니다.\n\n"
+    report += "## 뉴스 트렌드 요약\n" if insights.formatted_trend_summary else "## 뉴스 트렌드 요약 (생성 실패)\n"
+    report += insights.formatted_trend_summary + "\n\n"
+    report += "## 자동차 보험 산업 관련 주요 사실 및 법적 책임\n" if insights.formatted_insurance_info else \
+              "## 자동차 보험 산업 관련 주요 사실 및 법적 책임 (생성 실패)\n"
+    report += insights.formatted_insurance_info + "\n\n"
+
+    # --- 부록 섹션 (AI 포맷팅 없이 직접 구성) ---
+    report += "---\n\n"
+    report += "## 부록\n\n"
+
+    report += "### 키워드 산출 근거\n"
+    if selected_keywords:
+        for kw_data in selected_keywords:
+            surge_ratio_display = (f'''{kw_data.get('surge_ratio'):.2f}x''' if kw_data.get('surge_ratio') != float('inf') else '새로운 트렌드')
+            report += (
+                f"- **키워드**: {kw_data['keyword']}\n"
+                f"  - 최근 언급량: {kw_data['recent_freq']}회\n"
+                f"  - 이전 언급량: {kw_data['past_freq']}회\n"
+                f"  - 증가율: {surge_ratio_display}\n\n"
+            )
+    else:
+        report += "키워드 산출 근거 데이터가 없습니다.\n\n"
+
+    report += "### 반영된 기사 리스트\n"
+    if summarized_articles:
+        for i, article in enumerate(summarized_articles):
+            report += (
+                f"{i+1}. **제목**: {article['제목']}\n"
+                f"   **날짜**: {article['날짜']}\n"
+                f"   **링크**: {article['링크']}\n"
+                f"   **요약 내용**: {article['내용'][:150]}...\n\n"
+            )
+    else:
+        report += "반영된 기사 리스트가 없습니다.\n\n"
+    return report
+
+
+def generate_endorsement(report: str, api_key: str) -> str:
+    """보고서 내용을 근거로 특약 섹션을 동시에 생성하고 표준 섹션 순서로 합친 특약 텍스트를 반환합니다."""
+    # 임베딩/FAISS 의존성이 무거우므로 특약을 생성할 때만 가져옴 (KeywordRetriever는 BM25만 사용)
+    from modules import document_processor
+
+    sections = ai_service.ENDORSEMENT_SECTIONS
+    # 보고서 전체 대신 섹션별로 관련 부분만 토큰 예산 안에서 검색하여 사용
+    report_retriever = document_processor.KeywordRetriever.from_text(report, source="report")
+    prompts = {
+        title: ai_service.build_endorsement_section_prompt(
+            title, question,
+            document_processor.build_section_context(report_retriever, ai_service.endorsement_section_query(title, question))
+        )
+        for title, question in sections.items()
+    }
+    generated_sections = {}
+    for title, response_dict in ai_service.iter_concurrent_ai_calls(prompts, api_key, call_site="endorsement_section"):
+        generated_sections[title] = ai_service.clean_ai_response_text(response_dict.get("text", response_dict.get("error", "AI 응답 실패.")))
+    return ai_service.format_endorsement_text(generated_sections, sections)
+
+
+def _timed(result: TrendRunResult, stage: str, fn, *args):
+    start = time.perf_counter()
+    value = fn(*args)
+    result.stage_seconds[stage] = round(time.perf_counter() - start, 3)
+    return value
+
+
+def run_trend_pipeline(params: TrendParams, api_key: str, reporter: PipelineReporter | None = None) -> TrendRunResult:
+    """
+    전체 트렌드 분석을 실행합니다. 트렌드 키워드나 요약 대상 기사가 없거나 서킷이 열리면 그 단계에서 끝납니다.
+    AI 호출 계측(ai_metrics run)은 호출하는 쪽에서 시작/종료합니다.
+    """
+    reporter = reporter or PipelineReporter()
+    result = TrendRunResult(params)
+
+    crawl = _timed(result, "crawl", crawl_news, params, reporter)
+    result.collected_count = len(crawl.articles)
+
+    result.trending_keywords = _timed(result, "analyze", analyze_trends, crawl, params, reporter)
+    if not result.trending_keywords:
+        reporter.note("info", "선택된 기간 내에 유의미한 트렌드 키워드가 없습니다.")
+        return result
+
+    selection = _timed(result, "select_keywords", select_keywords, result.trending_keywords, api_key, reporter)
+    result.selected_keywords = selection.selected_keywords
+
+    articles_for_ai_summary = select_articles_for_summary(crawl, params, result.selected_keywords)
+    if not articles_for_ai_summary:
+        reporter.note("info", "선별된 트렌드 키워드를 포함하는 최근 기사가 없거나, AI 요약 대상 기사가 없습니다.")
+        return result
+
+    summaries = _timed(result, "summarize", summarize_articles, articles_for_ai_summary, api_key, reporter)
+    result.summarized_articles = summaries.articles
+    result.circuit_open = summaries.circuit_open
+    if summaries.circuit_open or not summaries.articles:
+        if not summaries.articles:
+            reporter.note("info", "선별된 트렌드 키워드를 포함하는 기사가 없거나, AI 요약에 실패했습니다.")
+        return result
+    reporter.note("success", f"총 {len(summaries.articles)}개의 트렌드 기사 요약을 완료했습니다.")
+
+    result.insights = _timed(result, "insights", derive_insights, summaries.articles, api_key, reporter)
+
+    reporter.progress("format", 0.0, "보고서 구성 중...")
+    result.report = _timed(result, "format", build_report, result.insights, result.selected_keywords, summaries.articles)
+    return result
+
+
+# --- 명령줄 실행 ---
+def _params_from_args(args) -> TrendParams:
+    if args.preset:
+        preset = next((p for p in database_manager.get_search_profiles() if p['profile_name'] == args.preset), None)
+        if preset is None:
+            raise SystemExit(f"검색 프리셋을 찾을 수 없습니다: {args.preset} (목록: python -m modules.pipeline presets)")
+        return TrendParams.from_preset(preset)
+    if not args.keyword:
+        raise SystemExit("--preset 또는 --keyword를 지정하세요.")
+    return TrendParams(args.keyword, args.total_days, args.recent_days, args.pages)
+
+
+def _run_command(args) -> int:
+    api_key = os.getenv("POTENS_API_KEY")
+    if not api_key:
+        raise SystemExit("오류: .env 파일 또는 환경 변수에 'POTENS_API_KEY'가 설정되지 않았습니다.")
+    try:
+        params = _params_from_args(args)
+    except ValueError as e:
+        raise SystemExit(f"오류: {e}")
+
+    reporter = ConsoleReporter()
+    ai_run = ai_metrics.start_run("pipeline_cli")
+    start = time.perf_counter()
+    try:
+        result = run_trend_pipeline(params, api_key, reporter)
+        endorsement = generate_endorsement(result.report, api_key) if args.with_endorsement and result.report else ""
+    finally:
+        metrics_summary = ai_metrics.finish_run(ai_run, persist=not args.no_persist_metrics)
+    wall_seconds = time.perf_counter() - start
+
+    print(f"keyword={params.keyword} collected={result.collected_count} trending={len(result.trending_keywords)} "
+          f"selected={[kw['keyword'] for kw in result.selected_keywords]} summarized={len(result.summarized_articles)} "
+          f"wall={wall_seconds:.1f}s")
+    for stage, seconds in result.stage_seconds.items():
+        print(f"  {stage:<16} {seconds:8.2f}s")
+    for row in metrics_summary:
+        print(f"  ai[{row['호출 지점']}] 호출 {row['호출 수']}회, 실패 {row['실패 수']}회, 총 지연 {row['총 지연(초)']}s, p95 {row['p95(ms)']}ms")
+
+    if args.output and result.report:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(result.report)
+    if args.with_endorsement and endorsement:
+        database_manager.save_generated_endorsement(endorsement)
+        if args.output:
+            with open(os.path.splitext(args.output)[0] + "_endorsement.txt", "w", encoding="utf-8") as f:
+                f.write(endorsement)
+    if args.json:
+        payload = dict(result.to_dict(), endorsement=endorsement, notes=reporter.notes,
+                       ai_call_metrics_summary=metrics_summary, wall_seconds=round(wall_seconds, 3))
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2, default=str)
+    elif not args.output:
+        print(result.report)
+    # 보고서를 만들지 못하면 cron 등에서 알 수 있도록 실패 코드 반환
+    return 0 if result.report else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="트렌드 분석 파이프라인 (UI 없이 실행)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="트렌드 분석을 실행하고 보고서를 출력/저장")
+    run_parser.add_argument("--preset", help="저장된 검색 프리셋 이름 (search_profiles)")
+    run_parser.add_argument("--keyword", help="프리셋 대신 직접 지정할 검색 키워드")
+    run_parser.add_argument("--total-days", type=int, default=30)
+    run_parser.add_argument("--recent-days", type=int, default=2)
+    run_parser.add_argument("--pages", type=int, default=1, help="날짜별 네이버 뉴스 검색 페이지 수")
+    run_parser.add_argument("--output", help="보고서(마크다운) 저장 경로")
+    run_parser.add_argument("--json", help="단계별 결과/소요 시간/AI 호출 요약 JSON 저장 경로")
+    run_parser.add_argument("--with-endorsement", action="store_true", help="보고서 기반 특약도 생성하여 DB에 저장")
+    run_parser.add_argument("--no-persist-metrics", action="store_true", help="AI 호출 계측 기록을 DB에 저장하지 않음")
+
+    subparsers.add_parser("presets", help="저장된 검색 프리셋 목록")
+    args = parser.parse_args()
+
+    load_dotenv()
+    database_manager.init_db()
+
+    if args.command == "presets":
+        for preset in database_manager.get_search_profiles():
+            print(f"{preset['profile_name']}: keyword={preset['keyword']} total_days={preset['total_search_days']} "
+                  f"recent_days={preset['recent_trend_days']} pages={preset['max_naver_search_pages_per_day']}")
+        return
+    sys.exit(_run_command(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# modules/qa_cache.py
+# 문서 QA 답변 캐시입니다.
+# 문서 묶음 키(vector_index_store.document_set_key)와 정규화한 질문으로 답변과 참고 문서를 SQLite(qa_cache 테이블)에 저장하고,
+# 같은 질문은 검색/AI 호출 없이 바로 답합니다. 질의 임베딩을 함께 저장하여
+# 표현만 다른 질문도 코사인 유사도가 임계값 이상이면 캐시된 답변을 사용합니다 (선택).
+# 유사 질문 적중은 조문 번호(제N조 등)와 숫자가 정확히 같은 질문 사이에서만 허용합니다
+# ("제12조 면책 사유"와 "제13조 면책 사유"는 임베딩이 매우 비슷해도 다른 질문).
+
+import json
+import os
+import re
+import time
+import unicodedata
+from array import array
+
+import numpy as np
+
+from modules import database_manager
+from modules.document_processor import ARTICLE_PATTERN
+
+QA_CACHE_TTL_SECONDS = int(os.getenv("QA_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# 유사 질문 적중 기준 (정규화된 ko-sroberta 임베딩의 코사인 유사도). 0 이하이면 유사 질문 검색을 하지 않습니다.
+QA_CACHE_SIMILARITY_THRESHOLD = float(os.getenv("QA_CACHE_SIMILARITY_THRESHOLD", "0.93"))
+# 유사 질문 검색 시 비교할 최근 항목 수 상한 (문서 묶음별)
+QA_CACHE_MAX_CANDIDATES = int(os.getenv("QA_CACHE_MAX_CANDIDATES", "2000"))
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+_NUMBER_RE = re.compile(r"\d+")
+
+
+def normalize_question(question: str) -> str:
+    """캐시 키용 질문 정규화: 유니코드 NFKC, 소문자, 문장부호 제거, 공백 정리."""
+    text = unicodedata.normalize("NFKC", question).lower()
+    text = _PUNCTUATION_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def _pack_vector(vector) -> bytes | None:
+    return array("f", vector).tobytes() if vector is not None else None
+
+
+def number_signature(question: str) -> tuple:
+    """질문의 조문 번호(공백 제거)와 그 밖의 숫자를 정렬한 튜플. 유사 질문은 이 값이 같을 때만 적중합니다."""
+    text = unicodedata.normalize("NFKC", question) # ①, ２ 등도 일반 숫자로
+    articles = [_SPACE_RE.sub("", match) for match in ARTICLE_PATTERN.findall(text)]
+    numbers = _NUMBER_RE.findall(ARTICLE_PATTERN.sub(" ", text))
+    return tuple(sorted(articles)), tuple(sorted(numbers))
+
+
+def _result(entry: dict, match: str, similarity: float, now: float) -> dict:
+    return {
+        "answer": entry["answer"],
+        "sources": json.loads(entry["sources_json"]),
+        "question": entry["question"],
+        "match": match,
+        "similarity": similarity,
+        "age_seconds": now - entry["created_at"],
+    }
+
+
+def lookup_exact(doc_set_key: str, question: str) -> dict | None:
+    """정규화 질문이 일치하는 캐시 답변을 찾습니다 (임베딩 계산 전에 먼저 확인)."""
+    now = time.time()
+    entry = database_manager.get_qa_cache_entry(doc_set_key, normalize_question(question), now)
+    return _result(entry, "exact", 1.0, now) if entry else None
+
+
+def lookup_similar(doc_set_key: str, question: str, query_vector) -> dict | None:
+    """
+    조문 번호/숫자가 같은 최근 질문 중 질의 임베딩과의 코사인 유사도가 임계값 이상인 가장 비슷한 질문의 답변을 찾습니다.
+    유사도는 후보 임베딩을 한 행렬로 쌓아 한 번에 계산합니다.
+    """
+    if query_vector is None or QA_CACHE_SIMILARITY_THRESHOLD <= 0:
+        return None
+    now = time.time()
+    signature = number_signature(question)
+    candidates = [entry for entry in database_manager.get_qa_cache_entries(doc_set_key, now, limit=QA_CACHE_MAX_CANDIDATES)
+                  if number_signature(entry["question"]) == signature]
+    if not candidates:
+        return None
+    matrix = np.vstack([np.frombuffer(entry["embedding"], dtype=np.float32) for entry in candidates])
+    query = np.asarray(query_vector, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    scores = np.divide(matrix @ query, norms, out=np.zeros(len(candidates), dtype=np.float32), where=norms > 0)
+    best = int(np.argmax(scores))
+    if scores[best] < QA_CACHE_SIMILARITY_THRESHOLD:
+        return None
+    return _result(candidates[best], "semantic", float(scores[best]), now)
+
+
+def lookup(doc_set_key: str, question: str, embed_query=None) -> tuple[dict | None, list | None]:
+    """
+    캐시된 답변을 찾습니다. 정규화 질문이 일치하면 "exact" 적중이고,
+    없으면 embed_query(question)로 질의 임베딩을 계산해 조건(lookup_similar)을 만족하는 "semantic" 적중을 찾습니다.
+    임베딩은 같은 질문이 없을 때만 계산하며, 검색/캐시 저장에 다시 쓸 수 있도록 함께 반환합니다.
+    반환: ({"answer", "sources", "question", "match", "similarity", "age_seconds"} 또는 None, 질의 임베딩 또는 None)
+    """
+    cached = lookup_exact(doc_set_key, question)
+    if cached or embed_query is None:
+        return cached, None
+    query_vector = embed_query(question)
+    return lookup_similar(doc_set_key, question, query_vector), query_vector
+
+
+def store(doc_set_key: str, question: str, answer: str, sources: list[dict], query_vector=None,
+          ttl_seconds: int | None = None):
+    """
+    답변을 캐시에 저장합니다. sources: [{"source": 출처, "page_content": 내용}, ...]
+    저장할 때 만료된 항목도 함께 정리합니다.
+    """
+    now = time.time()
+    database_manager.delete_expired_qa_cache(now)
+    database_manager.save_qa_cache_entry(
+        doc_set_key, normalize_question(question), question, answer,
+        json.dumps(sources, ensure_ascii=False), _pack_vector(query_vector),
+        now, now + (QA_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds)
+    )
+
+
+def sources_from_documents(docs) -> list[dict]:
+    """검색된 청크(Document 목록)를 캐시 저장용 참고 문서 목록으로 변환합니다."""
+    return [{"source": doc.metadata.get("source", "알 수 없음"), "page_content": doc.page_content} for doc in docs]
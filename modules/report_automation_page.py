@@ -13,11 +13,11 @@ import streamlit.components.v1 as components
 
 # --- 모듈 임포트 (경로 조정) ---
 from modules import ai_service
+from modules import ai_metrics
 from modules import database_manager
-from modules import news_crawler
-from modules import trend_analyzer
 from modules import data_exporter
 from modules import email_sender
+from modules import pipeline
 
 def report_automation_page():
     """
@@ -139,113 +139,17 @@ def report_automation_page():
             profile_to_run = profiles_dict.get(profile_id_to_run)
 
             if profile_to_run:
+                ai_run = ai_metrics.start_run("scheduled_report") # 예약 실행의 AI 호출을 호출 지점별로 계측
                 try:
                     with st.spinner(f"예약된 작업 실행 중: '{profile_to_run['profile_name']}' 보고서 생성 및 전송..."):
-                        # 1. 뉴스 메타데이터 수집
-                        all_collected_news_metadata = []
-                        today_date_for_crawl = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-                        search_start_date = today_date_for_crawl - timedelta(days=profile_to_run['total_search_days'] - 1)
-
-                        for i in range(profile_to_run['total_search_days']):
-                            current_search_date = search_start_date + timedelta(days=i)
-                            daily_articles = news_crawler.crawl_naver_news_metadata(
-                                profile_to_run['keyword'],
-                                current_search_date,
-                                profile_to_run['max_naver_search_pages_per_day']
-                            )
-                            for article in daily_articles:
-                                article_data_for_db = {
-                                    "제목": article["제목"],
-                                    "링크": article["링크"],
-                                    "날짜": article["날짜"].strftime('%Y-%m-%d'),
-                                    "내용": article["내용"]
-                                }
-                                database_manager.insert_article(article_data_for_db)
-                                all_collected_news_metadata.append(article)
-                        
-                        # 2. 키워드 트렌드 분석
-                        trending_keywords_data = trend_analyzer.analyze_keyword_trends(
-                            all_collected_news_metadata,
-                            recent_days_period=profile_to_run['recent_trend_days'],
-                            total_days_period=profile_to_run['total_search_days']
+                        # 1~6. 뉴스 수집 → 트렌드 분석 → 키워드 선별 → 기사 요약 → 인사이트 도출 → 보고서 구성 (modules/pipeline.py)
+                        pipeline_result = pipeline.run_trend_pipeline(
+                            pipeline.TrendParams.from_preset(profile_to_run), POTENS_API_KEY
                         )
-
-                        relevant_keywords_from_ai_raw = ai_service.get_relevant_keywords(
-                            trending_keywords_data, "차량보험사의 보험개발자", POTENS_API_KEY
-                        )
-                        filtered_trending_keywords = [
-                            kw_data for kw_data in trending_keywords_data
-                            if kw_data['keyword'] in relevant_keywords_from_ai_raw
-                        ]
-                        filtered_trending_keywords = sorted(filtered_trending_keywords, key=lambda x: x['recent_freq'], reverse=True)
-                        top_3_relevant_keywords = filtered_trending_keywords[:3]
-
-                        # 3. 트렌드 기사 본문 요약
-                        recent_trending_articles_candidates = [
-                            article for article in all_collected_news_metadata
-                            if article.get("날짜") and today_date_for_crawl - timedelta(days=profile_to_run['recent_trend_days']) <= article["날짜"]
-                        ]
-                        articles_for_ai_summary = []
-                        processed_links = set()
-                        for article in recent_trending_articles_candidates:
-                            text_for_trend_check = article["제목"] + " " + article.get("내용", "")
-                            article_keywords_for_trend = trend_analyzer.extract_keywords_from_text(text_for_trend_check)
-                            if any(trend_kw['keyword'] in article_keywords_for_trend for trend_kw in top_3_relevant_keywords):
-                                articles_for_ai_summary.append(article)
-
-                        temp_collected_articles = []
-                        for article in articles_for_ai_summary:
-                            if article["링크"] in processed_links:
-                                continue
-                            article_date_str = article["날짜"].strftime('%Y-%m-%d')
-                            ai_processed_content = ai_service.get_article_summary(
-                                article["제목"], article["링크"], article_date_str, article["내용"], POTENS_API_KEY
-                            )
-                            final_content = ai_service.clean_ai_response_text(ai_processed_content)
-                            temp_collected_articles.append({
-                                "제목": article["제목"], "링크": article["링크"], "날짜": article_date_str, "내용": final_content
-                            })
-                            processed_links.add(article["링크"])
-
-                        # 4. AI가 트렌드 요약 및 보험 상품 개발 인사이트 도출
-                        articles_for_ai_insight_generation = temp_collected_articles
-                        trend_summary = ai_service.get_overall_trend_summary(articles_for_ai_insight_generation, POTENS_API_KEY)
-                        insurance_info = ai_service.get_insurance_implications_from_ai(trend_summary, POTENS_API_KEY)
-
-                        # 5. AI가 각 섹션별로 포맷팅
-                        formatted_trend_summary = ai_service.format_text_with_markdown(trend_summary, POTENS_API_KEY)
-                        formatted_insurance_info = ai_service.format_text_with_markdown(insurance_info, POTENS_API_KEY)
-
-                        # 6. 최종 보고서 결합
-                        final_prettified_report = ""
-                        final_prettified_report += "# 뉴스 트렌드 분석 및 보험 상품 개발 인사이트\n\n"
-                        final_prettified_report += "## 개요\n\n"
-                        final_prettified_report += "이 보고서는 최근 뉴스 트렌드를 분석하고, 이를 바탕으로 자동차 보험 상품 개발에 필요한 주요 인사이트를 제공합니다.\n\n"
-                        final_prettified_report += "## 뉴스 트렌드 요약\n" + (formatted_trend_summary if formatted_trend_summary else trend_summary) + "\n\n"
-                        final_prettified_report += "## 자동차 보험 산업 관련 주요 사실 및 법적 책임\n" + (formatted_insurance_info if formatted_insurance_info else insurance_info) + "\n\n"
-                        final_prettified_report += "---\n\n## 부록\n\n### 키워드 산출 근거\n"
-                        if top_3_relevant_keywords:
-                            for kw_data in top_3_relevant_keywords:
-                                surge_ratio_display = (f'''{kw_data.get('surge_ratio'):.2f}x''' if kw_data.get('surge_ratio') != float('inf') else '새로운 트렌드')
-                                final_prettified_report += (
-                                    f"- **키워드**: {kw_data['keyword']}\n"
-                                    f"  - 최근 언급량: {kw_data['recent_freq']}회\n"
-                                    f"  - 이전 언급량: {kw_data['past_freq']}회\n"
-                                    f"  - 증가율: {surge_ratio_display}\n\n"
-                                )
-                        else:
-                            final_prettified_report += "키워드 산출 근거 데이터가 없습니다.\n\n"
-                        final_prettified_report += "### 반영된 기사 리스트\n"
-                        if temp_collected_articles:
-                            for i, article in enumerate(temp_collected_articles):
-                                final_prettified_report += (
-                                    f"{i+1}. **제목**: {article['제목']}\n"
-                                    f"   **날짜**: {article['날짜']}\n" # '날' 대신 '날짜' 사용
-                                    f"   **링크**: {article['링크']}\n"
-                                    f"   **요약 내용**: {article['내용'][:150]}...\n\n"
-                                )
-                        else:
-                            final_prettified_report += "반영된 기사 리스트가 없습니다.\n\n"
+                        # 서킷이 열려 있으면 이후 AI 단계가 모두 즉시 실패하므로 오류 보고서를 보내지 않고 중단
+                        if pipeline_result.circuit_open:
+                            raise RuntimeError(ai_service.CIRCUIT_OPEN_ERROR_MESSAGE)
+                        final_prettified_report = pipeline_result.report
 
                         # 7. 엑셀 보고서 생성 (첨부파일용)
                         excel_data_for_attachment = None
@@ -263,47 +167,7 @@ def report_automation_page():
                         
                         if final_prettified_report: # 새로 생성된 보고서 내용이 있을 경우에만 특약 생성 시도
                             st.info("⏳ 새로 생성된 보고서 내용을 기반으로 특약을 동적으로 생성 중...")
-                            # 특약 구성 항목 정의 (document_analysis_page.py에서 가져옴)
-                            sections_for_endorsement = {
-                                "1. 특약의 명칭": "자동차 보험 표준약관을 참고하여 특약의 **명칭**을 작성해줘.",
-                                "2. 특약의 목적": "이 특약의 **목적**을 설명해줘.",
-                                "3. 보장 범위": "**보장 범위**에 대해 상세히 작성해줘.",
-                                "4. 보험금 지급 조건": "**보험금 지급 조건**을 구체적으로 작성해줘.",
-                                "5. 보험료 산정 방식": "**보험료 산정 방식**을 설명해줘.",
-                                "6. 면책 사항": "**면책 사항**에 해당하는 내용을 작성해줘.",
-                                "7. 특약의 적용 기간": "**적용 기간**을 명시해줘.",
-                                "8. 기타 특별 조건": "**기타 특별 조건**이 있다면 제안해줘.",
-                                "9. 운전가능자 제한": "**운전자 연령과 범위**에 따른 특별 약관을 제안해줘.",
-                                "10. 보험료 할인": "**보험료 할인**에 해당하는 특별 약관을 작성해줘.",
-                                "11. 보장 확대": "**법률비용 및 다른 자동차 운전**에 해당하는 특별 약관을 작성해줘"
-                            }
-                            
-                            generated_endorsement_sections = {}
-                            full_endorsement_text = ""
-
-                            for title, question in sections_for_endorsement.items():
-                                prompt_endorsement = f"""
-너는 자동차 보험을 설계하고 있는 보험사 직원이야.
-다음 조건에 따라 자동차 보험 특약의 '{title}'을 3~5줄 정도로 작성해줘.
-
-[기획 목적]
-- 이 특약은 보험 상품 기획 초기 단계에서 트렌드 조사 및 방향성 도출에 도움 되는 목적으로 작성돼야 해.
-- 새로운 기술(예: 블랙박스, 자율주행 등)이나 최근 사회적 이슈(예: 고령 운전자 증가 등)를 반영해도 좋아.
-- 표준약관 표현 방식을 따라줘.
-
-[표준약관 내용]
-{final_prettified_report} # 새로 생성된 보고서 내용을 특약 생성의 기반으로 사용
-
-[질문]
-{question}
-
-[답변]
-"""
-                                response_dict_endorsement = ai_service.retry_ai_call(prompt_endorsement, POTENS_API_KEY)
-                                answer_endorsement = ai_service.clean_ai_response_text(response_dict_endorsement.get("text", response_dict_endorsement.get("error", "AI 응답 실패.")))
-                                generated_endorsement_sections[title] = answer_endorsement
-                                full_endorsement_text += f"#### {title}\n{answer_endorsement.strip()}\n\n"
-                            
+                            full_endorsement_text = pipeline.generate_endorsement(final_prettified_report, POTENS_API_KEY)
                             endorsement_text_for_attachment = full_endorsement_text
                             database_manager.save_generated_endorsement(endorsement_text_for_attachment) # 동적 생성 후 DB에 저장
                             endorsement_filename = data_exporter.generate_filename("생성된_보험_특약", "txt")
@@ -421,6 +285,7 @@ def report_automation_page():
                     st.session_state['automation_email_status_type'] = "error"
                 finally:
                     # 작업 완료 후 플래그 초기화 (성공/실패 여부와 관계없이)
+                    st.session_state['last_run_ai_call_metrics'] = ai_metrics.finish_run(ai_run)
                     st.session_state['scheduled_task_running'] = False
                     st.rerun() # 플래그 초기화 후 UI 업데이트를 위해 새로고침
             else:
@@ -616,6 +481,14 @@ def report_automation_page():
             else:
                 st.info("현재 예약된 보고서 자동 전송 작업이 없습니다.")
 
+            breaker_metrics = ai_service.get_circuit_breaker_metrics()
+            st.caption(f"AI 엔드포인트 서킷 상태: {breaker_metrics['state']} "
+                       f"(최근 실패율 {breaker_metrics['failure_rate']:.0%}, 차단 {breaker_metrics['rejected_count']}회)")
+
+            if st.session_state.get('last_run_ai_call_metrics'):
+                with st.expander("⏱️ 마지막 예약 실행의 AI 호출 성능 요약 (호출 지점별)"):
+                    st.dataframe(pd.DataFrame(st.session_state['last_run_ai_call_metrics']), use_container_width=True, hide_index=True)
+
             st.markdown("---")
 
             st.subheader("📧 보고서 및 특약 수동 전송")
@@ -881,7 +754,6 @@ def report_automation_page():
             st.session_state['email_status_type'] = ""
             st.session_state['search_profiles'] = database_manager.get_search_profiles()
             st.session_state['scheduled_task'] = database_manager.get_scheduled_task()
-            # 데이터베이스 초기화 시 특약 및 문서 텍스트도 초기화
+            # 데이터베이스 초기화 시 특약도 초기화 (문서 텍스트는 clear_db_content에서 삭제)
             database_manager.save_generated_endorsement("")
-            database_manager.save_document_text("") # 문서 텍스트도 초기화 (새로 추가)
             st.rerun()
@@ -1,7 +1,7 @@
 # modules/trend_analysis_page.py
 
 import streamlit as st
-from datetime import datetime, timedelta
+from datetime import datetime
 import time
 import re
 import os
@@ -13,14 +13,53 @@ import streamlit.components.v1 as components
 import altair as alt # Altair 임포트
 
 # --- 모듈 임포트 (경로 조정) ---
-from modules import ai_service
+from modules import ai_metrics
 from modules import database_manager
-from modules import news_crawler
-from modules import trend_analyzer
 from modules import data_exporter
 from modules import email_sender
+from modules import job_runner
+from modules import pipeline
 # from modules import report_automation_page # 이 페이지에서는 직접 임포트하지 않습니다. main_app에서 라우팅합니다.
 
+# --- 백그라운드 트렌드 분석 작업 (modules/job_runner.py) ---
+TREND_JOB_KIND = "trend_analysis"
+TREND_JOB_POLL_SECONDS = float(os.getenv("TREND_JOB_POLL_SECONDS", "1.0")) # 진행 중 작업 상태 조회 간격
+# 제출한 작업 ID를 주소(URL)의 쿼리 파라미터에도 저장합니다. 새로고침하면 세션 상태가 비워지므로 이 값으로 작업을 다시 찾습니다.
+TREND_JOB_QUERY_PARAM = "trend_job"
+# 작업 결과 중 세션 상태로 옮겨 표시하는 키
+TREND_JOB_RESULT_KEYS = (
+    "trending_keywords_data", "displayed_keywords", "final_collected_articles",
+    "ai_trend_summary", "ai_insurance_info", "formatted_trend_summary", "formatted_insurance_info",
+    "prettified_report_for_download", "ai_call_metrics_summary",
+)
+
+def run_trend_analysis_job(params: dict, job) -> dict:
+    """
+    트렌드 분석 파이프라인(modules/pipeline.py)을 실행하고 결과를 세션 상태 키(TREND_JOB_RESULT_KEYS) 형식으로 반환합니다.
+    job_runner 작업 스레드에서 실행되므로 Streamlit을 호출하지 않고 job.progress / job.note로만 상황을 알립니다.
+    params: pipeline.TrendParams.to_dict() 형식
+    """
+    ai_run = ai_metrics.start_run("trend_analysis") # 이번 분석의 AI 호출을 호출 지점별로 계측
+    try:
+        result = pipeline.run_trend_pipeline(pipeline.TrendParams(**params), os.getenv("POTENS_API_KEY"), reporter=job)
+    finally:
+        ai_call_metrics_summary = ai_metrics.finish_run(ai_run)
+    insights = result.insights
+    return {
+        "trending_keywords_data": result.trending_keywords,
+        "displayed_keywords": result.selected_keywords,
+        "final_collected_articles": result.summarized_articles,
+        "ai_trend_summary": insights.trend_summary if insights else "",
+        "ai_insurance_info": insights.insurance_info if insights else "",
+        "formatted_trend_summary": insights.formatted_trend_summary if insights else "",
+        "formatted_insurance_info": insights.formatted_insurance_info if insights else "",
+        "prettified_report_for_download": result.report,
+        "ai_call_metrics_summary": ai_call_metrics_summary,
+        "stage_seconds": result.stage_seconds,
+    }
+
+job_runner.register_handler(TREND_JOB_KIND, run_trend_analysis_job)
+
 # --- 페이지 함수 정의 ---
 def trend_analysis_page():
     """
@@ -107,6 +146,8 @@ def trend_analysis_page():
             st.session_state['email_status_message'] = ""
         if 'email_status_type' not in st.session_state:
             st.session_state['email_status_type'] = ""
+        if 'ai_call_metrics_summary' not in st.session_state: # 마지막 실행의 호출 지점별 AI 계측 요약
+            st.session_state['ai_call_metrics_summary'] = []
         # 검색 프리셋 관련 세션 상태 (프리셋으로 용어 변경)
         if 'search_presets' not in st.session_state:
             st.session_state['search_presets'] = database_manager.get_search_profiles() # DB 함수명은 유지
@@ -114,6 +155,15 @@ def trend_analysis_page():
             st.session_state['selected_preset_id'] = None
         if 'recipient_emails_input' not in st.session_state: # 이메일 입력 필드 상태
             st.session_state['recipient_emails_input'] = ""
+        # 백그라운드 트렌드 분석 작업 (modules/job_runner.py)
+        if 'trend_job_id' not in st.session_state: # 이 브라우저 주소에서 제출한 작업 ID (새로고침 시 쿼리 파라미터에서 복원)
+            restored_job_id = st.query_params.get(TREND_JOB_QUERY_PARAM)
+            restored_job = job_runner.get_job(restored_job_id) if restored_job_id else None
+            st.session_state['trend_job_id'] = restored_job['id'] if restored_job and restored_job['kind'] == TREND_JOB_KIND else None
+        if 'trend_job_loaded_id' not in st.session_state: # 결과를 세션 상태로 옮긴 작업 ID
+            st.session_state['trend_job_loaded_id'] = None
+        if 'trend_job_notes' not in st.session_state: # 작업 중 발생한 경고/오류 알림
+            st.session_state['trend_job_notes'] = []
 
 
         # --- UI 레이아웃: 검색 조건 (좌) & 키워드 트렌드 결과 (우) ---
@@ -237,298 +287,60 @@ def trend_analysis_page():
             status_message_placeholder = st.empty()
             chart_placeholder = st.empty() # 막대 그래프를 위한 플레이스홀더
 
-            if submitted:
-                # 새로운 검색 요청 시 기존 상태 초기화
-                st.session_state['trending_keywords_data'] = []
-                st.session_state['displayed_keywords'] = []
-                st.session_state['final_collected_articles'] = []
-                st.session_state['ai_insights_summary'] = ""
-                st.session_state['ai_trend_summary'] = ""
-                st.session_state['ai_insurance_info'] = ""
-                st.session_state['prettified_report_for_download'] = ""
-                st.session_state['formatted_trend_summary'] = ""
-                st.session_state['formatted_insurance_info'] = ""
-                st.session_state['email_status_message'] = ""
-                st.session_state['email_status_type'] = ""
-
-                table_placeholder.empty()
-                my_bar = status_message_placeholder.progress(0, text="데이터 수집 및 분석 진행 중...")
-                status_message_placeholder.info("네이버 뉴스 메타데이터 수집 중...")
+            # --- 백그라운드 분석 작업 상태 조회 (이 브라우저 주소에서 제출한 작업만 표시) ---
+            trend_job = job_runner.get_job(st.session_state['trend_job_id']) if st.session_state['trend_job_id'] else None
+            trend_job_running = trend_job is not None and not trend_job['finished']
+            st.session_state['submitted_flag'] = trend_job_running
 
+            if submitted:
                 if recent_trend_days >= total_search_days:
                     status_message_placeholder.error("오류: 최근 트렌드 분석 기간은 총 검색 기간보다 짧아야 합니다.")
+                elif trend_job_running:
+                    status_message_placeholder.warning("이미 트렌드 분석이 진행 중입니다. 완료된 뒤 다시 실행해주세요.")
                 else:
-                    all_collected_news_metadata = []
-
-                    today_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-                    search_start_date = today_date - timedelta(days=total_search_days - 1)
-
-                    total_expected_articles = total_search_days * max_naver_search_pages_per_day * 10
-                    processed_article_count = 0
-
-
-                    for i in range(total_search_days):
-                        current_search_date = search_start_date + timedelta(days=i)
-                        formatted_search_date = current_search_date.strftime('%Y-%m-%d')
-
-                        daily_articles = news_crawler.crawl_naver_news_metadata(
-                            keyword,
-                            current_search_date,
-                            max_naver_search_pages_per_day
-                        )
-
-                        for article in daily_articles:
-                            processed_article_count += 1
-                            progress_percentage = processed_article_count / total_expected_articles
-                            my_bar.progress(min(progress_percentage, 1.0), text=f"뉴스 메타데이터 수집 중... ({formatted_search_date}, {processed_article_count}개 기사 처리 완료)")
-
-
-                            article_data_for_db = {
-                                "제목": article["제목"],
-                                "링크": article["링크"],
-                                "날짜": article["날짜"].strftime('%Y-%m-%d'),
-                                "내용": article["내용"]
-                            }
-                            database_manager.insert_article(article_data_for_db)
-
-                            all_collected_news_metadata.append(article)
-
-                    my_bar.empty()
-                    status_message_placeholder.success(f"총 {len(all_collected_news_metadata)}개의 뉴스 메타데이터를 수집했습니다.")
-
-                    # --- 2. 키워드 트렌드 분석 실행 ---
-                    status_message_placeholder.info("키워드 트렌드 분석 중...")
-                    with st.spinner("키워드 트렌드 분석 중..."):
-                        trending_keywords_data = trend_analyzer.analyze_keyword_trends(
-                            all_collected_news_metadata,
-                            recent_days_period=recent_trend_days,
-                            total_days_period=total_search_days
-                        )
-                    st.session_state['trending_keywords_data'] = trending_keywords_data
-
-                    if trending_keywords_data:
-                        # --- AI가 보험 개발자 관점에서 유의미한 키워드 선별 ---
-                        relevant_keywords_from_ai_raw = []
-                        with st.spinner("AI가 보험 개발자 관점에서 유의미한 키워드를 선별 중..."):
-                            relevant_keywords_from_ai_raw = ai_service.get_relevant_keywords(
-                                trending_keywords_data,
-                                "차량보험사의 보험개발자",
-                                POTENS_API_KEY
-                            )
-
-                        filtered_trending_keywords = []
-                        if relevant_keywords_from_ai_raw:
-                            filtered_trending_keywords = [
-                                kw_data for kw_data in trending_keywords_data
-                                if kw_data['keyword'] in relevant_keywords_from_ai_raw
-                            ]
-                            filtered_trending_keywords = sorted(filtered_trending_keywords, key=lambda x: x['recent_freq'], reverse=True)
-
-                            status_message_placeholder.info(f"AI가 선별한 보험 개발자 관점의 유의미한 키워드 ({len(filtered_trending_keywords)}개): {[kw['keyword'] for kw in filtered_trending_keywords]}")
-                        else:
-                            status_message_placeholder.warning("AI가 보험 개발자 관점에서 유의미한 키워드를 선별하지 못했습니다. 모든 트렌드 키워드를 표시합니다.")
-                            filtered_trending_keywords = trending_keywords_data
-
-                        top_3_relevant_keywords = filtered_trending_keywords[:3]
-                        st.session_state['displayed_keywords'] = top_3_relevant_keywords
-
-                        if top_3_relevant_keywords:
-                            pass
-                        else:
-                            status_message_placeholder.info("보험 개발자 관점에서 유의미한 트렌드 키워드가 식별되지 않습니다.")
-
-
-                        # --- 3. 트렌드 기사 본문 요약 (Potens.dev AI 활용) ---
-                        status_message_placeholder.info("트렌드 기사 본문 요약 중 (Potens.dev AI 호출)...")
-
-                        recent_trending_articles_candidates = [
-                            article for article in all_collected_news_metadata
-                            if article.get("날짜") and today_date - timedelta(days=recent_trend_days) <= article["날짜"]
-                        ]
-
-                        processed_links = set()
-
-                        articles_for_ai_summary = []
-                        for article in recent_trending_articles_candidates:
-                            text_for_trend_check = article["제목"] + " " + article.get("내용", "")
-                            article_keywords_for_trend = trend_analyzer.extract_keywords_from_text(text_for_trend_check)
-
-                            if any(trend_kw['keyword'] in article_keywords_for_trend for trend_kw in top_3_relevant_keywords):
-                                articles_for_ai_summary.append(article)
-
-                        total_ai_articles_to_process = len(articles_for_ai_summary)
-
-                        if total_ai_articles_to_process == 0:
-                            status_message_placeholder.info("선별된 트렌드 키워드를 포함하는 최근 기사가 없거나, AI 요약 대상 기사가 없습니다.")
-                        else:
-                            ai_progress_bar = st.progress(0, text=f"AI가 트렌드 기사를 요약 중... (0/{total_ai_articles_to_process} 완료)")
-                            ai_processed_count = 0
-
-                            temp_collected_articles = []
-                            for article in articles_for_ai_summary:
-                                if article["링크"] in processed_links:
-                                    continue
-
-                                article_date_str = article["날짜"].strftime('%Y-%m-%d')
-
-                                ai_processed_content = ai_service.get_article_summary(
-                                    article["제목"],
-                                    article["링크"],
-                                    article_date_str,
-                                    article["내용"],
-                                    POTENS_API_KEY,
-                                    max_attempts=2
-                                )
-
-                                final_content = ""
-                                if ai_processed_content.startswith("Potens.dev AI 호출 최종 실패") or \
-                                   ai_processed_content.startswith("Potens.dev AI 호출에서 유효한 응답을 받지 못했습니다."):
-                                    final_content = f"본문 요약 실패 (AI 오류): {ai_processed_content}"
-                                    status_message_placeholder.error(f"AI 요약 실패: {final_content}")
-                                else:
-                                    final_content = ai_service.clean_ai_response_text(ai_processed_content)
-
-                                temp_collected_articles.append({
-                                    "제목": article["제목"],
-                                    "링크": article["링크"],
-                                    "날짜": article_date_str,
-                                    "내용": final_content
-                                })
-                                processed_links.add(article["링크"])
-                                time.sleep(0.1)
-
-                            ai_progress_bar.empty()
-                            st.session_state['final_collected_articles'] = temp_collected_articles
-
-                            if st.session_state['final_collected_articles']:
-                                status_message_placeholder.success(f"총 {len(st.session_state['final_collected_articles'])}개의 트렌드 기사 요약을 완료했습니다.")
-
-                                # --- 4. AI가 트렌드 요약 및 보험 상품 개발 인사이트 도출 (분리된 호출) ---
-                                status_message_placeholder.info("AI가 트렌드 요약 및 보험 상품 개발 인사이트를 도출 중 (분리된 호출)...")
-
-                                articles_for_ai_insight_generation = st.session_state['final_collected_articles']
-
-                                with st.spinner("AI가 뉴스 트렌드를 요약 중..."):
-                                    trend_summary = ai_service.get_overall_trend_summary(
-                                        articles_for_ai_insight_generation,
-                                        POTENS_API_KEY
-                                    )
-                                    st.session_state['ai_trend_summary'] = ai_service.clean_ai_response_text(trend_summary)
-                                    if st.session_state['ai_trend_summary'].startswith("요약된 기사가 없어") or \
-                                       st.session_state['ai_trend_summary'].startswith("Potens.dev AI 호출 최종 실패") or \
-                                       st.session_state['ai_trend_summary'].startswith("Potens.dev AI 호출에서 유효한 응답을 받지 못했습니다."):
-                                        status_message_placeholder.error(f"AI 트렌드 요약 실패: {st.session_state['ai_trend_summary']}")
-                                    else:
-                                        st.session_state['ai_trend_summary_ok'] = True # 성공 플래그
-                                        status_message_placeholder.success("AI 뉴스 트렌드 요약 완료!")
-                                    time.sleep(1)
-
-                                with st.spinner("AI가 자동차 보험 산업 관련 정보를 분석 중..."):
-                                    insurance_info = ai_service.get_insurance_implications_from_ai(
-                                        st.session_state['ai_trend_summary'],
-                                        POTENS_API_KEY
-                                    )
-                                    st.session_state['ai_insurance_info'] = ai_service.clean_ai_response_text(insurance_info)
-                                    if st.session_state['ai_insurance_info'].startswith("요약된 기사가 없어") or \
-                                       st.session_state['ai_insurance_info'].startswith("Potens.dev AI 호출 최종 실패") or \
-                                       st.session_state['ai_insurance_info'].startswith("Potens.dev AI 호출에서 유효한 응답을 받지 못했습니다.") or \
-                                       st.session_state['ai_insurance_info'].startswith("트렌드 요약문이 없어"):
-                                        status_message_placeholder.error(f"AI 자동차 보험 산업 관련 정보 분석 실패: {st.session_state['ai_insurance_info']}")
-                                    else:
-                                        st.session_state['ai_insurance_info_ok'] = True # 성공 플래그
-                                        status_message_placeholder.success("AI 자동차 보험 산업 관련 정보 분석 완료!")
-                                    time.sleep(1)
-
-                                # --- 5. AI가 각 섹션별로 포맷팅 (부하 분산) ---
-                                with st.spinner("AI가 뉴스 트렌드 요약 보고서를 포맷팅 중..."):
-                                    formatted_trend_summary = ai_service.format_text_with_markdown(
-                                        st.session_state['ai_trend_summary'],
-                                        POTENS_API_KEY
-                                    )
-                                    st.session_state['formatted_trend_summary'] = formatted_trend_summary
-                                    if formatted_trend_summary.startswith("AI를 통한 보고서 포맷팅 실패"):
-                                        status_message_placeholder.warning("AI 뉴스 트렌드 요약 포맷팅에 실패했습니다. 원본 텍스트가 사용됩니다.")
-                                        st.session_state['formatted_trend_summary'] = st.session_state['ai_trend_summary']
-                                    else:
-                                        status_message_placeholder.success("AI 뉴스 트렌드 요약 보고서 포맷팅 완료!")
-                                    time.sleep(1)
-
-                                with st.spinner("AI가 자동차 보험 산업 관련 정보 보고서를 포맷팅 중..."):
-                                    formatted_insurance_info = ai_service.format_text_with_markdown(
-                                        st.session_state['ai_insurance_info'],
-                                        POTENS_API_KEY
-                                    )
-                                    st.session_state['formatted_insurance_info'] = formatted_insurance_info
-                                    if formatted_insurance_info.startswith("AI를 통한 보고서 포맷팅 실패"):
-                                        status_message_placeholder.warning("AI 자동차 보험 산업 관련 정보 포맷팅에 실패했습니다. 원본 텍스트가 사용됩니다.")
-                                        st.session_state['formatted_insurance_info'] = st.session_state['ai_insurance_info']
-                                    else:
-                                        st.session_state['formatted_insurance_info_ok'] = True # 성공 플래그
-                                        status_message_placeholder.success("AI 자동차 보험 산업 관련 정보 분석 완료!")
-                                    time.sleep(1)
-
-                                # --- 6. 최종 보고서 결합 (AI 포맷팅 + 직접 구성 부록) ---
-                                final_prettified_report = ""
-                                final_prettified_report += "# 뉴스 트렌드 분석 및 보험 상품 개발 인사이트\n\n"
-                                final_prettified_report += "## 개요\n\n"
-                                final_prettified_report += "이 보고서는 최근 뉴스 트렌드를 분석하고, 이를 바탕으로 자동차 보험 상품 개발에 필요한 주요 인사이트를 제공합니다.\n\n"
-
-                                if st.session_state['formatted_trend_summary']:
-                                    final_prettified_report += "## 뉴스 트렌드 요약\n"
-                                    final_prettified_report += st.session_state['formatted_trend_summary'] + "\n\n"
-                                else:
-                                    final_prettified_report += "## 뉴스 트렌드 요약 (생성 실패)\n"
-                                    final_prettified_report += st.session_state['ai_trend_summary'] + "\n\n"
-
-                                if st.session_state['formatted_insurance_info']:
-                                    final_prettified_report += "## 자동차 보험 산업 관련 주요 사실 및 법적 책임\n"
-                                    final_prettified_report += st.session_state['formatted_insurance_info'] + "\n\n"
-                                else:
-                                    final_prettified_report += "## 자동차 보험 산업 관련 주요 사실 및 법적 책임 (생성 실패)\
-                                    \n"
-                                    final_prettified_report += st.session_state['ai_insurance_info'] + "\n\n"
-
-                                # --- 부록 섹션 추가 (AI 포맷팅 없이 직접 구성) ---
-                                final_prettified_report += "---\n\n"
-                                final_prettified_report += "## 부록\n\n"
-
-                                final_prettified_report += "### 키워드 산출 근거\n"
-                                if st.session_state['displayed_keywords']:
-                                    for kw_data in st.session_state['displayed_keywords']:
-                                        surge_ratio_display = (f'''{kw_data.get('surge_ratio'):.2f}x''' if kw_data.get('surge_ratio') != float('inf') else '새로운 트렌드')
-                                        final_prettified_report += (
-                                            f"- **키워드**: {kw_data['keyword']}\n"
-                                            f"  - 최근 언급량: {kw_data['recent_freq']}회\n"
-                                            f"  - 이전 언급량: {kw_data['past_freq']}회\n"
-                                            f"  - 증가율: {surge_ratio_display}\n\n"
-                                        )
-                                else:
-                                    final_prettified_report += "키워드 산출 근거 데이터가 없습니다.\n\n"
-
-                                final_prettified_report += "### 반영된 기사 리스트\n"
-                                if temp_collected_articles:
-                                    for i, article in enumerate(temp_collected_articles):
-                                        final_prettified_report += (
-                                            f"{i+1}. **제목**: {article['제목']}\n"
-                                            f"   **날짜**: {article['날짜']}\n"
-                                            f"   **링크**: {article['링크']}\n"
-                                            f"   **요약 내용**: {article['내용'][:150]}...\n\n"
-                                        )
-                                else:
-                                    final_prettified_report += "반영된 기사 리스트가 없습니다.\n\n"
-
-                                st.session_state['prettified_report_for_download'] = final_prettified_report
-
-
-                            else:
-                                status_message_placeholder.info("선별된 트렌드 키워드를 포함하는 기사가 없거나, AI 요약에 실패했습니다.")
-
-                    else:
-                        status_message_placeholder.info("선택된 기간 내에 유의미한 트렌드 키워드가 없습니다.")
-
-                st.session_state['submitted_flag'] = False
-                st.session_state['analysis_completed'] = True
-                st.rerun()
+                    # 새로운 검색 요청 시 기존 상태 초기화
+                    st.session_state['trending_keywords_data'] = []
+                    st.session_state['displayed_keywords'] = []
+                    st.session_state['final_collected_articles'] = []
+                    st.session_state['ai_insights_summary'] = ""
+                    st.session_state['ai_trend_summary'] = ""
+                    st.session_state['ai_insurance_info'] = ""
+                    st.session_state['prettified_report_for_download'] = ""
+                    st.session_state['formatted_trend_summary'] = ""
+                    st.session_state['formatted_insurance_info'] = ""
+                    st.session_state['email_status_message'] = ""
+                    st.session_state['email_status_type'] = ""
+                    st.session_state['ai_call_metrics_summary'] = []
+                    st.session_state['trend_job_notes'] = []
+                    st.session_state['analysis_completed'] = False
+                    st.session_state['trend_job_loaded_id'] = None
+                    st.session_state['trend_job_id'] = job_runner.submit_job(TREND_JOB_KIND, {
+                        "keyword": keyword,
+                        "total_search_days": total_search_days,
+                        "recent_trend_days": recent_trend_days,
+                        "max_naver_search_pages_per_day": max_naver_search_pages_per_day,
+                    })
+                    st.query_params[TREND_JOB_QUERY_PARAM] = st.session_state['trend_job_id']
+                    st.rerun()
+
+            if trend_job is not None:
+                if trend_job_running:
+                    table_placeholder.empty()
+                    stage_label = pipeline.STAGE_LABELS.get(trend_job['stage'], "작업 대기")
+                    status_message_placeholder.progress(
+                        trend_job['progress'],
+                        text=f"[{stage_label}] {trend_job['message'] or '데이터 수집 및 분석 진행 중...'}"
+                    )
+                    st.caption("분석은 백그라운드에서 진행됩니다. 다른 페이지로 이동하거나 새로고침해도 진행 상황과 결과를 다시 볼 수 있습니다.")
+                elif trend_job['status'] == job_runner.JOB_FAILED:
+                    st.error(f"🚨 트렌드 분석 작업이 실패했습니다: {trend_job['error']}")
+                elif st.session_state['trend_job_loaded_id'] != trend_job['id']:
+                    # 완료된 작업 결과를 세션 상태로 옮겨 기존 결과 표시/다운로드 흐름을 그대로 사용
+                    for result_key in TREND_JOB_RESULT_KEYS:
+                        st.session_state[result_key] = trend_job['result'].get(result_key, st.session_state[result_key])
+                    st.session_state['trend_job_notes'] = trend_job['result'].get('notes', [])
+                    st.session_state['analysis_completed'] = True
+                    st.session_state['trend_job_loaded_id'] = trend_job['id']
 
             # --- 결과가 이미 세션 상태에 있는 경우 표시 ---
             if not st.session_state.get('submitted_flag', False) and \
@@ -597,6 +409,14 @@ def trend_analysis_page():
                     chart_placeholder.altair_chart(chart, use_container_width=True)
                     st.markdown("---") # 차트 아래 구분선 추가
 
+                    for note in st.session_state['trend_job_notes']:
+                        if note['type'] in ("warning", "error"):
+                            getattr(st, note['type'])(note['text'])
+
+                    if st.session_state['ai_call_metrics_summary']:
+                        with st.expander("⏱️ AI 호출 성능 요약 (호출 지점별)"):
+                            st.dataframe(pd.DataFrame(st.session_state['ai_call_metrics_summary']), use_container_width=True, hide_index=True)
+
                     if st.session_state['final_collected_articles']:
                         status_message_placeholder.success(
                             f"총 {len(st.session_state['final_collected_articles'])}개의 트렌드 기사 요약을 완료했습니다. "
@@ -842,7 +662,16 @@ def trend_analysis_page():
                 st.session_state['formatted_insurance_info'] = ""
                 st.session_state['email_status_message'] = ""
                 st.session_state['email_status_type'] = ""
+                st.session_state['trend_job_id'] = None
+                st.query_params.pop(TREND_JOB_QUERY_PARAM, None)
+                st.session_state['trend_job_loaded_id'] = None
+                st.session_state['trend_job_notes'] = []
                 st.session_state['search_profiles'] = database_manager.get_search_profiles() # 프로필 목록 새로고침
                 st.session_state['scheduled_task'] = database_manager.get_scheduled_task() # 예약 정보 새로고침
                 database_manager.save_generated_endorsement("") # 데이터베이스 특약도 초기화 (새로 추가)
                 st.rerun()
+
+        # --- 백그라운드 분석 작업이 진행 중이면 잠시 후 다시 실행하여 진행률 갱신 ---
+        if trend_job_running:
+            time.sleep(TREND_JOB_POLL_SECONDS)
+            st.rerun()
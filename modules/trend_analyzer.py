@@ -3,8 +3,6 @@
 import re
 from collections import Counter
 from datetime import datetime, timedelta
-import streamlit as st # Streamlit의 st.warning 등을 사용하기 위해 임시로 import.
-                        # 실제 프로덕션에서는 이 로깅 부분을 다른 방식으로 처리하는 것이 좋습니다.
 
 def extract_keywords_from_text(text: str) -> list[str]:
     """
@@ -44,6 +42,8 @@ def analyze_keyword_trends(articles_metadata: list[dict], recent_days_period: in
         article_date = article.get("날짜")
         if not isinstance(article_date, datetime):
             # 날짜 파싱 실패한 경우, 오늘 날짜로 간주하여 처리 (정확도 낮음)
+            # Streamlit의 st.warning을 사용하기 위해 필요할 때만 import (CLI/벤치마크에서는 streamlit 불필요)
+            import streamlit as st
             st.warning(f"경고: '{article['제목']}' 기사의 날짜 파싱 실패. 오늘 날짜로 간주하여 분석에 포함합니다.")
             article_date = today
 
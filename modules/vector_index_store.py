@@ -0,0 +1,234 @@
+# modules/vector_index_store.py
+# 디스크 기반 FAISS 인덱스 저장소입니다.
+# 업로드 파일 바이트의 SHA-256과 청크 분할/임베딩 파라미터로 캐시 키를 만들고,
+# 같은 문서 묶음을 다시 처리하면 (새 세션이어도) 임베딩 없이 저장된 인덱스와 문서를 불러옵니다.
+# 저장소 전체 크기가 한도를 넘으면 가장 오래 사용하지 않은 인덱스부터 삭제합니다 (LRU).
+#
+# 디렉터리 구조: <VECTOR_INDEX_STORE_DIR>/<캐시 키>/
+#   index.faiss, index.pkl  - FAISS.save_local 결과 (인덱스 + docstore)
+#   full_text.txt           - 문서 전체 원문 (특약 생성/DB 저장용, 페이지 배치 단위로 이어 씀)
+#   meta.json               - [파일명, SHA-256] 목록, 파라미터, 청크 수, 생성 시각
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+from loguru import logger
+
+from langchain.vectorstores import FAISS
+
+from modules import document_processor
+
+VECTOR_INDEX_STORE_DIR = os.getenv("VECTOR_INDEX_STORE_DIR", "vector_index_store")
+VECTOR_INDEX_STORE_MAX_BYTES = int(float(os.getenv("VECTOR_INDEX_STORE_MAX_MB", "2048")) * 1024 * 1024)
+
+META_FILE = "meta.json"
+
+# 저장/삭제가 겹치지 않도록 프로세스 내에서 직렬화합니다 (조회는 잠금 없이 진행).
+_store_lock = threading.Lock()
+
+
+def index_params() -> dict:
+    """캐시 키에 포함되는 파라미터. 이 값이 바뀌면 기존 인덱스는 재사용되지 않습니다."""
+    return {
+        "chunk_size": document_processor.CHUNK_SIZE,
+        "chunk_overlap": document_processor.CHUNK_OVERLAP,
+        "chunker": document_processor.CHUNKER,
+        "tiktoken_encoding": document_processor.TIKTOKEN_ENCODING,
+        "embedding_model": document_processor.EMBEDDING_MODEL_NAME,
+        # nprobe는 검색 시점 파라미터라 불러올 때 다시 적용하므로 키에서 제외
+        "faiss_index": {k: v for k, v in document_processor.faiss_index_config().items() if k != "nprobe"},
+    }
+
+
+def file_entries(files: list[tuple[str, bytes]]) -> list[list[str]]:
+    """(파일명, 파일 바이트) 목록 → 정렬된 [파일명, 바이트 SHA-256] 목록."""
+    return sorted([name, hashlib.sha256(data).hexdigest()] for name, data in files)
+
+
+def document_set_key(files: list[tuple[str, bytes]]) -> str:
+    """(파일명, 파일 바이트) 목록의 캐시 키. 업로드 순서와 무관하게 같은 문서 묶음이면 같은 키를 반환합니다."""
+    return _key_for_entries(file_entries(files))
+
+
+def _key_for_entries(entries: list[list[str]]) -> str:
+    payload = json.dumps({"files": entries, "params": index_params()}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _index_dir(key: str) -> str:
+    return os.path.join(VECTOR_INDEX_STORE_DIR, key)
+
+
+def _load_faiss(path: str):
+    try:
+        return FAISS.load_local(path, document_processor.get_embeddings(), allow_dangerous_deserialization=True)
+    except TypeError:
+        # allow_dangerous_deserialization 인자가 없는 이전 langchain 버전
+        return FAISS.load_local(path, document_processor.get_embeddings())
+
+
+def load_index(key: str):
+    """저장된 인덱스를 불러옵니다. 없거나 손상된 경우 None."""
+    path = _index_dir(key)
+    if not os.path.isfile(os.path.join(path, META_FILE)):
+        return None
+    try:
+        vectordb = _load_faiss(path)
+        document_processor.apply_search_params(vectordb.index, document_processor.faiss_index_config())
+    except Exception as e:
+        logger.warning(f"저장된 벡터 인덱스를 불러오지 못해 다시 생성합니다 ({key[:12]}): {e}")
+        with _store_lock:
+            shutil.rmtree(path, ignore_errors=True)
+        return None
+    os.utime(path) # LRU 기준 시각 갱신
+    return vectordb
+
+
+def _new_tmp_dir(key: str) -> str:
+    os.makedirs(VECTOR_INDEX_STORE_DIR, exist_ok=True)
+    tmp_path = os.path.join(VECTOR_INDEX_STORE_DIR, f".tmp-{key[:12]}-{uuid.uuid4().hex[:8]}")
+    os.makedirs(tmp_path)
+    return tmp_path
+
+
+def save_index(key: str, tmp_path: str, vectordb, entries: list[list[str]]) -> bool:
+    """
+    임시 디렉터리에 인덱스와 메타데이터를 저장한 뒤 이름을 바꿔 원자적으로 등록하고,
+    크기 한도를 넘으면 오래된 인덱스를 정리합니다. 저장 여부를 반환합니다.
+    """
+    try:
+        vectordb.save_local(tmp_path)
+        with open(os.path.join(tmp_path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({
+                "files": entries,
+                "params": index_params(),
+                "chunk_count": vectordb.index.ntotal,
+                "created_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            }, f, ensure_ascii=False, indent=2)
+        with _store_lock:
+            if os.path.exists(_index_dir(key)): # 다른 세션이 같은 문서를 먼저 저장한 경우
+                shutil.rmtree(tmp_path, ignore_errors=True)
+            else:
+                os.replace(tmp_path, _index_dir(key))
+            evict_to_limit(keep_key=key)
+        return True
+    except Exception as e:
+        logger.error(f"벡터 인덱스 저장 실패 ({key[:12]}): {e}", exc_info=True)
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        return False
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def list_indexes() -> list[dict]:
+    """저장된 인덱스 목록 (최근 사용 순)."""
+    if not os.path.isdir(VECTOR_INDEX_STORE_DIR):
+        return []
+    entries = []
+    for key in os.listdir(VECTOR_INDEX_STORE_DIR):
+        path = _index_dir(key)
+        if key.startswith(".") or not os.path.isdir(path):
+            continue
+        entries.append({"key": key, "size_bytes": _dir_size(path), "last_used": os.path.getmtime(path)})
+    entries.sort(key=lambda entry: entry["last_used"], reverse=True)
+    return entries
+
+
+def evict_to_limit(max_bytes: int | None = None, keep_key: str | None = None) -> int:
+    """저장소 전체 크기가 max_bytes 이하가 될 때까지 가장 오래 사용하지 않은 인덱스를 삭제합니다. 삭제한 개수를 반환합니다."""
+    max_bytes = VECTOR_INDEX_STORE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = list_indexes()
+    total = sum(entry["size_bytes"] for entry in entries)
+    evicted = 0
+    for entry in reversed(entries): # 오래된 것부터
+        if total <= max_bytes:
+            break
+        if entry["key"] == keep_key:
+            continue
+        shutil.rmtree(_index_dir(entry["key"]), ignore_errors=True)
+        total -= entry["size_bytes"]
+        evicted += 1
+        logger.info(f"벡터 인덱스 저장소 한도 초과로 삭제: {entry['key'][:12]} ({document_processor.format_megabytes(entry['size_bytes'])})")
+    return evicted
+
+
+def find_base_index(entries: list[list[str]]):
+    """
+    현재 문서 묶음의 부분집합인 저장 인덱스 중 파일이 가장 많은 것을 찾습니다 (문서 추가 시 증분 처리용).
+    반환: (키, 저장된 파일 목록) 또는 None
+    """
+    current = {tuple(entry) for entry in entries}
+    best = None
+    for entry in list_indexes():
+        try:
+            with open(os.path.join(_index_dir(entry["key"]), META_FILE), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        stored = {tuple(e) for e in meta.get("files", []) if isinstance(e, list)}
+        if (stored and stored < current and meta.get("params") == index_params()
+                and (best is None or len(stored) > len(best[1]))):
+            best = (entry["key"], stored)
+    return best
+
+
+def get_or_build_vectorstore(files, progress_callback=None, reports: list[dict] | None = None):
+    """
+    업로드된 파일(Streamlit UploadedFile 목록)의 벡터 DB를 반환합니다.
+    같은 문서 묶음의 인덱스가 저장되어 있으면 불러옵니다.
+    기존 묶음에 파일이 추가된 경우 저장된 인덱스를 불러와 새 파일의 청크만 임베딩해 add_embeddings로 확장하고,
+    그 외에는 페이지 배치 단위로 텍스트 추출 → 청크 분할 → 임베딩(청크 임베딩 캐시 사용)한 뒤 저장합니다.
+    progress_callback(완료 수, 전체 수, 초당 청크 수)은 새로 임베딩하는 청크가 있을 때 배치마다 호출됩니다.
+    reports 목록을 넘기면 새로 읽은 파일별 보고(document_processor.iter_page_batches 참고)를 추가합니다.
+    반환: (vectordb, cache_hit)
+    추출된 텍스트가 없으면 ValueError를 발생시킵니다.
+    """
+    start = time.perf_counter()
+    file_bytes = [(f.name, f.getvalue()) for f in files]
+    entries = file_entries(file_bytes)
+    key = _key_for_entries(entries)
+
+    cached = load_index(key)
+    if cached is not None:
+        logger.info(f"저장된 벡터 인덱스 사용: {key[:12]} ({time.perf_counter() - start:.2f}초)")
+        return cached, True
+
+    tmp_path = _new_tmp_dir(key)
+    base = find_base_index(entries)
+    base_loaded = load_index(base[0]) if base else None
+    try:
+        if base_loaded is not None:
+            vectordb = base_loaded
+            new_files = [f for f, (name, data) in zip(files, file_bytes)
+                         if (name, hashlib.sha256(data).hexdigest()) not in base[1]]
+            logger.info(f"저장된 인덱스({base[0][:12]})에 {len(new_files)}개 파일 추가")
+        else:
+            vectordb, new_files = None, files
+
+        vectordb, chunk_count = document_processor.build_vectorstore_streaming(
+            document_processor.iter_page_batches(new_files, reports=reports), vectordb, progress_callback
+        )
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    if vectordb is None:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise ValueError("업로드된 문서에서 텍스트를 추출하지 못했습니다.")
+
+    save_index(key, tmp_path, vectordb, entries) # 저장에 실패해도 벡터 DB는 이번 세션에서 그대로 사용
+    logger.info(f"벡터 인덱스 생성: {key[:12]} (신규 {chunk_count}개 청크, {time.perf_counter() - start:.1f}초)")
+    return vectordb, False
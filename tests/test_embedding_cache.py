@@ -0,0 +1,54 @@
+# tests/test_embedding_cache.py
+# 청크 임베딩 캐시의 크기 한도(LRU 압축)를 확인합니다.
+# 실행: python -m pytest tests (저장소 루트에서)
+
+import os
+
+import numpy as np
+import pytest
+
+from modules import embedding_cache
+
+DIM = 8
+ROW_BYTES = DIM * 2 # float16
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_cache, "LAST_USED_UPDATE_INTERVAL", 0.0)
+    return embedding_cache.EmbeddingCache("test-model", directory=str(tmp_path), max_bytes=100 * ROW_BYTES)
+
+
+def vectors(n, seed):
+    return np.random.default_rng(seed).random((n, DIM), dtype=np.float32)
+
+
+def test_compaction_keeps_recently_used_rows(cache, monkeypatch):
+    clock = iter(range(1, 1000))
+    monkeypatch.setattr(embedding_cache.time, "time", lambda: float(next(clock)))
+    old_texts, old_vectors = [f"old-{i}" for i in range(90)], vectors(90, 0)
+    cache.put_many(old_texts, old_vectors.tolist())
+    cache.get_many(old_texts[:10]) # 가장 최근 사용
+    new_texts, new_vectors = [f"new-{i}" for i in range(30)], vectors(30, 1)
+    cache.put_many(new_texts, new_vectors.tolist()) # 120행 > 한도 100행 → 80행으로 압축
+
+    stats = cache.stats()
+    assert stats["rows"] == int(100 * embedding_cache.EMBEDDING_CACHE_COMPACT_RATIO)
+    assert stats["size_bytes"] <= cache.max_bytes
+    assert sorted(os.listdir(cache.path)) == sorted([os.path.basename(cache.vectors_path), embedding_cache.INDEX_FILE])
+
+    # 압축 후에도 남은 행은 같은 벡터를 반환 (행 번호가 바뀌어도 색인 표가 함께 갱신됨)
+    kept = cache.get_many(old_texts[:10] + new_texts)
+    assert all(vector is not None for vector in kept)
+    np.testing.assert_allclose(np.array(kept), np.vstack([old_vectors[:10], new_vectors]), atol=1e-2)
+    # 사용하지 않은 가장 오래된 행이 먼저 삭제됨
+    assert cache.get_many(old_texts[10:50]) == [None] * 40
+
+
+def test_compacted_cache_reopens(cache, tmp_path):
+    texts, values = [f"t-{i}" for i in range(150)], vectors(150, 2)
+    cache.put_many(texts, values.tolist())
+    reopened = embedding_cache.EmbeddingCache("test-model", directory=str(tmp_path), max_bytes=cache.max_bytes)
+    assert reopened.vectors_path == cache.vectors_path
+    assert reopened.stats()["rows"] == cache.stats()["rows"]
+    assert reopened.get_many(texts[-1:])[0] is not None
@@ -0,0 +1,45 @@
+# tests/test_response_cleaner.py
+# 사전 컴파일/사전 필터 적용 클리너(ai_service)가 기존 구현과 바이트 단위로 동일한 결과를 내는지 골든 코퍼스로 확인합니다.
+# 기존 구현과 코퍼스 생성기는 benchmarks/bench_response_cleaner.py의 것을 그대로 사용합니다 (처리 시간 비교는 벤치마크에서).
+# 실행: python -m pytest tests (저장소 루트에서)
+
+import pytest
+
+from benchmarks.bench_response_cleaner import (
+    build_golden_corpus, reference_clean_ai_response_text, reference_clean_prettified_report_text,
+)
+from modules import ai_service
+
+GOLDEN_CASES = 3000
+
+CLEANERS = [
+    pytest.param(reference_clean_ai_response_text, ai_service.clean_ai_response_text, id="clean_ai_response_text"),
+    pytest.param(reference_clean_prettified_report_text, ai_service.clean_prettified_report_text, id="clean_prettified_report_text"),
+]
+
+
+@pytest.fixture(scope="module")
+def golden_corpus():
+    return build_golden_corpus(GOLDEN_CASES)
+
+
+@pytest.mark.parametrize("reference, optimized", CLEANERS)
+def test_golden_corpus_is_byte_identical(golden_corpus, reference, optimized):
+    mismatches = [text for text in golden_corpus if reference(text) != optimized(text)]
+    assert not mismatches, f"{len(mismatches)}건 불일치, 첫 사례: {mismatches[0]!r}"
+
+
+def test_preamble_patterns_apply_in_order():
+    # 서두 패턴을 하나의 alternation으로 합치지 않는 이유: '주요 내용'이 먼저 제거되어 뒤의 긴 패턴은 매칭되지 않음
+    text = "요약해 드리겠습니다. 주요 내용 요약: 본문"
+    assert ai_service.clean_ai_response_text(text) == reference_clean_ai_response_text(text) == "요약해 드리겠습니다. 요약: 본문"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("- **굵게** 와 *기울임* 그리고 snake_case_name", "굵게 와 기울임 그리고 snakecasename"),
+    ("단독 * 별표와 _밑줄", "단독 * 별표와 _밑줄"),
+    ("```json\n{\"a\": 1}\n```", "{\"a\": 1}"),
+    ("## 제목\n\n1. 첫째\n2. 둘째", "제목 첫째 둘째"),
+])
+def test_markdown_is_flattened(text, expected):
+    assert ai_service.clean_ai_response_text(text) == reference_clean_ai_response_text(text) == expected
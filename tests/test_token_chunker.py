@@ -0,0 +1,139 @@
+# tests/test_token_chunker.py
+# 토큰 위치 기반 청크 분할(document_processor.split_text_by_tokens)과 인덱스 저장소 캐시 키를 확인합니다.
+# tiktoken 인코딩 파일을 내려받지 않도록 문자 단위 토크나이저로 바꿔 실행합니다 (네트워크 불필요).
+# 실행: python -m pytest tests (저장소 루트에서)
+
+import json
+import os
+import re
+
+import pytest
+
+from modules import document_processor, vector_index_store
+
+
+class CharTokenizer:
+    """
+    앞 공백을 포함한 문자 하나를 토큰 하나로 취급하는 tiktoken 대용 (split_text_by_tokens가 쓰는 메서드만 구현).
+    토큰은 해당 문자열 조각이므로 decode_with_offsets에서 각 토큰의 시작 문자 위치를 바로 계산할 수 있습니다.
+    """
+    _TOKEN_RE = re.compile(r"\s*\S|\s+$")
+
+    def encode_ordinary(self, text):
+        return self._TOKEN_RE.findall(text)
+
+    def encode_ordinary_batch(self, texts, num_threads=8):
+        return [self.encode_ordinary(text) for text in texts]
+
+    def decode_with_offsets(self, tokens):
+        offsets, position = [], 0
+        for token in tokens:
+            offsets.append(position)
+            position += len(token)
+        return "".join(tokens), offsets
+
+
+@pytest.fixture
+def char_tokenizer(monkeypatch):
+    tokenizer = CharTokenizer()
+    monkeypatch.setattr(document_processor, "get_tokenizer", lambda: tokenizer)
+    return tokenizer
+
+
+def token_len(text):
+    return len(CharTokenizer().encode_ordinary(text))
+
+
+def build_policy_text(article_count=12):
+    """조(제목) + 항(①②③) + 문장으로 이루어진 약관 형식 텍스트."""
+    articles = []
+    for n in range(1, article_count + 1):
+        clauses = [f"{mark} 회사는 제{n}조의 사유로 손해가 생긴 경우 보험금을 지급합니다. 다만 고의로 생긴 손해는 보상하지 않습니다."
+                   for mark in "①②③"]
+        articles.append(f"제{n}조(보상하는 손해)\n" + "\n".join(clauses))
+    return "\n\n".join(articles)
+
+
+def chunk_spans(text, chunks):
+    """각 청크의 원문 내 (시작, 끝) 문자 위치. 청크는 원문을 순서대로 자른 조각이므로 앞에서부터 찾습니다."""
+    spans, cursor = [], 0
+    for chunk in chunks:
+        start = text.find(chunk, cursor)
+        assert start >= 0, "청크가 원문의 연속된 조각이어야 합니다"
+        spans.append((start, start + len(chunk)))
+        cursor = start + 1
+    return spans
+
+
+CHUNK_SIZE = 200
+CHUNK_OVERLAP = 40
+
+
+def test_chunks_fit_chunk_size(char_tokenizer):
+    text = build_policy_text()
+    chunks = document_processor.split_text_by_tokens(text, CHUNK_SIZE, CHUNK_OVERLAP)
+    assert len(chunks) > 1
+    assert all(0 < token_len(chunk) <= CHUNK_SIZE for chunk in chunks)
+
+
+def test_chunks_cover_text_and_overlap(char_tokenizer):
+    text = build_policy_text()
+    chunks = document_processor.split_text_by_tokens(text, CHUNK_SIZE, CHUNK_OVERLAP)
+    spans = chunk_spans(text, chunks)
+    assert spans[0][0] == 0
+    assert spans[-1][1] == len(text.rstrip())
+    for (_, prev_end), (next_start, _) in zip(spans, spans[1:]):
+        # 다음 청크는 이전 청크 끝보다 앞에서, chunk_overlap 토큰 이내에서 시작
+        assert next_start < prev_end
+        assert token_len(text[next_start:prev_end]) <= CHUNK_OVERLAP
+
+
+def test_chunks_end_at_article_or_clause_boundaries(char_tokenizer):
+    text = build_policy_text()
+    chunks = document_processor.split_text_by_tokens(text, CHUNK_SIZE, CHUNK_OVERLAP)
+    spans = chunk_spans(text, chunks)
+    for _, end in spans[:-1]:
+        # 청크 크기의 뒤쪽 절반마다 조/항 표시가 있으므로 문장 중간이 아니라 조/항 앞에서 끊김
+        assert re.match(r"\s*(제\d+조\(|[①-⑳])", text[end:]), text[end:end + 20]
+
+
+def test_chunks_never_split_inside_sentence_when_boundary_exists(char_tokenizer):
+    text = " ".join(f"보험 계약자는 {i}번째 의무를 지켜야 합니다." for i in range(60))
+    chunks = document_processor.split_text_by_tokens(text, CHUNK_SIZE, CHUNK_OVERLAP)
+    assert len(chunks) > 1
+    assert all(chunk.endswith("합니다.") for chunk in chunks)
+
+
+def test_short_text_is_single_chunk(char_tokenizer):
+    assert document_processor.split_text_by_tokens("  제1조(목적) 짧은 약관  ", CHUNK_SIZE, CHUNK_OVERLAP) == ["제1조(목적) 짧은 약관"]
+    assert document_processor.split_text_by_tokens("   ", CHUNK_SIZE, CHUNK_OVERLAP) == []
+
+
+FILES = [("약관.txt", "제1조(목적) 이 약관은 ...".encode("utf-8"))]
+
+
+def test_chunker_is_part_of_index_cache_key(monkeypatch):
+    # 분할 방식이 바뀌면 이전 방식으로 만든 인덱스는 같은 키로 재사용되지 않음 (무효화)
+    monkeypatch.setattr(document_processor, "CHUNKER", "recursive")
+    recursive_key = vector_index_store.document_set_key(FILES)
+    monkeypatch.setattr(document_processor, "CHUNKER", "token")
+    token_key = vector_index_store.document_set_key(FILES)
+    assert recursive_key != token_key
+    assert vector_index_store.document_set_key(FILES) == token_key # 같은 설정에서는 안정적
+
+
+def test_base_index_with_other_chunker_is_not_reused(monkeypatch, tmp_path):
+    monkeypatch.setattr(vector_index_store, "VECTOR_INDEX_STORE_DIR", str(tmp_path))
+    monkeypatch.setattr(document_processor, "CHUNKER", "recursive")
+    stored_entries = vector_index_store.file_entries(FILES)
+    stored_key = vector_index_store._key_for_entries(stored_entries)
+    os.makedirs(tmp_path / stored_key)
+    with open(tmp_path / stored_key / vector_index_store.META_FILE, "w", encoding="utf-8") as f:
+        json.dump({"files": stored_entries, "params": vector_index_store.index_params()}, f)
+
+    entries = vector_index_store.file_entries(FILES + [("특약.txt", b"\xec\xa0\x9c2\xec\xa1\xb0")])
+    assert vector_index_store.find_base_index(entries)[0] == stored_key # 같은 분할 방식이면 증분 재사용
+
+    monkeypatch.setattr(document_processor, "CHUNKER", "token")
+    assert vector_index_store.find_base_index(entries) is None
+    assert vector_index_store.load_index(vector_index_store.document_set_key(FILES)) is None
@@ -0,0 +1,50 @@
+# tests/test_trend_insights.py
+# 트렌드 인사이트 대체 호출(ai_service.get_trend_insights, structured=False)에서 서로 독립적인 단계가 동시에 실행되는지 확인합니다.
+# AI 호출은 지연만 흉내 내는 함수로 바꿔 실행합니다 (네트워크 불필요).
+# 실행: python -m pytest tests (저장소 루트에서)
+
+import threading
+import time
+
+import pytest
+
+from modules import ai_service
+
+STEP_SECONDS = 0.2
+
+
+@pytest.fixture
+def fake_steps(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def step(name, result):
+        with lock:
+            calls.append((name, time.monotonic()))
+        time.sleep(STEP_SECONDS)
+        return result
+
+    monkeypatch.setattr(ai_service, "prepare_trend_summary_input", lambda articles, api_key: ("기사 요약", None))
+    monkeypatch.setattr(ai_service, "_summarize_trend", lambda content, *args: step("summary", "트렌드 요약"))
+    monkeypatch.setattr(ai_service, "get_insurance_implications_from_ai", lambda text, *args: step("insurance", "보험 영향"))
+    monkeypatch.setattr(ai_service, "format_text_with_markdown", lambda text, *args: step("format", f"## {text}"))
+    return calls
+
+
+def test_chain_formats_trend_summary_while_insurance_runs(fake_steps):
+    start = time.monotonic()
+    insights = ai_service.get_trend_insights([{"title": "기사"}], "key", structured=False)
+    elapsed = time.monotonic() - start
+
+    assert insights == {
+        "trend_summary": "트렌드 요약",
+        "insurance_info": "보험 영향",
+        "formatted_trend_summary": "## 트렌드 요약",
+        "formatted_insurance_info": "## 보험 영향",
+        "mode": "chain",
+    }
+    # 4단계를 순서대로 실행하면 4배, 트렌드 요약 포맷팅이 겹치면 3배 (요약 → 보험 영향 → 보험 영향 포맷팅)
+    assert elapsed < 3.5 * STEP_SECONDS
+    insurance_started = next(at for name, at in fake_steps if name == "insurance")
+    first_format_started = next(at for name, at in fake_steps if name == "format")
+    assert abs(first_format_started - insurance_started) < STEP_SECONDS / 2